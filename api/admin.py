@@ -1,13 +1,49 @@
 from django.contrib import admin
 from django.contrib.auth.models import Group, User
 
-from api.models import Client, Filter, Mailing, Message, Tag
+from api.business_logic.client_bulk import bulk_delete_clients, delete_clients
+from api.business_logic.mailing_counters import delete_messages_with_counters
+from api.models import (
+    Client,
+    Filter,
+    Mailing,
+    MailingCounters,
+    MailingDispatch,
+    MailingTimeseriesRollup,
+    Message,
+    Tag,
+)
 
 admin.site.unregister(Group)
 admin.site.unregister(User)
 
-admin.site.register(Client)
 admin.site.register(Filter)
 admin.site.register(Mailing)
-admin.site.register(Message)
+admin.site.register(MailingCounters)
+admin.site.register(MailingDispatch)
+admin.site.register(MailingTimeseriesRollup)
 admin.site.register(Tag)
+
+
+@admin.register(Client)
+class ClientAdmin(admin.ModelAdmin):
+    """Клиенты удаляются вместе с сообщениями с уменьшением счетчиков
+    рассылок.
+    """
+
+    def delete_model(self, request, obj):
+        delete_clients([obj.id])
+
+    def delete_queryset(self, request, queryset):
+        bulk_delete_clients(queryset)
+
+
+@admin.register(Message)
+class MessageAdmin(admin.ModelAdmin):
+    """Сообщения удаляются с уменьшением счетчиков рассылок."""
+
+    def delete_model(self, request, obj):
+        delete_messages_with_counters(Message.objects.filter(id=obj.id))
+
+    def delete_queryset(self, request, queryset):
+        delete_messages_with_counters(queryset)
@@ -0,0 +1,132 @@
+import logging
+import os
+import threading
+
+from django.conf import settings
+
+from api.metrics import set_gauge
+
+LIMIT_METRIC = "provider_concurrency_limit"
+
+logger = logging.getLogger(__name__)
+
+_concurrency_limiter = None
+_concurrency_limiter_pid = None
+_concurrency_limiter_lock = threading.Lock()
+
+
+class AdaptiveConcurrencyLimiter:
+    """Адаптивное ограничение количества одновременных запросов к внешнему
+    API по схеме AIMD. Результаты запросов собираются в окна размером с
+    текущий лимит: если в окне доля ошибок не превышает max_error_rate и
+    средняя задержка не превышает latency_threshold секунд, лимит
+    увеличивается на единицу, иначе умножается на backoff_ratio.
+    """
+
+    def __init__(
+        self,
+        initial_limit: int,
+        min_limit: int,
+        max_limit: int,
+        latency_threshold: float,
+        max_error_rate: float,
+        backoff_ratio: float = 0.5,
+    ):
+        self._limit = float(initial_limit)
+        self._min_limit = min_limit
+        self._max_limit = max_limit
+        self._latency_threshold = latency_threshold
+        self._max_error_rate = max_error_rate
+        self._backoff_ratio = backoff_ratio
+        self._in_flight = 0
+        self._samples = 0
+        self._errors = 0
+        self._latency_sum = 0.0
+        self._condition = threading.Condition()
+        set_gauge(LIMIT_METRIC, self.limit)
+
+    @property
+    def limit(self) -> int:
+        """Текущее допустимое количество одновременных запросов."""
+
+        return int(self._limit)
+
+    def record(self, latency: float, success: bool) -> None:
+        """Учитывает задержку и результат запроса и по завершении окна
+        пересчитывает лимит. Изменение лимита записывается в журнал.
+        """
+
+        with self._condition:
+            previous_limit = self.limit
+            self._samples += 1
+            self._errors += not success
+            self._latency_sum += latency
+            if self._samples < self.limit:
+                return
+            error_rate = self._errors / self._samples
+            mean_latency = self._latency_sum / self._samples
+            if (
+                error_rate > self._max_error_rate
+                or mean_latency > self._latency_threshold
+            ):
+                self._limit = max(
+                    self._min_limit, self._limit * self._backoff_ratio
+                )
+            else:
+                self._limit = min(self._max_limit, self._limit + 1)
+            self._samples = 0
+            self._errors = 0
+            self._latency_sum = 0.0
+            self._condition.notify_all()
+            limit = self.limit
+        set_gauge(LIMIT_METRIC, limit)
+        if limit != previous_limit:
+            logger.info(
+                "Лимит одновременных запросов к внешнему API: %s -> %s",
+                previous_limit,
+                limit,
+            )
+
+    def acquire(self) -> None:
+        """Ожидает, пока количество выполняемых запросов станет меньше
+        лимита, и занимает место для запроса.
+        """
+
+        with self._condition:
+            self._condition.wait_for(lambda: self._in_flight < self.limit)
+            self._in_flight += 1
+
+    def release(self, latency: float, success: bool) -> None:
+        """Освобождает место, занятое запросом, и учитывает его результат."""
+
+        with self._condition:
+            self._in_flight -= 1
+            self._condition.notify_all()
+        self.record(latency, success)
+
+
+def get_concurrency_limiter() -> AdaptiveConcurrencyLimiter | None:
+    """Возвращает адаптивное ограничение конкурентности текущего процесса,
+    созданное по настройкам PROVIDER_CONCURRENCY_*, или None, если оно
+    отключено настройкой PROVIDER_ADAPTIVE_CONCURRENCY.
+    """
+
+    global _concurrency_limiter, _concurrency_limiter_pid
+    if not settings.PROVIDER_ADAPTIVE_CONCURRENCY:
+        return None
+    with _concurrency_limiter_lock:
+        if (
+            _concurrency_limiter is None
+            or _concurrency_limiter_pid != os.getpid()
+        ):
+            _concurrency_limiter = AdaptiveConcurrencyLimiter(
+                initial_limit=settings.PROVIDER_CONCURRENCY_INITIAL,
+                min_limit=settings.PROVIDER_CONCURRENCY_MIN,
+                max_limit=settings.PROVIDER_CONCURRENCY_MAX,
+                latency_threshold=(
+                    settings.PROVIDER_CONCURRENCY_LATENCY_THRESHOLD_MS / 1000
+                ),
+                max_error_rate=settings.PROVIDER_CONCURRENCY_MAX_ERROR_RATE,
+            )
+            _concurrency_limiter_pid = os.getpid()
+        return _concurrency_limiter
@@ -0,0 +1,218 @@
+import asyncio
+import os
+import threading
+import time
+
+import httpx
+from django.conf import settings
+
+from api.business_logic.adaptive_concurrency import (
+    AdaptiveConcurrencyLimiter,
+    get_concurrency_limiter,
+)
+from api.business_logic.circuit_breaker import get_circuit_breaker
+from api.business_logic.rate_limiter import get_rate_limiter
+from api.business_logic.send_message import (
+    REQUEST_TIMEOUT,
+    build_request,
+    record_response,
+)
+from api.exceptions import BadStatusCodeError, CircuitOpenError
+from api.models import Client
+
+_runner = None
+_runner_pid = None
+_runner_lock = threading.Lock()
+
+
+class _ConcurrencyGate:
+    """Ограничение количества одновременных запросов в цикле событий:
+    не больше concurrency и не больше текущего лимита адаптивного
+    ограничения конкурентности, если оно включено.
+    """
+
+    def __init__(
+        self, concurrency: int, limiter: AdaptiveConcurrencyLimiter | None
+    ):
+        self._concurrency = concurrency
+        self._limiter = limiter
+        self._in_flight = 0
+        self._condition = asyncio.Condition()
+
+    def _get_limit(self) -> int:
+        """Возвращает текущее допустимое количество запросов."""
+
+        if self._limiter is None:
+            return self._concurrency
+        return min(self._concurrency, self._limiter.limit)
+
+    async def acquire(self) -> None:
+        """Ожидает свободного места и занимает его для запроса."""
+
+        async with self._condition:
+            await self._condition.wait_for(
+                lambda: self._in_flight < self._get_limit()
+            )
+            self._in_flight += 1
+
+    async def release(self, latency: float, success: bool) -> None:
+        """Освобождает место, занятое запросом, и учитывает его результат."""
+
+        if self._limiter is not None:
+            self._limiter.record(latency, success)
+        async with self._condition:
+            self._in_flight -= 1
+            self._condition.notify_all()
+
+
+async def _post_payload(
+    client: httpx.AsyncClient,
+    gate: _ConcurrencyGate,
+    message_id: int,
+    phone_number: int,
+    text: str,
+) -> Exception | None:
+    """Отправляет один запрос на внешний API, дождавшись разрешения
+    ограничителя частоты запросов и свободного места в пределах ограничения
+    конкурентности, и возвращает ошибку отправки. Если выключатель
+    разомкнут, запрос не расходует лимит частоты запросов, не занимает место
+    и не учитывается адаптивным ограничением конкурентности.
+    """
+
+    circuit_breaker = get_circuit_breaker()
+    try:
+        circuit_breaker.before_call()
+    except CircuitOpenError as e:
+        return e
+    await get_rate_limiter().acquire_async(
+        Client.get_mobile_operator_code(phone_number)
+    )
+    url, headers, json = build_request(message_id, phone_number, text)
+    await gate.acquire()
+    started = time.monotonic()
+    success = False
+    try:
+        response = await client.post(url=url, headers=headers, json=json)
+        success = response.status_code < 500
+    except httpx.HTTPError as e:
+        circuit_breaker.record_failure()
+        return e
+    except Exception:
+        circuit_breaker.record_failure()
+        raise
+    finally:
+        await gate.release(time.monotonic() - started, success)
+    record_response(circuit_breaker, response.status_code)
+    if response.status_code != 200:
+        return BadStatusCodeError()
+    return None
+
+
+def _create_client(
+    concurrency: int, transport: httpx.AsyncBaseTransport | None = None
+) -> httpx.AsyncClient:
+    """Создает клиент внешнего API с пулом до concurrency keep-alive
+    соединений.
+    """
+
+    limits = httpx.Limits(
+        max_connections=concurrency, max_keepalive_connections=concurrency
+    )
+    timeout = httpx.Timeout(REQUEST_TIMEOUT[1], connect=REQUEST_TIMEOUT[0])
+    return httpx.AsyncClient(
+        limits=limits, timeout=timeout, transport=transport
+    )
+
+
+def get_runner() -> (
+    tuple[asyncio.AbstractEventLoop, httpx.AsyncClient, threading.Lock]
+):
+    """Возвращает цикл событий, клиент внешнего API и блокировку запуска
+    цикла текущего процесса. Они создаются лениво и отдельно для каждого
+    процесса, поэтому пул keep-alive соединений клиента используется всеми
+    пачками, которые отправляет процесс, и не разделяется между процессами
+    воркера после fork. Размер пула задается PROVIDER_ASYNC_CONCURRENCY.
+    """
+
+    global _runner, _runner_pid
+    with _runner_lock:
+        if _runner is None or _runner_pid != os.getpid():
+            _runner = (
+                asyncio.new_event_loop(),
+                _create_client(settings.PROVIDER_ASYNC_CONCURRENCY),
+                threading.Lock(),
+            )
+            _runner_pid = os.getpid()
+        return _runner
+
+
+async def _gather_payloads(
+    client: httpx.AsyncClient,
+    text: str,
+    recipients: list[list[int]],
+    concurrency: int,
+) -> list[Exception | None]:
+    """Конкурентно отправляет сообщения списку получателей и возвращает
+    ошибку отправки каждому получателю. Непредвиденная ошибка одного запроса
+    возвращается как ошибка отправки этому получателю и не прерывает
+    остальные запросы.
+    """
+
+    gate = _ConcurrencyGate(concurrency, get_concurrency_limiter())
+    return await asyncio.gather(
+        *(
+            _post_payload(client, gate, message_id, phone, text)
+            for message_id, phone in recipients
+        ),
+        return_exceptions=True,
+    )
+
+
+async def _send_with_transport(
+    text: str,
+    recipients: list[list[int]],
+    concurrency: int,
+    transport: httpx.AsyncBaseTransport,
+) -> list[Exception | None]:
+    """Отправляет сообщения через отдельный клиент с заданным транспортом."""
+
+    async with _create_client(concurrency, transport) as client:
+        return await _gather_payloads(client, text, recipients, concurrency)
+
+
+def send_payloads(
+    text: str,
+    recipients: list[list[int]],
+    concurrency: int | None = None,
+    transport: httpx.AsyncBaseTransport | None = None,
+) -> tuple[list[int], list[list[int]], Exception | None]:
+    """Отправляет сообщения с одним текстом списку получателей, выполняя до
+    concurrency запросов одновременно, и возвращает идентификаторы
+    отправленных сообщений, получателей, отправка которым завершилась
+    ошибкой, и последнюю ошибку. Получатели, в том числе выборка из БД,
+    загружаются до запуска цикла событий. Если задан transport, запросы
+    выполняются отдельным клиентом с этим транспортом.
+    """
+
+    recipients = [list(recipient) for recipient in recipients]
+    if concurrency is None:
+        concurrency = settings.PROVIDER_ASYNC_CONCURRENCY
+    loop, client, lock = get_runner()
+    if transport is None:
+        coroutine = _gather_payloads(client, text, recipients, concurrency)
+    else:
+        coroutine = _send_with_transport(
+            text, recipients, concurrency, transport
+        )
+    with lock:
+        errors = loop.run_until_complete(coroutine)
+    sent_message_ids = []
+    failed_recipients = []
+    error = None
+    for (message_id, phone_number), recipient_error in zip(recipients, errors):
+        if recipient_error is None:
+            sent_message_ids.append(message_id)
+        else:
+            error = recipient_error
+            failed_recipients.append([message_id, phone_number])
+    return sent_message_ids, failed_recipients, error
@@ -0,0 +1,107 @@
+import datetime
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import BaseCache, caches
+from django.db import transaction
+
+from api.models import Mailing
+
+KEY_PREFIX = "notification_service:change_stamp:"
+SCOPE_CLIENTS = "clients"
+SCOPE_MAILINGS = "mailings"
+SCOPE_STATISTICS = "statistics"
+
+
+def get_shared_cache() -> BaseCache | None:
+    """Возвращает кэш статистики, если он общий для процессов API и воркеров
+    по настройке STATISTICS_CACHE_SHARED, иначе None.
+    """
+
+    if not settings.STATISTICS_CACHE_SHARED:
+        return None
+    return caches[settings.STATISTICS_CACHE_ALIAS]
+
+
+def get_change_stamp(scope: str) -> float | None:
+    """Возвращает время последнего изменения данных области. Если отметки
+    в кэше нет, изменением считается текущий момент. Если кэш не общий,
+    возвращает None.
+    """
+
+    cache = get_shared_cache()
+    if cache is None:
+        return None
+    stamp = time.time()
+    cache.add(KEY_PREFIX + scope, stamp, timeout=settings.STATISTICS_CACHE_TTL)
+    return cache.get(KEY_PREFIX + scope, stamp)
+
+
+def get_last_modified(*scopes: str) -> datetime.datetime | None:
+    """Возвращает время последнего изменения данных областей для заголовка
+    Last-Modified или None, если кэш не общий.
+    """
+
+    stamps = [get_change_stamp(scope) for scope in scopes]
+    if None in stamps:
+        return None
+    return datetime.datetime.fromtimestamp(
+        max(stamps), tz=datetime.timezone.utc
+    )
+
+
+def get_etag(*scopes: str) -> str | None:
+    """Возвращает версию данных областей для заголовка ETag или None, если
+    кэш не общий.
+    """
+
+    stamps = [get_change_stamp(scope) for scope in scopes]
+    if None in stamps:
+        return None
+    return "-".join(f"{stamp:.6f}" for stamp in stamps)
+
+
+def get_mailing_etag(mailing_id: int) -> str | None:
+    """Возвращает версию данных рассылки для заголовка ETag, вычисленную по
+    рассылке, ее фильтру и счетчикам одним запросом по первичному ключу, или
+    None, если рассылки нет. Счетчики меняются вместе с сообщениями
+    рассылки, поэтому версия не зависит от кэша и одинакова во всех
+    процессах.
+    """
+
+    row = (
+        Mailing.objects.filter(id=mailing_id)
+        .values_list(
+            "start_datetime",
+            "end_datetime",
+            "message_text",
+            "filter__tag_id",
+            "filter__mobile_operator_code",
+            "counters__messages_total",
+            "counters__messages_sent",
+            "counters__is_archived",
+        )
+        .first()
+    )
+    if row is None:
+        return None
+    return hashlib.md5(repr(row).encode()).hexdigest()
+
+
+def touch(*scopes: str) -> None:
+    """Отмечает изменение данных областей после фиксации текущей
+    транзакции, если кэш общий.
+    """
+
+    cache = get_shared_cache()
+    if cache is None:
+        return
+
+    def set_stamps():
+        cache.set_many(
+            {KEY_PREFIX + scope: time.time() for scope in scopes},
+            timeout=settings.STATISTICS_CACHE_TTL,
+        )
+
+    transaction.on_commit(set_stamps)
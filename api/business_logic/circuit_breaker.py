@@ -0,0 +1,110 @@
+import os
+import threading
+import time
+
+from django.conf import settings
+
+from api.exceptions import CircuitOpenError
+
+_circuit_breaker = None
+_circuit_breaker_pid = None
+_circuit_breaker_lock = threading.Lock()
+
+
+class CircuitBreaker:
+    """Автоматический выключатель запросов к внешнему API, общий для задач
+    процесса воркера. После failure_threshold ошибок подряд выключатель
+    размыкается и запросы сразу завершаются ошибкой CircuitOpenError. Через
+    recovery_timeout секунд выключатель пропускает до half_open_max_calls
+    пробных запросов: успешный пробный запрос замыкает его, ошибка снова
+    размыкает.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        failure_threshold: int,
+        recovery_timeout: float,
+        half_open_max_calls: int = 1,
+    ):
+        self._failure_threshold = failure_threshold
+        self._recovery_timeout = recovery_timeout
+        self._half_open_max_calls = half_open_max_calls
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._half_open_calls = 0
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if (
+                self._state == self.OPEN
+                and time.monotonic() - self._opened_at
+                >= self._recovery_timeout
+            ):
+                self._state = self.HALF_OPEN
+                self._half_open_calls = 0
+            return self._state
+
+    def before_call(self) -> None:
+        """Проверяет, можно ли выполнить запрос, и вызывает CircuitOpenError,
+        если выключатель разомкнут или лимит пробных запросов исчерпан.
+        """
+
+        if self._failure_threshold <= 0:
+            return
+        state = self.state
+        with self._lock:
+            if state == self.OPEN:
+                raise CircuitOpenError(
+                    self._opened_at + self._recovery_timeout - time.monotonic()
+                )
+            if state == self.HALF_OPEN:
+                if self._half_open_calls >= self._half_open_max_calls:
+                    raise CircuitOpenError(self._recovery_timeout)
+                self._half_open_calls += 1
+
+    def record_success(self) -> None:
+        """Учитывает успешный запрос и замыкает выключатель."""
+
+        with self._lock:
+            self._state = self.CLOSED
+            self._failures = 0
+
+    def record_failure(self) -> None:
+        """Учитывает неудачный запрос и размыкает выключатель при достижении
+        порога ошибок или неудаче пробного запроса.
+        """
+
+        with self._lock:
+            self._failures += 1
+            if (
+                self._state == self.HALF_OPEN
+                or self._failures >= self._failure_threshold
+            ):
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
+
+
+def get_circuit_breaker() -> CircuitBreaker:
+    """Возвращает автоматический выключатель текущего процесса, созданный по
+    настройкам PROVIDER_CIRCUIT_*.
+    """
+
+    global _circuit_breaker, _circuit_breaker_pid
+    with _circuit_breaker_lock:
+        if _circuit_breaker is None or _circuit_breaker_pid != os.getpid():
+            _circuit_breaker = CircuitBreaker(
+                failure_threshold=settings.PROVIDER_CIRCUIT_FAILURE_THRESHOLD,
+                recovery_timeout=settings.PROVIDER_CIRCUIT_RECOVERY_TIMEOUT,
+                half_open_max_calls=(
+                    settings.PROVIDER_CIRCUIT_HALF_OPEN_MAX_CALLS
+                ),
+            )
+            _circuit_breaker_pid = os.getpid()
+        return _circuit_breaker
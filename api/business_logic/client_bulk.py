@@ -0,0 +1,81 @@
+from django.conf import settings
+from django.db import transaction
+from django.db.models import QuerySet
+
+from api.business_logic.change_stamps import SCOPE_CLIENTS, touch
+from api.business_logic.mailing_counters import delete_messages_with_counters
+from api.business_logic.mailing_dispatch import iter_client_id_chunks
+from api.models import Client, Message, Tag
+
+
+def get_selected_clients(
+    ids: list[int] | None = None,
+    tag_name: str | None = None,
+    mobile_operator_code: int | None = None,
+) -> QuerySet[Client]:
+    """Возвращает выборку клиентов по списку идентификаторов или по тэгу и
+    коду мобильного оператора.
+    """
+
+    clients = Client.objects.all()
+    if ids is not None:
+        clients = clients.filter(id__in=ids)
+    if tag_name is not None:
+        clients = clients.filter(tag__name=tag_name)
+    if mobile_operator_code is not None:
+        clients = clients.filter(mobile_operator_code=mobile_operator_code)
+    return clients
+
+
+def bulk_update_clients(
+    clients: QuerySet[Client],
+    tag_name: str | None,
+    chunk_size: int | None = None,
+) -> int:
+    """Присваивает клиентам выборки тэг, выполняя по одному запросу UPDATE
+    на пачку из chunk_size клиентов, и возвращает количество обновленных
+    клиентов. Если tag_name равен None, тэг у клиентов удаляется.
+    """
+
+    if chunk_size is None:
+        chunk_size = settings.CLIENT_BULK_CHUNK_SIZE
+    tag = None
+    if tag_name is not None:
+        tag = Tag.objects.get_or_create(name=tag_name)[0]
+    updated = 0
+    for client_ids in iter_client_id_chunks(clients, chunk_size):
+        updated += Client.objects.filter(id__in=client_ids).update(tag=tag)
+    touch(SCOPE_CLIENTS)
+    return updated
+
+
+def delete_clients(client_ids: list[int]) -> int:
+    """Удаляет клиентов вместе с их сообщениями, уменьшает счетчики рассылок
+    на количество удаленных сообщений и возвращает количество удаленных
+    клиентов.
+    """
+
+    with transaction.atomic():
+        delete_messages_with_counters(
+            Message.objects.filter(client_id__in=client_ids)
+        )
+        return (
+            Client.objects.filter(id__in=client_ids)
+            .delete()[1]
+            .get(Client._meta.label, 0)
+        )
+
+
+def bulk_delete_clients(
+    clients: QuerySet[Client], chunk_size: int | None = None
+) -> int:
+    """Удаляет клиентов выборки пачками по chunk_size клиентов и возвращает
+    количество удаленных клиентов.
+    """
+
+    if chunk_size is None:
+        chunk_size = settings.CLIENT_BULK_CHUNK_SIZE
+    return sum(
+        delete_clients(client_ids)
+        for client_ids in iter_client_id_chunks(clients, chunk_size)
+    )
@@ -0,0 +1,132 @@
+import csv
+import json
+from collections.abc import Iterable, Iterator
+from typing import Any
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import transaction
+
+from api.business_logic.change_stamps import SCOPE_CLIENTS, touch
+from api.models import Client, Tag
+
+IMPORT_FORMAT_CSV = "csv"
+IMPORT_FORMAT_NDJSON = "ndjson"
+IMPORT_FORMATS = (IMPORT_FORMAT_CSV, IMPORT_FORMAT_NDJSON)
+
+
+def get_import_format(file_name: str) -> str:
+    """Определяет формат файла импорта по расширению имени файла."""
+
+    if file_name.endswith((".ndjson", ".jsonl")):
+        return IMPORT_FORMAT_NDJSON
+    return IMPORT_FORMAT_CSV
+
+
+def iter_rows(lines: Iterable[str], import_format: str) -> Iterator[dict]:
+    """Построчно читает записи клиентов из CSV с заголовком
+    phone_number,tag или из NDJSON с такими же ключами. Вместо строк NDJSON,
+    которые не удалось разобрать, возвращается None.
+    """
+
+    if import_format == IMPORT_FORMAT_CSV:
+        yield from csv.DictReader(lines)
+    elif import_format == IMPORT_FORMAT_NDJSON:
+        for line in lines:
+            if not line.strip():
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                yield None
+    else:
+        raise ValueError(f"Неизвестный формат импорта: {import_format}")
+
+
+def _clean_row(row: Any) -> tuple[int, str | None]:
+    """Проверяет запись клиента и возвращает номер телефона и имя тэга."""
+
+    if not isinstance(row, dict):
+        raise ValidationError("Запись клиента должна быть объектом JSON.")
+    phone_number = Client._meta.get_field("phone_number").clean(
+        row.get("phone_number"), None
+    )
+    tag_name = row.get("tag") or None
+    if tag_name is not None:
+        tag_name = Tag._meta.get_field("name").clean(str(tag_name), None)
+    return phone_number, tag_name
+
+
+def _get_tag_ids(tag_names: set[str]) -> dict[str, int]:
+    """Возвращает идентификаторы тэгов по именам, создавая недостающие тэги
+    одним запросом.
+    """
+
+    if not tag_names:
+        return {}
+    Tag.objects.bulk_create(
+        [Tag(name=name) for name in tag_names], ignore_conflicts=True
+    )
+    return dict(
+        Tag.objects.filter(name__in=tag_names).values_list("name", "id")
+    )
+
+
+def _import_batch(clients: dict[int, str | None]) -> None:
+    """Создает или обновляет клиентов пачки одним запросом."""
+
+    tag_ids = _get_tag_ids(
+        {tag_name for tag_name in clients.values() if tag_name is not None}
+    )
+    Client.objects.bulk_create(
+        [
+            Client(
+                phone_number=phone_number,
+                mobile_operator_code=Client.get_mobile_operator_code(
+                    phone_number
+                ),
+                tag_id=tag_ids.get(tag_name),
+            )
+            for phone_number, tag_name in clients.items()
+        ],
+        update_conflicts=True,
+        unique_fields=["phone_number"],
+        update_fields=["mobile_operator_code", "tag"],
+    )
+
+
+def import_clients(
+    rows: Iterable[Any], batch_size: int | None = None
+) -> dict[str, Any]:
+    """Создает или обновляет клиентов по номеру телефона пачками по
+    batch_size записей: записи пачки проверяются, тэги пачки создаются и
+    выбираются одним запросом, клиенты записываются одним запросом. Если
+    номер телефона встречается в пачке несколько раз, используется последняя
+    запись. Возвращает количество записанных и отклоненных записей и первые
+    CLIENT_IMPORT_MAX_ERRORS ошибок с номерами записей.
+    """
+
+    if batch_size is None:
+        batch_size = settings.CLIENT_IMPORT_BATCH_SIZE
+    result = {"clients_imported": 0, "clients_rejected": 0, "errors": []}
+    batch = {}
+    for number, row in enumerate(rows, start=1):
+        try:
+            phone_number, tag_name = _clean_row(row)
+        except ValidationError as e:
+            result["clients_rejected"] += 1
+            if len(result["errors"]) < settings.CLIENT_IMPORT_MAX_ERRORS:
+                result["errors"].append({"row": number, "error": e.messages})
+            continue
+        batch[phone_number] = tag_name
+        if len(batch) >= batch_size:
+            with transaction.atomic():
+                _import_batch(batch)
+            result["clients_imported"] += len(batch)
+            batch = {}
+    if batch:
+        with transaction.atomic():
+            _import_batch(batch)
+        result["clients_imported"] += len(batch)
+    touch(SCOPE_CLIENTS)
+    return result
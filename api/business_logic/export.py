@@ -0,0 +1,73 @@
+import json
+import zlib
+from collections.abc import Iterable, Iterator
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import F, QuerySet
+
+from api.models import Client, Message
+
+COMPRESSION_GZIP = "gzip"
+EXPORT_COMPRESSIONS = (COMPRESSION_GZIP,)
+
+
+def get_client_export_rows() -> QuerySet:
+    """Возвращает выборку клиентов для выгрузки."""
+
+    return (
+        Client.objects.order_by("id")
+        .annotate(tag_name=F("tag__name"))
+        .values("id", "phone_number", "mobile_operator_code", "tag_name")
+    )
+
+
+def get_message_export_rows(mailing_id: int | None = None) -> QuerySet:
+    """Возвращает выборку результатов отправки сообщений для выгрузки, всех
+    или одной рассылки.
+    """
+
+    messages = Message.objects.all()
+    if mailing_id is not None:
+        messages = messages.filter(mailing_id=mailing_id)
+    return (
+        messages.order_by("id")
+        .annotate(phone_number=F("client__phone_number"))
+        .values(
+            "id",
+            "mailing_id",
+            "client_id",
+            "phone_number",
+            "is_sent",
+            "created_datetime",
+            "sent_datetime",
+        )
+    )
+
+
+def iter_ndjson(rows: QuerySet, chunk_size: int) -> Iterator[bytes]:
+    """Построчно выгружает выборку в NDJSON, читая ее из БД курсором пачками
+    по chunk_size строк, и возвращает по одному блоку байтов на пачку, поэтому
+    память не зависит от размера выборки.
+    """
+
+    lines = []
+    for row in rows.iterator(chunk_size=chunk_size):
+        lines.append(
+            json.dumps(row, cls=DjangoJSONEncoder, ensure_ascii=False)
+        )
+        if len(lines) >= chunk_size:
+            yield ("\n".join(lines) + "\n").encode()
+            lines = []
+    if lines:
+        yield ("\n".join(lines) + "\n").encode()
+
+
+def iter_gzip(chunks: Iterable[bytes]) -> Iterator[bytes]:
+    """Сжимает поток блоков байтов в формат gzip по мере чтения."""
+
+    compressor = zlib.compressobj(wbits=zlib.MAX_WBITS | 16)
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
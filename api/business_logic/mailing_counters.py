@@ -0,0 +1,146 @@
+from collections import Counter
+
+from django.db import transaction
+from django.db.models import Count, F, Q, QuerySet
+
+from api.business_logic.statistics_cache import increment_overall_statistics
+from api.models import Mailing, MailingCounters, Message
+
+REBUILD_CHUNK_SIZE = 1000
+
+
+def count_mailing_messages(
+    mailing_ids: list[int],
+) -> dict[int, tuple[int, int]]:
+    """Подсчитывает сообщения рассылок по таблице сообщений одним запросом и
+    возвращает для каждой рассылки количество всех и отправленных сообщений.
+    """
+
+    mailings = (
+        Mailing.objects.filter(id__in=mailing_ids)
+        .annotate(
+            messages_total=Count("messages"),
+            messages_sent=Count("messages", filter=Q(messages__is_sent=True)),
+        )
+        .order_by("id")
+        .values_list("id", "messages_total", "messages_sent")
+    )
+    return {mailing_id: (total, sent) for mailing_id, total, sent in mailings}
+
+
+def save_counters(counts: dict[int, tuple[int, int]]) -> None:
+    """Записывает счетчики рассылок одним запросом, заменяя существующие и
+    снимая отметку о сохранении статистики по интервалам.
+    """
+
+    MailingCounters.objects.bulk_create(
+        [
+            MailingCounters(
+                mailing_id=mailing_id,
+                messages_total=total,
+                messages_sent=sent,
+            )
+            for mailing_id, (total, sent) in counts.items()
+        ],
+        update_conflicts=True,
+        unique_fields=["mailing"],
+        update_fields=["messages_total", "messages_sent", "is_rolled_up"],
+    )
+
+
+def increment_counters(
+    mailing_id: int, messages_total: int = 0, messages_sent: int = 0
+) -> None:
+    """Атомарно увеличивает счетчики рассылки. Если счетчиков рассылки еще
+    нет, они создаются подсчетом по таблице сообщений, который уже учитывает
+    изменения, ради которых вызвано увеличение. Отметка о сохранении
+    статистики по интервалам снимается. Общая статистика в кэше
+    увеличивается на те же значения.
+    """
+
+    if not messages_total and not messages_sent:
+        return
+    updated = MailingCounters.objects.filter(mailing_id=mailing_id).update(
+        messages_total=F("messages_total") + messages_total,
+        messages_sent=F("messages_sent") + messages_sent,
+        is_rolled_up=False,
+    )
+    if not updated:
+        save_counters(count_mailing_messages([mailing_id]))
+    increment_overall_statistics(
+        messages_total=messages_total, messages_sent=messages_sent
+    )
+
+
+def increment_sent_counters(mailing_ids: list[int]) -> None:
+    """Увеличивает счетчики отправленных сообщений по списку рассылок
+    отправленных сообщений, по одному запросу на рассылку.
+    """
+
+    for mailing_id, messages_sent in Counter(mailing_ids).items():
+        increment_counters(mailing_id, messages_sent=messages_sent)
+
+
+def delete_messages_with_counters(messages: QuerySet[Message]) -> int:
+    """Удаляет сообщения выборки, уменьшает счетчики рассылок на количество
+    удаленных сообщений и возвращает это количество.
+    """
+
+    with transaction.atomic():
+        counts = list(
+            messages.values("mailing_id")
+            .order_by("mailing_id")
+            .annotate(
+                messages_total=Count("id"),
+                messages_sent=Count("id", filter=Q(is_sent=True)),
+            )
+        )
+        deleted = messages.delete()[0]
+        for count in counts:
+            increment_counters(
+                count["mailing_id"],
+                messages_total=-count["messages_total"],
+                messages_sent=-count["messages_sent"],
+            )
+    return deleted
+
+
+def rebuild_counters(check: bool = False) -> list[int]:
+    """Пересчитывает счетчики всех рассылок, сообщения которых не перенесены
+    в архив, по таблице сообщений пачками по REBUILD_CHUNK_SIZE рассылок,
+    создавая недостающие, и возвращает идентификаторы рассылок, счетчики
+    которых расходились с таблицей сообщений. При check=True счетчики только
+    проверяются.
+    """
+
+    mismatched_ids = []
+    last_id = 0
+    while True:
+        mailing_ids = list(
+            Mailing.objects.filter(id__gt=last_id)
+            .exclude(counters__is_archived=True)
+            .order_by("id")
+            .values_list("id", flat=True)[:REBUILD_CHUNK_SIZE]
+        )
+        if not mailing_ids:
+            return mismatched_ids
+        counts = count_mailing_messages(mailing_ids)
+        stored = {
+            mailing_id: (total, sent)
+            for mailing_id, total, sent in MailingCounters.objects.filter(
+                mailing_id__in=mailing_ids
+            ).values_list("mailing_id", "messages_total", "messages_sent")
+        }
+        mismatched_ids.extend(
+            mailing_id
+            for mailing_id, count in counts.items()
+            if mailing_id in stored and stored[mailing_id] != count
+        )
+        outdated = {
+            mailing_id: count
+            for mailing_id, count in counts.items()
+            if stored.get(mailing_id) != count
+        }
+        if outdated and not check:
+            save_counters(outdated)
+        last_id = mailing_ids[-1]
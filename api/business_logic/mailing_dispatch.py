@@ -0,0 +1,108 @@
+from collections.abc import Iterator
+
+from django.db import transaction
+from django.db.models import F, QuerySet
+
+from api.business_logic.mailing_counters import increment_counters
+from api.models import Client, Mailing, MailingDispatch, Message
+
+
+def get_mailing_clients(mailing: Mailing) -> QuerySet[Client]:
+    """Возвращает выборку клиентов, подходящих под фильтр рассылки."""
+
+    return Client.objects.filter(
+        tag=mailing.filter.tag_id,
+        mobile_operator_code=mailing.filter.mobile_operator_code,
+    )
+
+
+def iter_client_id_chunks(
+    clients: QuerySet[Client], chunk_size: int, after_id: int = 0
+) -> Iterator[list[int]]:
+    """Обходит выборку клиентов пачками идентификаторов, используя пагинацию
+    по ключу Client.id, поэтому в памяти одновременно находится не более
+    одной пачки.
+    """
+
+    last_id = after_id
+    while True:
+        client_ids = list(
+            clients.filter(id__gt=last_id)
+            .order_by("id")
+            .values_list("id", flat=True)[:chunk_size]
+        )
+        if not client_ids:
+            return
+        yield client_ids
+        last_id = client_ids[-1]
+
+
+def split_into_batches(items: list, batch_size: int) -> list[list]:
+    """Разбивает список на пачки заданного размера."""
+
+    return [
+        items[i : i + batch_size] for i in range(0, len(items), batch_size)
+    ]
+
+
+def create_messages(
+    mailing_id: int, client_ids: list[int]
+) -> list[tuple[int, int]]:
+    """Создает сообщения рассылки для пачки клиентов одним запросом,
+    увеличивает счетчик сообщений рассылки на количество созданных и
+    возвращает пары из идентификатора сообщения и номера телефона клиента
+    для еще не отправленных сообщений. Уже существующие сообщения не
+    дублируются, а отправленные не отправляются повторно, поэтому повторный
+    вызов безопасен.
+    """
+
+    messages = Message.objects.filter(
+        mailing_id=mailing_id, client_id__in=client_ids
+    )
+    with transaction.atomic():
+        existing_count = messages.count()
+        Message.objects.bulk_create(
+            [
+                Message(mailing_id=mailing_id, client_id=client_id)
+                for client_id in client_ids
+            ],
+            ignore_conflicts=True,
+        )
+        rows = list(
+            messages.order_by("client_id").values_list(
+                "id", "client__phone_number", "is_sent"
+            )
+        )
+        increment_counters(
+            mailing_id, messages_total=len(rows) - existing_count
+        )
+    return [
+        (message_id, phone_number)
+        for message_id, phone_number, is_sent in rows
+        if not is_sent
+    ]
+
+
+def get_dispatch_checkpoint(mailing: Mailing) -> MailingDispatch:
+    """Возвращает сохраненный ход запуска рассылки, создавая его при первом
+    запуске.
+    """
+
+    return MailingDispatch.objects.get_or_create(mailing=mailing)[0]
+
+
+def save_dispatch_checkpoint(mailing_id: int, last_client_id: int) -> None:
+    """Сохраняет идентификатор последнего клиента опубликованной пачки."""
+
+    MailingDispatch.objects.filter(mailing_id=mailing_id).update(
+        last_client_id=last_client_id,
+        chunks_published=F("chunks_published") + 1,
+    )
+
+
+def finish_dispatch(mailing_id: int) -> None:
+    """Отмечает запуск рассылки завершенным."""
+
+    MailingDispatch.objects.filter(mailing_id=mailing_id).update(
+        is_finished=True
+    )
@@ -1,8 +1,34 @@
+import datetime
 from typing import Any
 
-from django.db.models import Count, Q, QuerySet
+from django.db.models import (
+    Count,
+    F,
+    OuterRef,
+    Q,
+    QuerySet,
+    Subquery,
+    Sum,
+)
+from django.db.models.functions import Coalesce, TruncDate
+from django.utils import timezone
 
-from api.models import Mailing, Message
+from api.business_logic.statistics_cache import (
+    cache_overall_statistics,
+    get_cached_overall_statistics,
+)
+from api.models import (
+    Mailing,
+    MailingCounters,
+    MailingTimeseriesRollup,
+    Message,
+)
+
+GROUP_BY_TAG = "tag"
+GROUP_BY_MOBILE_OPERATOR_CODE = "mobile_operator_code"
+GROUP_BY_DAY = "day"
+GROUP_BY_CHOICES = [GROUP_BY_TAG, GROUP_BY_MOBILE_OPERATOR_CODE, GROUP_BY_DAY]
+STATISTICS_FIELDS = ("mailings_total", "messages_sent", "messages_failed")
 
 
 def count_messages_by_status(messages: QuerySet[Message]) -> dict[str, int]:
@@ -21,22 +47,245 @@ def count_messages_by_status(messages: QuerySet[Message]) -> dict[str, int]:
 
 
 def get_detailed_statistics(mailing: Mailing) -> dict[str, Any]:
-    """Формирует статистику для одной рассылки."""
+    """Формирует статистику для одной рассылки по ее счетчикам, а если их
+    еще нет - по ее сообщениям.
+    """
 
-    messages = Message.objects.filter(mailing=mailing)
-    statistics = count_messages_by_status(messages)
+    try:
+        counters = mailing.counters
+    except MailingCounters.DoesNotExist:
+        messages = Message.objects.filter(mailing=mailing)
+        statistics = count_messages_by_status(messages)
+    else:
+        statistics = {
+            "messages_sent": counters.messages_sent,
+            "messages_failed": counters.messages_failed,
+            "messages_total": counters.messages_total,
+        }
     info = {
-        "tag": mailing.filter.tag.id,
+        "tag": mailing.filter.tag_id,
         "text": mailing.message_text,
         "mobile_operator_code": mailing.filter.mobile_operator_code,
     }
     return {**info, **statistics}
 
 
+def _count_mailing_messages(**filters) -> Subquery:
+    """Возвращает подзапрос количества сообщений рассылки внешнего запроса."""
+
+    return Subquery(
+        Message.objects.filter(mailing=OuterRef("pk"), **filters)
+        .order_by()
+        .values("mailing")
+        .annotate(count=Count("id"))
+        .values("count")
+    )
+
+
+def get_bulk_detailed_statistics(
+    ids: list[int] | None = None,
+    date_from: datetime.date | None = None,
+    date_to: datetime.date | None = None,
+) -> list[dict[str, Any]]:
+    """Формирует статистику для списка рассылок или рассылок, начинающихся
+    в заданные даты включительно, одним запросом с присоединением фильтров и
+    счетчиков рассылок. Сообщения подсчитываются подзапросом только для
+    рассылок, у которых еще нет счетчиков.
+    """
+
+    mailings = Mailing.objects.all()
+    if ids is not None:
+        mailings = mailings.filter(id__in=ids)
+    if date_from is not None:
+        mailings = mailings.filter(start_datetime__date__gte=date_from)
+    if date_to is not None:
+        mailings = mailings.filter(start_datetime__date__lte=date_to)
+    rows = (
+        mailings.order_by("id")
+        .annotate(
+            tag=F("filter__tag_id"),
+            text=F("message_text"),
+            mobile_operator_code=F("filter__mobile_operator_code"),
+            messages_total=Coalesce(
+                "counters__messages_total", _count_mailing_messages(), 0
+            ),
+            messages_sent=Coalesce(
+                "counters__messages_sent",
+                _count_mailing_messages(is_sent=True),
+                0,
+            ),
+        )
+        .values(
+            "id",
+            "tag",
+            "text",
+            "mobile_operator_code",
+            "messages_total",
+            "messages_sent",
+        )
+    )
+    return [
+        {
+            **row,
+            "messages_failed": row["messages_total"] - row["messages_sent"],
+        }
+        for row in rows
+    ]
+
+
 def get_overall_statistics() -> dict[str, Any]:
-    """Формирует статистику для выборки рассылок."""
+    """Формирует статистику для выборки рассылок с учетом сообщений,
+    перенесенных в архив. Статистика берется из кэша, а при его отсутствии
+    подсчитывается и сохраняется в кэш.
+    """
 
+    cached = get_cached_overall_statistics()
+    if cached is not None:
+        return {
+            **cached,
+            "messages_failed": (
+                cached["messages_total"] - cached["messages_sent"]
+            ),
+        }
     messages = Message.objects.all()
     statistics = count_messages_by_status(messages)
+    archived = MailingCounters.objects.filter(is_archived=True).aggregate(
+        messages_total=Coalesce(Sum("messages_total"), 0),
+        messages_sent=Coalesce(Sum("messages_sent"), 0),
+    )
+    statistics["messages_total"] += archived["messages_total"]
+    statistics["messages_sent"] += archived["messages_sent"]
+    statistics["messages_failed"] += (
+        archived["messages_total"] - archived["messages_sent"]
+    )
     mailings_total = {"mailings_total": Mailing.objects.all().count()}
-    return {**mailings_total, **statistics}
+    statistics = {**mailings_total, **statistics}
+    cache_overall_statistics(statistics)
+    return statistics
+
+
+def _filter_statistics_rows(
+    rows: QuerySet,
+    tag: str | None,
+    mobile_operator_code: int | None,
+    date_from: datetime.date | None,
+    date_to: datetime.date | None,
+) -> QuerySet:
+    """Фильтрует выборку, аннотированную полем timestamp, по тэгу и коду
+    мобильного оператора фильтра рассылки и по датам включительно.
+    """
+
+    if tag is not None:
+        rows = rows.filter(mailing__filter__tag__name=tag)
+    if mobile_operator_code is not None:
+        rows = rows.filter(
+            mailing__filter__mobile_operator_code=mobile_operator_code
+        )
+    if date_from is not None:
+        rows = rows.filter(
+            timestamp__gte=timezone.make_aware(
+                datetime.datetime.combine(date_from, datetime.time.min)
+            )
+        )
+    if date_to is not None:
+        rows = rows.filter(
+            timestamp__lt=timezone.make_aware(
+                datetime.datetime.combine(
+                    date_to + datetime.timedelta(days=1), datetime.time.min
+                )
+            )
+        )
+    return rows
+
+
+def _group_statistics_rows(
+    rows: QuerySet, group_by: str | None, **counts
+) -> list[dict[str, Any]]:
+    """Подсчитывает статистику выборки, аннотированной полем timestamp, одним
+    запросом GROUP BY по полю group_by или одной строкой без группировки.
+    """
+
+    group_fields = {
+        GROUP_BY_TAG: F("mailing__filter__tag__name"),
+        GROUP_BY_MOBILE_OPERATOR_CODE: F(
+            "mailing__filter__mobile_operator_code"
+        ),
+        GROUP_BY_DAY: TruncDate("timestamp"),
+    }
+    if group_by is None:
+        return [rows.aggregate(**counts)]
+    return list(
+        rows.annotate(group=group_fields[group_by])
+        .values("group")
+        .annotate(**counts)
+        .order_by("group")
+    )
+
+
+def get_filtered_statistics(
+    tag: str | None = None,
+    mobile_operator_code: int | None = None,
+    date_from: datetime.date | None = None,
+    date_to: datetime.date | None = None,
+    group_by: str | None = None,
+) -> dict[str, Any] | list[dict[str, Any]]:
+    """Формирует статистику по рассылкам с фильтром по тэгу и коду
+    мобильного оператора, по времени отправки или создания сообщений и с
+    группировкой по тэгу, коду мобильного оператора или дню. Сообщения
+    подсчитываются одним запросом GROUP BY, сообщения рассылок, перенесенные
+    в архив, - вторым запросом по их почасовой статистике. Без группировки
+    возвращается одна строка статистики, с группировкой - список строк.
+    """
+
+    filters = {
+        "tag": tag,
+        "mobile_operator_code": mobile_operator_code,
+        "date_from": date_from,
+        "date_to": date_to,
+    }
+    messages = _filter_statistics_rows(
+        Message.objects.annotate(
+            timestamp=Coalesce("sent_datetime", "created_datetime")
+        ),
+        **filters,
+    )
+    rollups = _filter_statistics_rows(
+        MailingTimeseriesRollup.objects.filter(
+            bucket=MailingTimeseriesRollup.BUCKET_HOUR,
+            mailing__counters__is_archived=True,
+        ).annotate(timestamp=F("bucket_start")),
+        **filters,
+    )
+    rows = _group_statistics_rows(
+        messages,
+        group_by,
+        mailings_total=Count("mailing", distinct=True),
+        messages_sent=Count("id", filter=Q(is_sent=True)),
+        messages_failed=Count("id", filter=Q(is_sent=False)),
+    ) + _group_statistics_rows(
+        rollups,
+        group_by,
+        mailings_total=Count("mailing", distinct=True),
+        messages_sent=Coalesce(Sum("messages_sent"), 0),
+        messages_failed=Coalesce(Sum("messages_failed"), 0),
+    )
+    groups = {}
+    for row in rows:
+        group = groups.setdefault(
+            row.get("group"), dict.fromkeys(STATISTICS_FIELDS, 0)
+        )
+        for field in STATISTICS_FIELDS:
+            group[field] += row[field]
+    statistics = []
+    for key, group in sorted(
+        groups.items(), key=lambda item: (item[0] is None, item[0])
+    ):
+        group["messages_total"] = (
+            group["messages_sent"] + group["messages_failed"]
+        )
+        if group_by is not None:
+            group = {group_by: key, **group}
+        statistics.append(group)
+    if group_by is None:
+        return statistics[0]
+    return statistics
@@ -0,0 +1,116 @@
+from typing import Any
+
+from django.db import transaction
+from django.utils import timezone
+from django.db.models import Count, DateTimeField, Q
+from django.db.models.functions import Coalesce, Trunc
+
+from api.models import (
+    Mailing,
+    MailingCounters,
+    MailingTimeseriesRollup,
+    Message,
+)
+
+BUCKETS = [bucket for bucket, _ in MailingTimeseriesRollup.BUCKET_CHOICES]
+ROLLUP_BATCH_SIZE = 100
+
+
+def aggregate_timeseries(mailing_id: int, bucket: str) -> list[dict[str, Any]]:
+    """Подсчитывает отправленные и неотправленные сообщения рассылки по
+    интервалам времени одним сгруппированным запросом. Отправленные
+    сообщения относятся к интервалу по времени отправки, неотправленные - по
+    времени создания.
+    """
+
+    return list(
+        Message.objects.filter(mailing_id=mailing_id)
+        .annotate(
+            bucket_start=Trunc(
+                Coalesce("sent_datetime", "created_datetime"),
+                bucket,
+                output_field=DateTimeField(),
+            )
+        )
+        .values("bucket_start")
+        .annotate(
+            messages_sent=Count("id", filter=Q(is_sent=True)),
+            messages_failed=Count("id", filter=Q(is_sent=False)),
+        )
+        .order_by("bucket_start")
+    )
+
+
+def build_rollups(mailing_id: int) -> None:
+    """Сохраняет статистику рассылки по интервалам всех размеров, заменяя
+    ранее сохраненную.
+    """
+
+    with transaction.atomic():
+        MailingTimeseriesRollup.objects.filter(mailing_id=mailing_id).delete()
+        MailingTimeseriesRollup.objects.bulk_create(
+            [
+                MailingTimeseriesRollup(
+                    mailing_id=mailing_id, bucket=bucket, **row
+                )
+                for bucket in BUCKETS
+                for row in aggregate_timeseries(mailing_id, bucket)
+            ]
+        )
+
+
+def build_finished_rollups() -> list[int]:
+    """Сохраняет статистику по интервалам закончившихся рассылок, для
+    которых она еще не сохранена или устарела, пачками по ROLLUP_BATCH_SIZE
+    рассылок и возвращает их идентификаторы. Строка счетчиков рассылки
+    блокируется на время сохранения, поэтому изменение счетчиков во время
+    сохранения снова снимет отметку.
+    """
+
+    finished_ids = (
+        MailingCounters.objects.filter(
+            mailing__end_datetime__lte=timezone.now(),
+            is_rolled_up=False,
+            is_archived=False,
+        )
+        .order_by("mailing_id")
+        .values_list("mailing_id", flat=True)
+    )
+    rolled_up_ids = []
+    last_id = 0
+    while batch := list(
+        finished_ids.filter(mailing_id__gt=last_id)[:ROLLUP_BATCH_SIZE]
+    ):
+        for mailing_id in batch:
+            with transaction.atomic():
+                counters = MailingCounters.objects.select_for_update().filter(
+                    mailing_id=mailing_id, is_rolled_up=False
+                )
+                if not counters.exists():
+                    continue
+                build_rollups(mailing_id)
+                counters.update(is_rolled_up=True)
+            rolled_up_ids.append(mailing_id)
+        last_id = batch[-1]
+    return rolled_up_ids
+
+
+def get_timeseries(mailing: Mailing, bucket: str) -> list[dict[str, Any]]:
+    """Возвращает статистику рассылки по интервалам времени: сохраненную,
+    если рассылка закончилась и статистика сохранена или сообщения рассылки
+    перенесены в архив, иначе подсчитанную по сообщениям.
+    """
+
+    try:
+        is_rolled_up = (
+            mailing.counters.is_rolled_up or mailing.counters.is_archived
+        )
+    except MailingCounters.DoesNotExist:
+        is_rolled_up = False
+    if not is_rolled_up:
+        return aggregate_timeseries(mailing.id, bucket)
+    return list(
+        MailingTimeseriesRollup.objects.filter(mailing=mailing, bucket=bucket)
+        .order_by("bucket_start")
+        .values("bucket_start", "messages_sent", "messages_failed")
+    )
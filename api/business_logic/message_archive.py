@@ -0,0 +1,147 @@
+import datetime
+import gzip
+import json
+import os
+from pathlib import Path
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import QuerySet
+from django.utils import timezone
+
+from api.business_logic.mailing_counters import (
+    count_mailing_messages,
+    save_counters,
+)
+from api.business_logic.mailing_timeseries import build_rollups
+from api.business_logic.statistics_cache import invalidate_overall_statistics
+from api.models import Mailing, MailingCounters, Message
+
+ARCHIVE_FIELDS = (
+    "id",
+    "client_id",
+    "client__phone_number",
+    "is_sent",
+    "created_datetime",
+    "sent_datetime",
+)
+
+
+def get_archivable_mailings(retention_days: int) -> QuerySet[Mailing]:
+    """Возвращает рассылки, которые закончились больше retention_days дней
+    назад и сообщения которых еще не перенесены в архив.
+    """
+
+    border = timezone.now() - datetime.timedelta(days=retention_days)
+    return (
+        Mailing.objects.filter(end_datetime__lte=border)
+        .exclude(counters__is_archived=True)
+        .order_by("id")
+    )
+
+
+def get_archive_path(directory: str | Path, mailing_id: int) -> Path:
+    """Возвращает путь к архиву сообщений рассылки."""
+
+    return Path(directory) / f"mailing_{mailing_id}.ndjson.gz"
+
+
+def write_archive(mailing_id: int, path: Path, chunk_size: int) -> int:
+    """Записывает сообщения рассылки в сжатый файл NDJSON, выбирая их из БД
+    пачками по chunk_size с пагинацией по ключу Message.id, и возвращает
+    количество записанных сообщений. Файл сначала пишется под временным
+    именем и переименовывается после записи, поэтому на месте path не
+    бывает недописанного архива.
+    """
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temporary_path = path.with_name(path.name + ".tmp")
+    messages = Message.objects.filter(mailing_id=mailing_id).order_by("id")
+    written = 0
+    last_id = 0
+    with gzip.open(temporary_path, "wt", encoding="utf-8") as file:
+        while True:
+            rows = list(
+                messages.filter(id__gt=last_id).values(*ARCHIVE_FIELDS)[
+                    :chunk_size
+                ]
+            )
+            if not rows:
+                break
+            for row in rows:
+                file.write(
+                    json.dumps(row, cls=DjangoJSONEncoder, ensure_ascii=False)
+                    + "\n"
+                )
+            written += len(rows)
+            last_id = rows[-1]["id"]
+    os.replace(temporary_path, path)
+    return written
+
+
+def delete_messages(mailing_id: int, chunk_size: int) -> int:
+    """Удаляет сообщения рассылки пачками по chunk_size, чтобы не держать
+    долгих блокировок, и возвращает количество удаленных сообщений.
+    """
+
+    messages = Message.objects.filter(mailing_id=mailing_id)
+    deleted = 0
+    while message_ids := list(
+        messages.values_list("id", flat=True)[:chunk_size]
+    ):
+        deleted += Message.objects.filter(id__in=message_ids).delete()[0]
+    return deleted
+
+
+def archive_mailing(
+    mailing_id: int, directory: str | Path, chunk_size: int
+) -> Path:
+    """Переносит сообщения рассылки в архив: фиксирует итоговые счетчики
+    рассылки и ее статистику по интервалам времени, записывает сообщения в
+    файл, удаляет их из БД и отмечает счетчики архивными. Если архив уже
+    записан, он не перезаписывается, поэтому прерванный перенос можно
+    безопасно повторить.
+    """
+
+    path = get_archive_path(directory, mailing_id)
+    if not path.exists():
+        save_counters(count_mailing_messages([mailing_id]))
+        build_rollups(mailing_id)
+        write_archive(mailing_id, path, chunk_size)
+    delete_messages(mailing_id, chunk_size)
+    MailingCounters.objects.filter(mailing_id=mailing_id).update(
+        is_archived=True, is_rolled_up=True
+    )
+    invalidate_overall_statistics()
+    return path
+
+
+def archive_mailings(
+    retention_days: int | None = None,
+    directory: str | Path | None = None,
+    chunk_size: int | None = None,
+) -> list[Path]:
+    """Переносит в архив сообщения всех рассылок, срок хранения сообщений
+    которых истек, и возвращает пути к архивам. По умолчанию параметры
+    берутся из настроек MESSAGE_ARCHIVE_*. Если каталог архивов не задан,
+    вызывает ImproperlyConfigured.
+    """
+
+    if retention_days is None:
+        retention_days = settings.MESSAGE_ARCHIVE_RETENTION_DAYS
+    if directory is None:
+        directory = settings.MESSAGE_ARCHIVE_DIR
+    if not directory:
+        raise ImproperlyConfigured(
+            "Не задан каталог архивов сообщений MESSAGE_ARCHIVE_DIR."
+        )
+    if chunk_size is None:
+        chunk_size = settings.MESSAGE_ARCHIVE_CHUNK_SIZE
+    mailing_ids = list(
+        get_archivable_mailings(retention_days).values_list("id", flat=True)
+    )
+    return [
+        archive_mailing(mailing_id, directory, chunk_size)
+        for mailing_id in mailing_ids
+    ]
@@ -0,0 +1,26 @@
+from django.db import transaction
+from django.utils import timezone
+
+from api.business_logic.mailing_counters import increment_sent_counters
+from api.models import Message
+
+
+def mark_messages_sent(message_ids: list[int]) -> int:
+    """Отмечает сообщения отправленными одним запросом с текущим временем
+    отправки, увеличивает счетчики отправленных сообщений их рассылок и
+    возвращает количество сообщений, статус которых изменился.
+    """
+
+    with transaction.atomic():
+        messages = list(
+            Message.objects.select_for_update()
+            .filter(id__in=message_ids, is_sent=False)
+            .values_list("id", "mailing_id")
+        )
+        if not messages:
+            return 0
+        updated = Message.objects.filter(
+            id__in=[message_id for message_id, _ in messages]
+        ).update(is_sent=True, sent_datetime=timezone.now())
+        increment_sent_counters([mailing_id for _, mailing_id in messages])
+    return updated
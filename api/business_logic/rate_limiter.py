@@ -0,0 +1,221 @@
+import asyncio
+import os
+import threading
+import time
+
+import redis
+from django.conf import settings
+
+KEY_PREFIX = "notification_service:rate_limit:"
+GLOBAL_BUCKET = "global"
+
+Bucket = tuple[str, float, float]
+
+_rate_limiter = None
+_rate_limiter_pid = None
+_rate_limiter_lock = threading.Lock()
+
+
+def _refill(
+    tokens: float | None,
+    timestamp: float | None,
+    rate: float,
+    capacity: float,
+    now: float,
+) -> float:
+    """Возвращает количество токенов в корзине на момент now."""
+
+    if tokens is None or timestamp is None:
+        return capacity
+    return min(capacity, tokens + max(0.0, now - timestamp) * rate)
+
+
+def _get_wait(tokens: float, rate: float) -> float:
+    """Возвращает время до появления в корзине одного токена."""
+
+    if tokens >= 1:
+        return 0.0
+    return (1 - tokens) / rate
+
+
+class LocalTokenBucketStorage:
+    """Хранилище корзин токенов в памяти процесса."""
+
+    def __init__(self):
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def take(self, buckets: list[Bucket], now: float) -> float:
+        """Забирает по одному токену из каждой корзины, если токены есть во
+        всех корзинах, иначе возвращает время ожидания в секундах.
+        """
+
+        with self._lock:
+            tokens = [
+                _refill(*self._buckets.get(key, (None, None)), rate, size, now)
+                for key, rate, size in buckets
+            ]
+            wait = max(
+                _get_wait(bucket_tokens, rate)
+                for bucket_tokens, (_, rate, _) in zip(tokens, buckets)
+            )
+            if wait == 0:
+                for bucket_tokens, (key, _, _) in zip(tokens, buckets):
+                    self._buckets[key] = (bucket_tokens - 1, now)
+            return wait
+
+
+class RedisTokenBucketStorage:
+    """Хранилище корзин токенов в Redis, общее для всех воркеров кластера.
+    Корзины проверяются и списываются в одной транзакции WATCH/MULTI, поэтому
+    хранилище работает и с fakeredis. При недоступности Redis или истечении
+    таймаута используется хранилище в памяти процесса.
+    """
+
+    def __init__(self, client: redis.Redis):
+        self._client = client
+        self._fallback = LocalTokenBucketStorage()
+
+    def take(self, buckets: list[Bucket], now: float) -> float:
+        """Забирает по одному токену из каждой корзины, если токены есть во
+        всех корзинах, иначе возвращает время ожидания в секундах.
+        """
+
+        keys = [KEY_PREFIX + key for key, _, _ in buckets]
+
+        def transaction(pipe: redis.client.Pipeline) -> float:
+            tokens = []
+            for key, (_, rate, size) in zip(keys, buckets):
+                state = pipe.hmget(key, "tokens", "timestamp")
+                tokens.append(
+                    _refill(
+                        *(None if v is None else float(v) for v in state),
+                        rate,
+                        size,
+                        now,
+                    )
+                )
+            wait = max(
+                _get_wait(bucket_tokens, rate)
+                for bucket_tokens, (_, rate, _) in zip(tokens, buckets)
+            )
+            pipe.multi()
+            if wait == 0:
+                for key, bucket_tokens, (_, rate, size) in zip(
+                    keys, tokens, buckets
+                ):
+                    pipe.hset(
+                        key,
+                        mapping={
+                            "tokens": bucket_tokens - 1,
+                            "timestamp": now,
+                        },
+                    )
+                    pipe.expire(key, int(size / rate) + 1)
+            return wait
+
+        try:
+            return self._client.transaction(
+                transaction, *keys, value_from_callable=True
+            )
+        except (
+            redis.exceptions.ConnectionError,
+            redis.exceptions.TimeoutError,
+        ):
+            return self._fallback.take(buckets, now)
+
+
+class RateLimiter:
+    """Ограничитель частоты запросов к внешнему API по алгоритму корзины
+    токенов с общим лимитом и лимитами по кодам мобильных операторов.
+    Лимиты задаются в запросах в секунду, размер корзины равен лимиту.
+    """
+
+    def __init__(
+        self,
+        storage: LocalTokenBucketStorage | RedisTokenBucketStorage,
+        rate: float = 0,
+        operator_rates: dict[int, float] | None = None,
+        default_operator_rate: float = 0,
+    ):
+        self._storage = storage
+        self._rate = rate
+        self._operator_rates = operator_rates or {}
+        self._default_operator_rate = default_operator_rate
+
+    def _get_buckets(self, mobile_operator_code: int) -> list[Bucket]:
+        """Возвращает корзины, из которых нужно взять токен для запроса."""
+
+        buckets = []
+        if self._rate > 0:
+            buckets.append((GLOBAL_BUCKET, self._rate, max(self._rate, 1)))
+        operator_rate = self._operator_rates.get(
+            mobile_operator_code, self._default_operator_rate
+        )
+        if operator_rate > 0:
+            buckets.append(
+                (
+                    f"operator:{mobile_operator_code}",
+                    operator_rate,
+                    max(operator_rate, 1),
+                )
+            )
+        return buckets
+
+    def try_acquire(self, mobile_operator_code: int) -> float:
+        """Пытается получить разрешение на запрос и возвращает 0 в случае
+        успеха или время ожидания в секундах.
+        """
+
+        buckets = self._get_buckets(mobile_operator_code)
+        if not buckets:
+            return 0.0
+        return self._storage.take(buckets, time.time())
+
+    def acquire(self, mobile_operator_code: int) -> None:
+        """Ожидает разрешения на запрос к внешнему API."""
+
+        while wait := self.try_acquire(mobile_operator_code):
+            time.sleep(wait)
+
+    async def acquire_async(self, mobile_operator_code: int) -> None:
+        """Ожидает разрешения на запрос к внешнему API, не блокируя цикл
+        событий: обращения к хранилищу корзин выполняются в отдельном потоке.
+        """
+
+        if not self._get_buckets(mobile_operator_code):
+            return
+        while wait := await asyncio.to_thread(
+            self.try_acquire, mobile_operator_code
+        ):
+            await asyncio.sleep(wait)
+
+
+def get_rate_limiter() -> RateLimiter:
+    """Возвращает ограничитель частоты запросов текущего процесса, созданный
+    по настройкам PROVIDER_RATE_LIMIT*. Если PROVIDER_RATE_LIMIT_REDIS_URL не
+    задан, лимиты действуют в пределах процесса.
+    """
+
+    global _rate_limiter, _rate_limiter_pid
+    with _rate_limiter_lock:
+        if _rate_limiter is None or _rate_limiter_pid != os.getpid():
+            if settings.PROVIDER_RATE_LIMIT_REDIS_URL:
+                timeout = settings.PROVIDER_RATE_LIMIT_REDIS_TIMEOUT
+                storage = RedisTokenBucketStorage(
+                    redis.Redis.from_url(
+                        settings.PROVIDER_RATE_LIMIT_REDIS_URL,
+                        socket_timeout=timeout,
+                        socket_connect_timeout=timeout,
+                    )
+                )
+            else:
+                storage = LocalTokenBucketStorage()
+            _rate_limiter = RateLimiter(
+                storage,
+                rate=settings.PROVIDER_RATE_LIMIT,
+                operator_rates=settings.PROVIDER_OPERATOR_RATE_LIMITS,
+                default_operator_rate=settings.PROVIDER_OPERATOR_RATE_LIMIT,
+            )
+            _rate_limiter_pid = os.getpid()
+        return _rate_limiter
@@ -1,28 +1,158 @@
 import os
+import threading
+import time
+from typing import Any
 
 import requests
+from django.conf import settings
 from dotenv import load_dotenv, find_dotenv
+from requests.adapters import HTTPAdapter
 
+from api.business_logic.adaptive_concurrency import get_concurrency_limiter
+from api.business_logic.circuit_breaker import (
+    CircuitBreaker,
+    get_circuit_breaker,
+)
+from api.business_logic.rate_limiter import get_rate_limiter
+from api.exceptions import BadStatusCodeError, CircuitOpenError
 from api.models import Mailing, Client
 
 load_dotenv(find_dotenv())
 
 BASE_URL = os.environ["BASE_URL"]
 TOKEN = os.environ["TOKEN"]
+REQUEST_TIMEOUT = (5, 5)
 
+_session = None
+_session_pid = None
+_session_lock = threading.Lock()
 
-def post_message(
-    mailing: Mailing, client: Client, message_id: int
-) -> requests.Response:
-    """Отправляет на внешний API запрос об отправке сообщения в соответствии с
-    рассылкой.
+
+def get_session() -> requests.Session:
+    """Возвращает сессию с пулом keep-alive соединений с внешним API.
+    Сессия создается лениво и отдельно для каждого процесса, поэтому
+    соединения не разделяются между процессами воркера после fork.
+    Повторные попытки отключены, их выполняет Celery.
+    """
+
+    global _session, _session_pid
+    with _session_lock:
+        if _session is None or _session_pid != os.getpid():
+            adapter = HTTPAdapter(
+                pool_connections=1,
+                pool_maxsize=settings.PROVIDER_HTTP_POOL_SIZE,
+                max_retries=0,
+            )
+            session = requests.Session()
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            _session = session
+            _session_pid = os.getpid()
+        return _session
+
+
+def build_request(
+    message_id: int, phone_number: int, text: str
+) -> tuple[str, dict[str, str], dict[str, Any]]:
+    """Формирует адрес, заголовки и тело запроса на внешний API об отправке
+    сообщения.
     """
 
     headers = {"Authorizatioin": TOKEN}
     json = {
         "id": message_id,
-        "phone": client.phone_number,
-        "text": mailing.message_text,
+        "phone": phone_number,
+        "text": text,
     }
     url = BASE_URL + f"/{message_id}"
-    return requests.post(url=url, headers=headers, json=json, timeout=(5, 5))
+    return url, headers, json
+
+
+def record_response(circuit_breaker: CircuitBreaker, status_code: int) -> None:
+    """Учитывает ответ внешнего API в автоматическом выключателе: ошибки
+    сервера считаются неудачей, остальные ответы - успехом.
+    """
+
+    if status_code >= 500:
+        circuit_breaker.record_failure()
+    else:
+        circuit_breaker.record_success()
+
+
+def post_payload(
+    message_id: int, phone_number: int, text: str
+) -> requests.Response:
+    """Отправляет на внешний API запрос об отправке сообщения с заданным
+    текстом на заданный номер телефона, соблюдая ограничения частоты и
+    конкурентности запросов. Если внешний API недоступен, сразу вызывает
+    CircuitOpenError, не расходуя лимит частоты запросов.
+    """
+
+    circuit_breaker = get_circuit_breaker()
+    circuit_breaker.before_call()
+    get_rate_limiter().acquire(Client.get_mobile_operator_code(phone_number))
+    url, headers, json = build_request(message_id, phone_number, text)
+    concurrency_limiter = get_concurrency_limiter()
+    if concurrency_limiter is not None:
+        concurrency_limiter.acquire()
+    started = time.monotonic()
+    success = False
+    try:
+        response = get_session().post(
+            url=url, headers=headers, json=json, timeout=REQUEST_TIMEOUT
+        )
+        success = response.status_code < 500
+    except requests.exceptions.RequestException:
+        circuit_breaker.record_failure()
+        raise
+    finally:
+        if concurrency_limiter is not None:
+            concurrency_limiter.release(time.monotonic() - started, success)
+    record_response(circuit_breaker, response.status_code)
+    return response
+
+
+def post_message(
+    mailing: Mailing, client: Client, message_id: int
+) -> requests.Response:
+    """Отправляет на внешний API запрос об отправке сообщения в соответствии с
+    рассылкой.
+    """
+
+    return post_payload(
+        message_id=message_id,
+        phone_number=client.phone_number,
+        text=mailing.message_text,
+    )
+
+
+def send_payloads(
+    text: str, recipients: list[list[int]]
+) -> tuple[list[int], list[list[int]], Exception | None]:
+    """Последовательно отправляет сообщения с одним текстом списку получателей
+    и возвращает идентификаторы отправленных сообщений, получателей, отправка
+    которым завершилась ошибкой, и последнюю ошибку. Если выключатель
+    разомкнут, оставшиеся получатели сразу считаются неотправленными.
+    """
+
+    sent_message_ids = []
+    failed_recipients = []
+    error = None
+    recipients = [list(recipient) for recipient in recipients]
+    for index, (message_id, phone_number) in enumerate(recipients):
+        try:
+            response = post_payload(
+                message_id=message_id, phone_number=phone_number, text=text
+            )
+            if response.status_code != 200:
+                raise BadStatusCodeError
+        except CircuitOpenError as e:
+            error = e
+            failed_recipients.extend(recipients[index:])
+            break
+        except (requests.exceptions.RequestException, BadStatusCodeError) as e:
+            error = e
+            failed_recipients.append([message_id, phone_number])
+            continue
+        sent_message_ids.append(message_id)
+    return sent_message_ids, failed_recipients, error
@@ -0,0 +1,82 @@
+from typing import Any
+
+from django.conf import settings
+from django.db import transaction
+
+from api.business_logic.change_stamps import (
+    SCOPE_STATISTICS,
+    get_shared_cache,
+    touch,
+)
+
+KEY_PREFIX = "notification_service:overall_statistics:"
+FIELDS = ("mailings_total", "messages_total", "messages_sent")
+
+
+def _get_keys() -> dict[str, str]:
+    """Возвращает ключи кэша для значений общей статистики."""
+
+    return {field: KEY_PREFIX + field for field in FIELDS}
+
+
+def get_cached_overall_statistics() -> dict[str, int] | None:
+    """Возвращает общую статистику из кэша или None, если ее там нет или
+    кэш не общий.
+    """
+
+    cache = get_shared_cache()
+    if cache is None:
+        return None
+    keys = _get_keys()
+    values = cache.get_many(keys.values())
+    if len(values) != len(keys):
+        return None
+    return {field: values[key] for field, key in keys.items()}
+
+
+def cache_overall_statistics(statistics: dict[str, Any]) -> None:
+    """Сохраняет значения общей статистики в кэш, если он общий."""
+
+    cache = get_shared_cache()
+    if cache is None:
+        return
+    cache.set_many(
+        {key: statistics[field] for field, key in _get_keys().items()},
+        timeout=settings.STATISTICS_CACHE_TTL,
+    )
+
+
+def _increment(deltas: dict[str, int]) -> None:
+    """Увеличивает значения общей статистики в кэше, если они там есть."""
+
+    cache = get_shared_cache()
+    if cache is None:
+        return
+    keys = _get_keys()
+    for field, delta in deltas.items():
+        if delta:
+            try:
+                cache.incr(keys[field], delta)
+            except ValueError:
+                pass
+
+
+def increment_overall_statistics(**deltas: int) -> None:
+    """Увеличивает значения общей статистики в кэше после фиксации текущей
+    транзакции, чтобы отмененные изменения не попадали в кэш, и отмечает
+    изменение статистики.
+    """
+
+    transaction.on_commit(lambda: _increment(deltas))
+    touch(SCOPE_STATISTICS)
+
+
+def invalidate_overall_statistics() -> None:
+    """Удаляет общую статистику из кэша после фиксации текущей транзакции,
+    чтобы следующий запрос пересчитал ее, и отмечает изменение статистики.
+    """
+
+    cache = get_shared_cache()
+    if cache is not None:
+        transaction.on_commit(lambda: cache.delete_many(_get_keys().values()))
+    touch(SCOPE_STATISTICS)
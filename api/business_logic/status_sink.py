@@ -0,0 +1,128 @@
+import atexit
+import logging
+import os
+import threading
+
+from celery.signals import worker_process_shutdown, worker_shutdown
+from django.conf import settings
+from django.db import connection
+
+from api.business_logic.message_status import mark_messages_sent
+
+logger = logging.getLogger(__name__)
+
+_status_sink = None
+_status_sink_pid = None
+_status_sink_lock = threading.Lock()
+
+
+class StatusSink:
+    """Буфер статусов доставки сообщений в процессе воркера. Накопленные
+    идентификаторы отправленных сообщений записываются в БД одним запросом,
+    когда их количество достигает flush_size или через flush_interval секунд
+    после появления первого из них.
+    """
+
+    def __init__(self, flush_size: int, flush_interval: float):
+        self._flush_size = flush_size
+        self._flush_interval = flush_interval
+        self._message_ids = []
+        self._lock = threading.Lock()
+        self._timer = None
+
+    def _take(self) -> list[int]:
+        """Забирает накопленные идентификаторы и останавливает таймер."""
+
+        message_ids, self._message_ids = self._message_ids, []
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        return message_ids
+
+    def _schedule(self) -> None:
+        """Запускает таймер сброса буфера, если в буфере есть статусы и
+        таймер еще не запущен. Вызывается под блокировкой буфера.
+        """
+
+        if self._message_ids and self._timer is None:
+            self._timer = threading.Timer(
+                self._flush_interval, self._flush_by_timer
+            )
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _write(self, message_ids: list[int]) -> None:
+        """Записывает статусы в БД, возвращая их в буфер при ошибке и
+        запуская таймер повторного сброса.
+        """
+
+        try:
+            mark_messages_sent(message_ids)
+        except Exception:
+            with self._lock:
+                self._message_ids[:0] = message_ids
+                self._schedule()
+            raise
+
+    def _flush_by_timer(self) -> None:
+        """Сбрасывает буфер по таймеру и закрывает соединение с БД, открытое
+        в потоке таймера. Ошибка записи записывается в журнал, статусы
+        остаются в буфере до следующего срабатывания таймера.
+        """
+
+        try:
+            self.flush()
+        except Exception:
+            logger.exception("Не удалось записать статусы доставки сообщений")
+        finally:
+            connection.close()
+
+    def add(self, message_ids: list[int]) -> None:
+        """Добавляет идентификаторы отправленных сообщений в буфер."""
+
+        with self._lock:
+            self._message_ids.extend(message_ids)
+            if len(self._message_ids) >= self._flush_size:
+                message_ids = self._take()
+            else:
+                message_ids = []
+                self._schedule()
+        if message_ids:
+            self._write(message_ids)
+
+    def flush(self) -> None:
+        """Записывает все накопленные статусы в БД."""
+
+        with self._lock:
+            message_ids = self._take()
+        if message_ids:
+            self._write(message_ids)
+
+
+def get_status_sink() -> StatusSink:
+    """Возвращает буфер статусов доставки текущего процесса, созданный по
+    настройкам MESSAGE_STATUS_FLUSH_*.
+    """
+
+    global _status_sink, _status_sink_pid
+    with _status_sink_lock:
+        if _status_sink is None or _status_sink_pid != os.getpid():
+            _status_sink = StatusSink(
+                flush_size=settings.MESSAGE_STATUS_FLUSH_SIZE,
+                flush_interval=settings.MESSAGE_STATUS_FLUSH_INTERVAL_MS
+                / 1000,
+            )
+            _status_sink_pid = os.getpid()
+        return _status_sink
+
+
+@worker_process_shutdown.connect
+@worker_shutdown.connect
+def flush_status_sink(**kwargs) -> None:
+    """Записывает накопленные статусы при остановке процесса воркера."""
+
+    if _status_sink is not None and _status_sink_pid == os.getpid():
+        _status_sink.flush()
+
+
+atexit.register(flush_status_sink)
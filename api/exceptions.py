@@ -1,2 +1,8 @@
 class BadStatusCodeError(Exception):
     pass
+
+
+class CircuitOpenError(Exception):
+    def __init__(self, retry_after: float):
+        super().__init__(f"Circuit is open, retry after {retry_after:.1f}s")
+        self.retry_after = retry_after
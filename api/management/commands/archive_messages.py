@@ -0,0 +1,60 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from api.business_logic.message_archive import (
+    archive_mailings,
+    get_archivable_mailings,
+)
+
+
+class Command(BaseCommand):
+    """Команда переноса сообщений закончившихся рассылок в архив."""
+
+    help = (
+        "Переносит сообщения рассылок, срок хранения сообщений которых "
+        "истек, в сжатые файлы NDJSON и удаляет их из БД."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--retention-days",
+            type=int,
+            default=settings.MESSAGE_ARCHIVE_RETENTION_DAYS,
+            help="Срок хранения сообщений после окончания рассылки в днях.",
+        )
+        parser.add_argument(
+            "--dir",
+            default=settings.MESSAGE_ARCHIVE_DIR,
+            help="Каталог для архивов.",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=settings.MESSAGE_ARCHIVE_CHUNK_SIZE,
+            help="Количество сообщений, читаемых и удаляемых за один шаг.",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Только вывести рассылки, сообщения которых будут перенесены.",
+        )
+
+    def handle(self, *args, **options):
+        if options["dry_run"]:
+            mailing_ids = get_archivable_mailings(
+                options["retention_days"]
+            ).values_list("id", flat=True)
+            for mailing_id in mailing_ids:
+                self.stdout.write(str(mailing_id))
+            return
+        if not options["dir"]:
+            raise CommandError(
+                "Укажите каталог архивов --dir или MESSAGE_ARCHIVE_DIR."
+            )
+        paths = archive_mailings(
+            retention_days=options["retention_days"],
+            directory=options["dir"],
+            chunk_size=options["chunk_size"],
+        )
+        for path in paths:
+            self.stdout.write(str(path))
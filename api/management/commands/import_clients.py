@@ -0,0 +1,48 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from api.business_logic.client_import import (
+    IMPORT_FORMATS,
+    get_import_format,
+    import_clients,
+    iter_rows,
+)
+
+
+class Command(BaseCommand):
+    """Команда массового импорта клиентов из файла."""
+
+    help = (
+        "Создает или обновляет клиентов по номеру телефона из файла CSV с "
+        "заголовком phone_number,tag или из файла NDJSON."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="Путь к файлу импорта.")
+        parser.add_argument(
+            "--input-format",
+            choices=IMPORT_FORMATS,
+            help="Формат файла, по умолчанию определяется по расширению.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=settings.CLIENT_IMPORT_BATCH_SIZE,
+            help="Количество записей, записываемых в БД за один шаг.",
+        )
+
+    def handle(self, *args, **options):
+        import_format = options["input_format"] or get_import_format(
+            options["path"]
+        )
+        with open(options["path"], encoding="utf-8-sig", newline="") as lines:
+            result = import_clients(
+                iter_rows(lines, import_format),
+                batch_size=options["batch_size"],
+            )
+        for error in result["errors"]:
+            self.stderr.write(f"{error['row']}: {' '.join(error['error'])}")
+        self.stdout.write(
+            f"Импортировано клиентов: {result['clients_imported']}, "
+            f"отклонено: {result['clients_rejected']}"
+        )
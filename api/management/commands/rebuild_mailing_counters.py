@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from api.business_logic.mailing_counters import rebuild_counters
+
+
+class Command(BaseCommand):
+    """Команда пересчета счетчиков сообщений рассылок по таблице сообщений."""
+
+    help = "Пересчитывает счетчики сообщений рассылок по таблице сообщений."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--check",
+            action="store_true",
+            help="Только проверить счетчики, не изменяя их.",
+        )
+
+    def handle(self, *args, **options):
+        mismatched_ids = rebuild_counters(check=options["check"])
+        if options["check"] and mismatched_ids:
+            raise CommandError(
+                "Счетчики расходятся с сообщениями у рассылок: "
+                + ", ".join(map(str, mismatched_ids))
+            )
+        if mismatched_ids:
+            self.stdout.write(
+                "Исправлены счетчики рассылок: "
+                + ", ".join(map(str, mismatched_ids))
+            )
+        else:
+            self.stdout.write("Счетчики рассылок совпадают с сообщениями.")
@@ -0,0 +1,68 @@
+import json
+import logging
+import os
+import threading
+import time
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+_gauges = {}
+_summaries = {}
+_lock = threading.Lock()
+_logged_at = time.monotonic()
+
+
+def set_gauge(name: str, value: float) -> None:
+    """Устанавливает текущее значение метрики процесса."""
+
+    with _lock:
+        _gauges[name] = value
+    logger.debug("%s=%s", name, value)
+    _log_metrics_if_due()
+
+
+def observe(name: str, value: float) -> None:
+    """Учитывает наблюдение метрики процесса: количество наблюдений, их
+    сумму и максимальное значение.
+    """
+
+    with _lock:
+        count, total, maximum = _summaries.get(name, (0, 0, value))
+        _summaries[name] = (count + 1, total + value, max(maximum, value))
+    logger.debug("%s=%s", name, value)
+    _log_metrics_if_due()
+
+
+def get_metrics() -> dict[str, float]:
+    """Возвращает текущие значения метрик процесса."""
+
+    with _lock:
+        metrics = dict(_gauges)
+        for name, (count, total, maximum) in _summaries.items():
+            metrics[f"{name}_count"] = count
+            metrics[f"{name}_sum"] = total
+            metrics[f"{name}_max"] = maximum
+        return metrics
+
+
+def _log_metrics_if_due() -> None:
+    """Записывает в журнал на уровне INFO все метрики процесса в формате
+    JSON, если с прошлой записи прошло METRICS_LOG_INTERVAL секунд.
+    """
+
+    global _logged_at
+    interval = settings.METRICS_LOG_INTERVAL
+    if interval <= 0:
+        return
+    now = time.monotonic()
+    with _lock:
+        if now - _logged_at < interval:
+            return
+        _logged_at = now
+    logger.info(
+        "metrics pid=%s %s",
+        os.getpid(),
+        json.dumps(get_metrics(), sort_keys=True),
+    )
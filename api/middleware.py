@@ -0,0 +1,72 @@
+import logging
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+
+from api.metrics import observe
+
+logger = logging.getLogger(__name__)
+
+QUERY_COUNT_HEADER = "X-Query-Count"
+QUERY_TIME_HEADER = "X-Query-Time-Ms"
+
+
+class QueryCounter:
+    """Обертка выполнения запросов к БД, подсчитывающая их количество и
+    суммарное время.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.time = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.monotonic()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.count += 1
+            self.time += time.monotonic() - started
+
+
+class QueryBudgetMiddleware:
+    """Промежуточный слой, учитывающий количество и время запросов к БД при
+    обработке запроса к API. Значения записываются в метрики
+    api_query_count:<эндпоинт> и api_query_time_ms:<эндпоинт>, в режиме
+    отладки добавляются в заголовки ответа, а при превышении
+    API_QUERY_BUDGET запросов к БД записывается предупреждение в лог.
+    Запросы, выполняемые при чтении потокового ответа, не учитываются.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        counter = QueryCounter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(counter))
+            response = self.get_response(request)
+        resolver_match = request.resolver_match
+        endpoint = (
+            resolver_match.view_name if resolver_match is not None else None
+        )
+        if endpoint is None:
+            return response
+        query_time_ms = round(counter.time * 1000, 3)
+        observe(f"api_query_count:{endpoint}", counter.count)
+        observe(f"api_query_time_ms:{endpoint}", query_time_ms)
+        if settings.DEBUG:
+            response[QUERY_COUNT_HEADER] = counter.count
+            response[QUERY_TIME_HEADER] = query_time_ms
+        if 0 < settings.API_QUERY_BUDGET < counter.count:
+            logger.warning(
+                "%s %s: %s запросов к БД при бюджете %s",
+                request.method,
+                endpoint,
+                counter.count,
+                settings.API_QUERY_BUDGET,
+            )
+        return response
@@ -0,0 +1,153 @@
+# Generated by Django 4.2.9 on 2026-10-18 19:10
+
+import django.core.validators
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name="client",
+            options={"verbose_name": "Клиент", "verbose_name_plural": "Клиенты"},
+        ),
+        migrations.AlterModelOptions(
+            name="filter",
+            options={"verbose_name": "Фильтр", "verbose_name_plural": "Фильтры"},
+        ),
+        migrations.AlterModelOptions(
+            name="mailing",
+            options={"verbose_name": "Рассылка", "verbose_name_plural": "Рассылки"},
+        ),
+        migrations.AlterModelOptions(
+            name="message",
+            options={"verbose_name": "Сообщение", "verbose_name_plural": "Сообщения"},
+        ),
+        migrations.AlterModelOptions(
+            name="tag",
+            options={"verbose_name": "Тэг", "verbose_name_plural": "Тэги"},
+        ),
+        migrations.AlterField(
+            model_name="client",
+            name="mobile_operator_code",
+            field=models.IntegerField(
+                blank=True, verbose_name="Код мобильного оператора"
+            ),
+        ),
+        migrations.AlterField(
+            model_name="client",
+            name="phone_number",
+            field=models.IntegerField(
+                unique=True,
+                validators=[
+                    django.core.validators.MaxValueValidator(79999999999),
+                    django.core.validators.MinValueValidator(70000000000),
+                ],
+                verbose_name="Номер телефона",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="client",
+            name="tag",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="clients",
+                to="api.tag",
+                verbose_name="Тэг",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="filter",
+            name="mobile_operator_code",
+            field=models.IntegerField(verbose_name="Код мобильного оператора"),
+        ),
+        migrations.AlterField(
+            model_name="filter",
+            name="tag",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="filters",
+                to="api.tag",
+                verbose_name="Тэг",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="mailing",
+            name="end_datetime",
+            field=models.DateTimeField(verbose_name="Дата и время окончания"),
+        ),
+        migrations.AlterField(
+            model_name="mailing",
+            name="filter",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="mailings",
+                to="api.filter",
+                verbose_name="Фильтр",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="mailing",
+            name="message_text",
+            field=models.TextField(verbose_name="Текст сообщения"),
+        ),
+        migrations.AlterField(
+            model_name="mailing",
+            name="start_datetime",
+            field=models.DateTimeField(verbose_name="Дата и время начала"),
+        ),
+        migrations.AlterField(
+            model_name="message",
+            name="client",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="messages",
+                to="api.client",
+                verbose_name="Клиент",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="message",
+            name="created_datetime",
+            field=models.DateTimeField(
+                auto_now=True, verbose_name="Дата и время создания"
+            ),
+        ),
+        migrations.AlterField(
+            model_name="message",
+            name="is_sent",
+            field=models.BooleanField(default=False, verbose_name="Отправлено"),
+        ),
+        migrations.AlterField(
+            model_name="message",
+            name="mailing",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="messages",
+                to="api.mailing",
+                verbose_name="Рассылка",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="tag",
+            name="name",
+            field=models.CharField(max_length=50, unique=True, verbose_name="Название"),
+        ),
+        migrations.AddIndex(
+            model_name="client",
+            index=models.Index(
+                fields=["tag", "mobile_operator_code", "id"], name="client_audience_idx"
+            ),
+        ),
+    ]
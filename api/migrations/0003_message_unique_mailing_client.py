@@ -0,0 +1,43 @@
+# Generated by Django 4.2.9 on 2026-10-18 19:13
+
+from django.db import migrations
+from django.db.models import Count
+
+
+def remove_duplicate_messages(apps, schema_editor):
+    """Оставляет по одному сообщению для каждой пары рассылка-клиент,
+    отдавая предпочтение отправленным.
+    """
+
+    Message = apps.get_model("api", "Message")
+    duplicates = (
+        Message.objects.values("mailing", "client")
+        .annotate(count=Count("id"))
+        .filter(count__gt=1)
+    )
+    for duplicate in duplicates:
+        message_ids = list(
+            Message.objects.filter(
+                mailing=duplicate["mailing"], client=duplicate["client"]
+            )
+            .order_by("-is_sent", "id")
+            .values_list("id", flat=True)
+        )
+        Message.objects.filter(id__in=message_ids[1:]).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0002_client_audience_idx"),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            remove_duplicate_messages, migrations.RunPython.noop
+        ),
+        migrations.AlterUniqueTogether(
+            name="message",
+            unique_together={("mailing", "client")},
+        ),
+    ]
@@ -0,0 +1,56 @@
+# Generated by Django 4.2.9 on 2026-10-18 19:27
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0003_message_unique_mailing_client"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="MailingDispatch",
+            fields=[
+                (
+                    "mailing",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="dispatch",
+                        serialize=False,
+                        to="api.mailing",
+                        verbose_name="Рассылка",
+                    ),
+                ),
+                (
+                    "last_client_id",
+                    models.BigIntegerField(
+                        default=0, verbose_name="Последний обработанный клиент"
+                    ),
+                ),
+                (
+                    "chunks_published",
+                    models.PositiveIntegerField(
+                        default=0, verbose_name="Опубликовано пачек"
+                    ),
+                ),
+                (
+                    "is_finished",
+                    models.BooleanField(default=False, verbose_name="Завершен"),
+                ),
+                (
+                    "updated_datetime",
+                    models.DateTimeField(
+                        auto_now=True, verbose_name="Дата и время обновления"
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Запуск рассылки",
+                "verbose_name_plural": "Запуски рассылок",
+            },
+        ),
+    ]
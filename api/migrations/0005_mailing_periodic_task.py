@@ -0,0 +1,46 @@
+# Generated by Django 4.2.9 on 2026-10-18 19:29
+
+import json
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def link_periodic_tasks(apps, schema_editor):
+    """Связывает существующие рассылки с их заданиями запуска."""
+
+    Mailing = apps.get_model("api", "Mailing")
+    PeriodicTask = apps.get_model("django_celery_beat", "PeriodicTask")
+    periodic_tasks = PeriodicTask.objects.filter(
+        task="api.tasks.start_mailing"
+    ).only("id", "kwargs")
+    for periodic_task in periodic_tasks.iterator():
+        mailing_id = json.loads(periodic_task.kwargs).get("mailing_id")
+        Mailing.objects.filter(
+            id=mailing_id, periodic_task__isnull=True
+        ).update(periodic_task=periodic_task.id)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("django_celery_beat", "0018_improve_crontab_helptext"),
+        ("api", "0004_mailingdispatch"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="mailing",
+            name="periodic_task",
+            field=models.OneToOneField(
+                blank=True,
+                editable=False,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="mailing",
+                to="django_celery_beat.periodictask",
+                verbose_name="Задание запуска",
+            ),
+        ),
+        migrations.RunPython(link_periodic_tasks, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 4.2.9 on 2026-10-18 19:30
+
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def mark_started_mailings(apps, schema_editor):
+    """Отмечает запущенными рассылки, время начала которых уже наступило."""
+
+    Mailing = apps.get_model("api", "Mailing")
+    Mailing.objects.filter(start_datetime__lte=timezone.now()).update(
+        is_launched=True
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0005_mailing_periodic_task"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="mailing",
+            name="is_launched",
+            field=models.BooleanField(
+                default=False, editable=False, verbose_name="Запущена"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="mailing",
+            index=models.Index(
+                fields=["is_launched", "start_datetime"], name="mailing_due_idx"
+            ),
+        ),
+        migrations.RunPython(mark_started_mailings, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 4.2.9 on 2026-10-18 19:33
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0006_mailing_is_launched"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="MailingCounters",
+            fields=[
+                (
+                    "mailing",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="counters",
+                        serialize=False,
+                        to="api.mailing",
+                        verbose_name="Рассылка",
+                    ),
+                ),
+                (
+                    "messages_total",
+                    models.PositiveIntegerField(
+                        default=0, verbose_name="Всего сообщений"
+                    ),
+                ),
+                (
+                    "messages_sent",
+                    models.PositiveIntegerField(
+                        default=0, verbose_name="Отправлено сообщений"
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Счетчики рассылки",
+                "verbose_name_plural": "Счетчики рассылок",
+            },
+        ),
+    ]
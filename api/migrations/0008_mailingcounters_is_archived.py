@@ -0,0 +1,18 @@
+# Generated by Django 4.2.9 on 2026-10-18 19:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0007_mailingcounters"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="mailingcounters",
+            name="is_archived",
+            field=models.BooleanField(default=False, verbose_name="Сообщения в архиве"),
+        ),
+    ]
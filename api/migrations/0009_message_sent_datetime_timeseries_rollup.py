@@ -0,0 +1,84 @@
+# Generated by Django 4.2.9 on 2026-10-18 19:50
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0008_mailingcounters_is_archived"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="MailingTimeseriesRollup",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "bucket",
+                    models.CharField(
+                        choices=[
+                            ("second", "Секунда"),
+                            ("minute", "Минута"),
+                            ("hour", "Час"),
+                        ],
+                        max_length=10,
+                        verbose_name="Интервал",
+                    ),
+                ),
+                ("bucket_start", models.DateTimeField(verbose_name="Начало интервала")),
+                (
+                    "messages_sent",
+                    models.PositiveIntegerField(
+                        default=0, verbose_name="Отправлено сообщений"
+                    ),
+                ),
+                (
+                    "messages_failed",
+                    models.PositiveIntegerField(
+                        default=0, verbose_name="Не отправлено сообщений"
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Статистика рассылки за интервал",
+                "verbose_name_plural": "Статистика рассылок за интервалы",
+            },
+        ),
+        migrations.AddField(
+            model_name="message",
+            name="sent_datetime",
+            field=models.DateTimeField(
+                blank=True, null=True, verbose_name="Дата и время отправки"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="message",
+            index=models.Index(
+                fields=["mailing", "sent_datetime"], name="message_mailing_sent_idx"
+            ),
+        ),
+        migrations.AddField(
+            model_name="mailingtimeseriesrollup",
+            name="mailing",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="timeseries_rollups",
+                to="api.mailing",
+                verbose_name="Рассылка",
+            ),
+        ),
+        migrations.AlterUniqueTogether(
+            name="mailingtimeseriesrollup",
+            unique_together={("mailing", "bucket", "bucket_start")},
+        ),
+    ]
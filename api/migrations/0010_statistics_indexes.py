@@ -0,0 +1,29 @@
+# Generated by Django 4.2.9 on 2026-10-18 19:52
+
+from django.db import migrations, models
+import django.db.models.functions.comparison
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0009_message_sent_datetime_timeseries_rollup"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="mailingtimeseriesrollup",
+            index=models.Index(
+                fields=["bucket", "bucket_start"], name="rollup_bucket_start_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="message",
+            index=models.Index(
+                django.db.models.functions.comparison.Coalesce(
+                    "sent_datetime", "created_datetime"
+                ),
+                name="message_activity_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 4.2.9 on 2026-10-18 20:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0010_statistics_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="mailingcounters",
+            name="is_rolled_up",
+            field=models.BooleanField(
+                default=False, verbose_name="Статистика по интервалам сохранена"
+            ),
+        ),
+    ]
@@ -1,8 +1,10 @@
 import json
 
 from django_celery_beat.models import ClockedSchedule, PeriodicTask
+from django.conf import settings
 from django.core.validators import MaxValueValidator, MinValueValidator
 from django.db import models
+from django.db.models.functions import Coalesce
 
 
 class Tag(models.Model):
@@ -46,6 +48,7 @@ class Mailing(models.Model):
     """Модель рассылки."""
 
     TASK_NAME = "Mailing"
+    SCHEDULER_SWEEP = "sweep"
 
     start_datetime = models.DateTimeField(verbose_name="Дата и время начала")
     end_datetime = models.DateTimeField(verbose_name="Дата и время окончания")
@@ -58,8 +61,26 @@ class Mailing(models.Model):
         null=True,
         verbose_name="Фильтр",
     )
+    periodic_task = models.OneToOneField(
+        PeriodicTask,
+        on_delete=models.SET_NULL,
+        related_name="mailing",
+        blank=True,
+        null=True,
+        editable=False,
+        verbose_name="Задание запуска",
+    )
+    is_launched = models.BooleanField(
+        default=False, editable=False, verbose_name="Запущена"
+    )
 
     class Meta:
+        indexes = [
+            models.Index(
+                fields=["is_launched", "start_datetime"],
+                name="mailing_due_idx",
+            ),
+        ]
         verbose_name = "Рассылка"
         verbose_name_plural = "Рассылки"
 
@@ -70,17 +91,19 @@ class Mailing(models.Model):
 
     def save(self, *args, **kwargs):
         super().save(*args, **kwargs)
-        try:
-            periodic_task = PeriodicTask.objects.get(
-                kwargs__icontains=f'"mailing_id": {self.id}'
+        if self.periodic_task_id is not None:
+            clocked = ClockedSchedule.objects.get(
+                periodictask=self.periodic_task_id
             )
-            periodic_task.clocked.clocked_time = self.start_datetime
-            periodic_task.clocked.save()
-        except models.ObjectDoesNotExist:
+            clocked.clocked_time = self.start_datetime
+            clocked.save()
+        elif settings.MAILING_SCHEDULER == self.SCHEDULER_SWEEP:
+            return self
+        else:
             schedule = ClockedSchedule.objects.create(
                 clocked_time=self.start_datetime
             )
-            PeriodicTask.objects.create(
+            self.periodic_task = PeriodicTask.objects.create(
                 clocked=schedule,
                 name=(self.TASK_NAME + f" {self.id}"),
                 task="api.tasks.start_mailing",
@@ -92,12 +115,14 @@ class Mailing(models.Model):
                 expires=self.end_datetime,
                 one_off=True,
             )
+            super().save(update_fields=["periodic_task"])
         return self
 
     def delete(self, *args, **kwargs):
-        PeriodicTask.objects.get(
-            kwargs__icontains=f'"mailing_id": {self.id}'
-        ).delete()
+        if self.periodic_task_id is not None:
+            ClockedSchedule.objects.filter(
+                periodictask=self.periodic_task_id
+            ).delete()
         return super().delete(*args, **kwargs)
 
 
@@ -125,14 +150,28 @@ class Client(models.Model):
     )
 
     class Meta:
+        indexes = [
+            models.Index(
+                fields=["tag", "mobile_operator_code", "id"],
+                name="client_audience_idx",
+            ),
+        ]
         verbose_name = "Клиент"
         verbose_name_plural = "Клиенты"
 
     def __str__(self):
         return self.phone_number
 
+    @staticmethod
+    def get_mobile_operator_code(phone_number: int) -> int:
+        """Возвращает код мобильного оператора по номеру телефона."""
+
+        return int(str(phone_number)[1:4])
+
     def save(self, *args, **kwargs):
-        self.mobile_operator_code = int(str(self.phone_number)[1:4])
+        self.mobile_operator_code = self.get_mobile_operator_code(
+            self.phone_number
+        )
         return models.Model.save(self, *args, **kwargs)
 
 
@@ -143,6 +182,9 @@ class Message(models.Model):
         auto_now=True, verbose_name="Дата и время создания"
     )
     is_sent = models.BooleanField(default=False, verbose_name="Отправлено")
+    sent_datetime = models.DateTimeField(
+        blank=True, null=True, verbose_name="Дата и время отправки"
+    )
     mailing = models.ForeignKey(
         Mailing,
         on_delete=models.CASCADE,
@@ -157,8 +199,140 @@ class Message(models.Model):
     )
 
     class Meta:
+        indexes = [
+            models.Index(
+                fields=["mailing", "sent_datetime"],
+                name="message_mailing_sent_idx",
+            ),
+            models.Index(
+                Coalesce("sent_datetime", "created_datetime"),
+                name="message_activity_idx",
+            ),
+        ]
+        unique_together = ("mailing", "client")
         verbose_name = "Сообщение"
         verbose_name_plural = "Сообщения"
 
     def __str__(self):
         return f"{self.created_datetime}"
+
+
+class MailingDispatch(models.Model):
+    """Модель хода запуска рассылки, позволяющая продолжить запуск с места
+    остановки.
+    """
+
+    mailing = models.OneToOneField(
+        Mailing,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="dispatch",
+        verbose_name="Рассылка",
+    )
+    last_client_id = models.BigIntegerField(
+        default=0, verbose_name="Последний обработанный клиент"
+    )
+    chunks_published = models.PositiveIntegerField(
+        default=0, verbose_name="Опубликовано пачек"
+    )
+    is_finished = models.BooleanField(default=False, verbose_name="Завершен")
+    updated_datetime = models.DateTimeField(
+        auto_now=True, verbose_name="Дата и время обновления"
+    )
+
+    class Meta:
+        verbose_name = "Запуск рассылки"
+        verbose_name_plural = "Запуски рассылок"
+
+    def __str__(self):
+        return f"{self.mailing_id} - {self.last_client_id}"
+
+
+class MailingCounters(models.Model):
+    """Модель счетчиков сообщений рассылки, которые обновляются при создании
+    и отправке сообщений, чтобы статистика рассылки не пересчитывалась по
+    всем ее сообщениям. После переноса сообщений рассылки в архив счетчики
+    хранят ее итоговую статистику. Отметка о сохранении статистики по
+    интервалам времени снимается при каждом изменении счетчиков.
+    """
+
+    mailing = models.OneToOneField(
+        Mailing,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="counters",
+        verbose_name="Рассылка",
+    )
+    messages_total = models.PositiveIntegerField(
+        default=0, verbose_name="Всего сообщений"
+    )
+    messages_sent = models.PositiveIntegerField(
+        default=0, verbose_name="Отправлено сообщений"
+    )
+    is_archived = models.BooleanField(
+        default=False, verbose_name="Сообщения в архиве"
+    )
+    is_rolled_up = models.BooleanField(
+        default=False, verbose_name="Статистика по интервалам сохранена"
+    )
+
+    class Meta:
+        verbose_name = "Счетчики рассылки"
+        verbose_name_plural = "Счетчики рассылок"
+
+    def __str__(self):
+        return (
+            f"{self.mailing_id} - {self.messages_sent}/{self.messages_total}"
+        )
+
+    @property
+    def messages_failed(self) -> int:
+        """Возвращает количество неотправленных сообщений."""
+
+        return self.messages_total - self.messages_sent
+
+
+class MailingTimeseriesRollup(models.Model):
+    """Модель предварительно подсчитанной статистики рассылки за интервал
+    времени, которая сохраняется при переносе сообщений рассылки в архив.
+    """
+
+    BUCKET_SECOND = "second"
+    BUCKET_MINUTE = "minute"
+    BUCKET_HOUR = "hour"
+    BUCKET_CHOICES = [
+        (BUCKET_SECOND, "Секунда"),
+        (BUCKET_MINUTE, "Минута"),
+        (BUCKET_HOUR, "Час"),
+    ]
+
+    mailing = models.ForeignKey(
+        Mailing,
+        on_delete=models.CASCADE,
+        related_name="timeseries_rollups",
+        verbose_name="Рассылка",
+    )
+    bucket = models.CharField(
+        max_length=10, choices=BUCKET_CHOICES, verbose_name="Интервал"
+    )
+    bucket_start = models.DateTimeField(verbose_name="Начало интервала")
+    messages_sent = models.PositiveIntegerField(
+        default=0, verbose_name="Отправлено сообщений"
+    )
+    messages_failed = models.PositiveIntegerField(
+        default=0, verbose_name="Не отправлено сообщений"
+    )
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["bucket", "bucket_start"],
+                name="rollup_bucket_start_idx",
+            ),
+        ]
+        unique_together = ("mailing", "bucket", "bucket_start")
+        verbose_name = "Статистика рассылки за интервал"
+        verbose_name_plural = "Статистика рассылок за интервалы"
+
+    def __str__(self):
+        return f"{self.mailing_id} - {self.bucket} - {self.bucket_start}"
@@ -0,0 +1,15 @@
+from django.conf import settings
+from rest_framework.pagination import CursorPagination
+
+
+class IdCursorPagination(CursorPagination):
+    """Пагинация списков по курсору на основе идентификатора: страница
+    выбирается условием по индексу первичного ключа без OFFSET, поэтому
+    стоимость запроса не зависит от номера страницы, а добавление записей не
+    сдвигает страницы. Размер страницы задается параметром page_size, но не
+    больше API_MAX_PAGE_SIZE.
+    """
+
+    ordering = "id"
+    page_size_query_param = "page_size"
+    max_page_size = settings.API_MAX_PAGE_SIZE
@@ -1,6 +1,15 @@
 from rest_framework import serializers
 
-from api.models import Client, Filter, Mailing, Tag
+from api.business_logic.client_import import IMPORT_FORMATS
+from api.business_logic.export import EXPORT_COMPRESSIONS
+from api.business_logic.mailing_statistics import GROUP_BY_CHOICES
+from api.models import (
+    Client,
+    Filter,
+    Mailing,
+    MailingTimeseriesRollup,
+    Tag,
+)
 
 
 class TagSerializer(serializers.ModelSerializer):
@@ -41,6 +50,119 @@ class ClientSerializer(serializers.ModelSerializer):
         return instance
 
 
+class ClientImportSerializer(serializers.Serializer):
+    """Сериализатор файла массового импорта клиентов."""
+
+    file = serializers.FileField()
+    input_format = serializers.ChoiceField(
+        choices=IMPORT_FORMATS, required=False
+    )
+
+
+class ClientSelectionFilterSerializer(serializers.Serializer):
+    """Сериализатор фильтра клиентов для массовых операций."""
+
+    mobile_operator_code = serializers.IntegerField(required=False)
+    tag = TagSerializer(required=False)
+
+    def validate(self, attrs):
+        if not attrs:
+            raise serializers.ValidationError(
+                "Укажите тэг или код мобильного оператора."
+            )
+        return attrs
+
+
+class ClientSelectionSerializer(serializers.Serializer):
+    """Сериализатор выборки клиентов для массовых операций: по списку
+    идентификаторов или по фильтру.
+    """
+
+    ids = serializers.ListField(
+        child=serializers.IntegerField(), allow_empty=False, required=False
+    )
+    filter = ClientSelectionFilterSerializer(required=False)
+
+    def validate(self, attrs):
+        if ("ids" in attrs) == ("filter" in attrs):
+            raise serializers.ValidationError("Укажите либо ids, либо filter.")
+        return attrs
+
+    def get_selection(self) -> dict:
+        """Возвращает параметры выборки клиентов."""
+
+        selection_filter = self.validated_data.get("filter", {})
+        tag = selection_filter.get("tag")
+        return {
+            "ids": self.validated_data.get("ids"),
+            "tag_name": None if tag is None else tag["name"],
+            "mobile_operator_code": selection_filter.get(
+                "mobile_operator_code"
+            ),
+        }
+
+
+class ClientBulkUpdateSerializer(ClientSelectionSerializer):
+    """Сериализатор массового изменения тэга клиентов."""
+
+    tag = TagSerializer(allow_null=True)
+
+
+class TimeseriesQuerySerializer(serializers.Serializer):
+    """Сериализатор параметров статистики рассылки по интервалам времени."""
+
+    bucket = serializers.ChoiceField(
+        choices=MailingTimeseriesRollup.BUCKET_CHOICES,
+        default=MailingTimeseriesRollup.BUCKET_MINUTE,
+    )
+
+
+class OverallStatisticsQuerySerializer(serializers.Serializer):
+    """Сериализатор параметров фильтрации и группировки общей статистики."""
+
+    tag = serializers.CharField(required=False)
+    mobile_operator_code = serializers.IntegerField(required=False)
+    date_from = serializers.DateField(required=False)
+    date_to = serializers.DateField(required=False)
+    group_by = serializers.ChoiceField(
+        choices=GROUP_BY_CHOICES, required=False
+    )
+
+
+class BulkDetailedStatisticsSerializer(serializers.Serializer):
+    """Сериализатор выборки рассылок для статистики по нескольким рассылкам:
+    по списку идентификаторов или по датам начала рассылок.
+    """
+
+    ids = serializers.ListField(
+        child=serializers.IntegerField(), allow_empty=False, required=False
+    )
+    date_from = serializers.DateField(required=False)
+    date_to = serializers.DateField(required=False)
+
+    def validate(self, attrs):
+        has_dates = "date_from" in attrs or "date_to" in attrs
+        if ("ids" in attrs) == has_dates:
+            raise serializers.ValidationError(
+                "Укажите либо ids, либо date_from и/или date_to."
+            )
+        return attrs
+
+
+class ExportQuerySerializer(serializers.Serializer):
+    """Сериализатор параметров выгрузки."""
+
+    compression = serializers.ChoiceField(
+        choices=EXPORT_COMPRESSIONS, required=False
+    )
+
+
+class MessageExportQuerySerializer(ExportQuerySerializer):
+    """Сериализатор параметров выгрузки результатов отправки сообщений."""
+
+    mailing = serializers.IntegerField(required=False)
+
+
 class FilterSerializer(serializers.ModelSerializer):
     """Сериализатор фильтров."""
 
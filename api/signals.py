@@ -0,0 +1,58 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from api.business_logic.change_stamps import (
+    SCOPE_CLIENTS,
+    SCOPE_MAILINGS,
+    touch,
+)
+from api.business_logic.statistics_cache import (
+    increment_overall_statistics,
+    invalidate_overall_statistics,
+)
+from api.models import Client, Filter, Mailing, Tag
+
+
+@receiver(post_save, sender=Mailing)
+def count_created_mailing(sender, instance, created, **kwargs):
+    """Учитывает созданную рассылку в общей статистике в кэше и отмечает
+    изменение рассылок.
+    """
+
+    if created:
+        increment_overall_statistics(mailings_total=1)
+    touch(SCOPE_MAILINGS)
+
+
+@receiver(post_delete, sender=Mailing)
+@receiver(post_delete, sender=Client)
+def reset_overall_statistics(sender, instance, **kwargs):
+    """Сбрасывает общую статистику в кэше при удалении рассылки или клиента,
+    так как вместе с ними удаляются их сообщения.
+    """
+
+    invalidate_overall_statistics()
+    touch(SCOPE_MAILINGS if sender is Mailing else SCOPE_CLIENTS)
+
+
+@receiver(post_save, sender=Client)
+def touch_clients(sender, instance, **kwargs):
+    """Отмечает изменение клиентов."""
+
+    touch(SCOPE_CLIENTS)
+
+
+@receiver(post_save, sender=Tag)
+@receiver(post_delete, sender=Tag)
+def touch_tagged(sender, instance, **kwargs):
+    """Отмечает изменение клиентов и рассылок, в которые вложены тэги."""
+
+    touch(SCOPE_CLIENTS, SCOPE_MAILINGS)
+
+
+@receiver(post_save, sender=Filter)
+@receiver(post_delete, sender=Filter)
+def touch_filtered(sender, instance, **kwargs):
+    """Отмечает изменение рассылок, в которые вложены фильтры."""
+
+    touch(SCOPE_MAILINGS)
@@ -1,51 +1,264 @@
 import requests
-from celery import group, shared_task
+from celery import Signature, group, shared_task
+from celery.utils.time import get_exponential_backoff_interval
+from django.conf import settings
+from django.utils import timezone
 
-from api.business_logic.send_message import post_message
-from api.exceptions import BadStatusCodeError
+from api.business_logic import async_sender
+from api.business_logic.mailing_dispatch import (
+    create_messages,
+    finish_dispatch,
+    get_dispatch_checkpoint,
+    get_mailing_clients,
+    iter_client_id_chunks,
+    save_dispatch_checkpoint,
+    split_into_batches,
+)
+from api.business_logic.mailing_timeseries import build_finished_rollups
+from api.business_logic.message_archive import archive_mailings
+from api.business_logic.message_status import mark_messages_sent
+from api.business_logic.send_message import post_message, send_payloads
+from api.business_logic.status_sink import get_status_sink
+from api.exceptions import BadStatusCodeError, CircuitOpenError
 from api.models import Client, Mailing, Message
 
+RETRY_BACKOFF_MAX = 60
+SEND_MODE_PAYLOAD = "payload"
+SENDER_ENGINE_ASYNC = "async"
+SWEEP_BATCH_SIZE = 100
+
+
+def _send_payloads(
+    text: str, recipients: list[list[int]]
+) -> tuple[list[int], list[list[int]], Exception | None]:
+    """Отправляет пачку сообщений способом, заданным в MAILING_SENDER_ENGINE."""
+
+    if settings.MAILING_SENDER_ENGINE == SENDER_ENGINE_ASYNC:
+        return async_sender.send_payloads(text, recipients)
+    return send_payloads(text, recipients)
+
+
+def _save_sent_statuses(message_ids: list[int]) -> None:
+    """Записывает статусы отправленных сообщений сразу или через буфер
+    статусов процесса, если включен MESSAGE_STATUS_WRITE_BEHIND.
+    """
+
+    if settings.MESSAGE_STATUS_WRITE_BEHIND:
+        get_status_sink().add(message_ids)
+    else:
+        mark_messages_sent(message_ids)
+
+
+def _get_retry_countdown(retries: int, error: Exception | None) -> float:
+    """Вычисляет задержку перед повторной попыткой отправки пачки. Если
+    автоматический выключатель разомкнут, попытка откладывается как минимум
+    до его перехода в режим пробных запросов.
+    """
+
+    countdown = get_exponential_backoff_interval(
+        factor=1,
+        retries=retries,
+        maximum=RETRY_BACKOFF_MAX,
+        full_jitter=True,
+    )
+    if isinstance(error, CircuitOpenError):
+        countdown = max(countdown, error.retry_after)
+    return countdown
+
 
 @shared_task(
     bind=True,
     autoretry_for=(requests.exceptions.RequestException, BadStatusCodeError),
     retry_backoff=True,
-    retry_backoff_max=60,
+    retry_backoff_max=RETRY_BACKOFF_MAX,
     retry_jitter=True,
 )
-def send_message(self, mailing_id: int, client_id: int):
-    """Отправка одного запроса об отправке сообщения на внешний API."""
+def send_message(
+    self, mailing_id: int, client_id: int, message_id: int | None = None
+):
+    """Отправка одного запроса об отправке сообщения на внешний API.
+    Если сообщение уже создано, его идентификатор передается в message_id.
+    """
 
     mailing = Mailing.objects.get(id=mailing_id)
     client = Client.objects.get(id=client_id)
-    message = Message.objects.get_or_create(mailing=mailing, client=client)[0]
-    response = post_message(
-        mailing=mailing, client=client, message_id=message.id
-    )
+    if message_id is None:
+        message_id = Message.objects.get_or_create(
+            mailing=mailing, client=client
+        )[0].id
+    try:
+        response = post_message(
+            mailing=mailing, client=client, message_id=message_id
+        )
+    except CircuitOpenError as e:
+        raise self.retry(
+            exc=e, countdown=_get_retry_countdown(self.request.retries, e)
+        )
     if response.status_code != 200:
         raise BadStatusCodeError
-    message.is_sent = True
-    message.save()
+    _save_sent_statuses([message_id])
+
+
+@shared_task(bind=True)
+def send_message_batch(self, mailing_id: int, message_ids: list[int]):
+    """Отправка пачки запросов об отправке сообщений на внешний API.
+    Повторная попытка выполняется только для сообщений, отправка которых
+    завершилась ошибкой. Уже отправленные сообщения пропускаются.
+    """
+
+    mailing = Mailing.objects.get(id=mailing_id)
+    recipients = Message.objects.filter(
+        id__in=message_ids, is_sent=False
+    ).values_list("id", "client__phone_number")
+    sent_message_ids, failed_recipients, error = _send_payloads(
+        mailing.message_text, recipients
+    )
+    _save_sent_statuses(sent_message_ids)
+    if failed_recipients:
+        raise self.retry(
+            kwargs={
+                "mailing_id": mailing_id,
+                "message_ids": [
+                    message_id for message_id, _ in failed_recipients
+                ],
+            },
+            exc=error,
+            countdown=_get_retry_countdown(self.request.retries, error),
+        )
+
+
+@shared_task(bind=True)
+def send_message_payloads(
+    self, mailing_id: int, text: str, recipients: list[list[int]]
+):
+    """Отправка пачки запросов об отправке сообщений на внешний API по
+    переданным в задачу данным. Текст сообщения передается один раз на всю
+    пачку, а получатели - парами из идентификатора сообщения и номера
+    телефона, поэтому БД используется только для записи статусов.
+    """
+
+    sent_message_ids, failed_recipients, error = _send_payloads(
+        text, recipients
+    )
+    _save_sent_statuses(sent_message_ids)
+    if failed_recipients:
+        raise self.retry(
+            kwargs={
+                "mailing_id": mailing_id,
+                "text": text,
+                "recipients": failed_recipients,
+            },
+            exc=error,
+            countdown=_get_retry_countdown(self.request.retries, error),
+        )
+
+
+def get_send_signature(
+    mailing: Mailing, recipients: list[tuple[int, int]]
+) -> Signature:
+    """Формирует задачу отправки пачки сообщений в соответствии с режимом
+    отправки MAILING_SEND_MODE.
+    """
+
+    if settings.MAILING_SEND_MODE == SEND_MODE_PAYLOAD:
+        signature = send_message_payloads.s(
+            mailing_id=mailing.id,
+            text=mailing.message_text,
+            recipients=recipients,
+        )
+    else:
+        signature = send_message_batch.s(
+            mailing_id=mailing.id,
+            message_ids=[message_id for message_id, _ in recipients],
+        )
+    return signature.set(expires=mailing.end_datetime)
 
 
 @shared_task(
-    bind=True, retry_backoff=True, retry_backoff_max=60, retry_jitter=True
+    bind=True,
+    acks_late=True,
+    reject_on_worker_lost=True,
+    retry_backoff=True,
+    retry_backoff_max=RETRY_BACKOFF_MAX,
+    retry_jitter=True,
 )
 def start_mailing(self, mailing_id: int):
     """Отправка организация группы запросов об отправке сообщений
-    на внешний API.
+    на внешний API. Клиенты выбираются и публикуются пачками, поэтому
+    потребление памяти не зависит от размера аудитории рассылки.
+    Сообщения создаются заранее, до публикации задач отправки.
+    После публикации каждой пачки сохраняется ход запуска, поэтому
+    перезапущенная задача продолжает с места остановки.
     """
 
-    mailing = Mailing.objects.get(id=mailing_id)
-    clients = Client.objects.filter(
-        tag=mailing.filter.tag,
-        mobile_operator_code=mailing.filter.mobile_operator_code,
-    )
-    tasks = []
-    for client in clients:
-        tasks.append(
-            send_message.s(mailing_id=mailing_id, client_id=client.id).set(
-                expires=mailing.end_datetime
+    mailing = Mailing.objects.select_related("filter").get(id=mailing_id)
+    if not mailing.is_launched:
+        Mailing.objects.filter(id=mailing_id).update(is_launched=True)
+    checkpoint = get_dispatch_checkpoint(mailing)
+    if checkpoint.is_finished:
+        return
+    clients = get_mailing_clients(mailing)
+    for client_ids in iter_client_id_chunks(
+        clients,
+        settings.MAILING_DISPATCH_CHUNK_SIZE,
+        after_id=checkpoint.last_client_id,
+    ):
+        recipients = create_messages(mailing_id, client_ids)
+        group(
+            get_send_signature(mailing, batch)
+            for batch in split_into_batches(
+                recipients, settings.MAILING_SEND_BATCH_SIZE
             )
+        )()
+        save_dispatch_checkpoint(mailing_id, client_ids[-1])
+    finish_dispatch(mailing_id)
+
+
+@shared_task
+def launch_due_mailings():
+    """Запуск рассылок, время начала которых наступило. Используется вместо
+    отдельных заданий django-celery-beat при MAILING_SCHEDULER="sweep":
+    наступившие рассылки выбираются по индексу, поэтому стоимость проверки
+    не зависит от общего количества рассылок. Рассылки, время окончания
+    которых уже прошло, отмечаются запущенными без отправки сообщений.
+    Рассылки, созданные с заданием django-celery-beat, запускаются этим
+    заданием и пропускаются, чтобы не запустить их дважды.
+    """
+
+    now = timezone.now()
+    due_mailings = (
+        Mailing.objects.filter(
+            is_launched=False,
+            start_datetime__lte=now,
+            periodic_task__isnull=True,
         )
-    group(tasks)()
+        .order_by("start_datetime")
+        .values_list("id", "end_datetime")
+    )
+    while batch := list(due_mailings[:SWEEP_BATCH_SIZE]):
+        for mailing_id, end_datetime in batch:
+            claimed = Mailing.objects.filter(
+                id=mailing_id, is_launched=False
+            ).update(is_launched=True)
+            if claimed and end_datetime > now:
+                start_mailing.apply_async(
+                    kwargs={"mailing_id": mailing_id}, expires=end_datetime
+                )
+
+
+@shared_task
+def archive_messages():
+    """Перенос в архив сообщений рассылок, срок хранения сообщений которых
+    истек, по настройкам MESSAGE_ARCHIVE_*.
+    """
+
+    archive_mailings()
+
+
+@shared_task
+def build_timeseries_rollups():
+    """Сохранение статистики по интервалам времени закончившихся рассылок,
+    чтобы она не подсчитывалась по сообщениям при каждом запросе.
+    """
+
+    build_finished_rollups()
@@ -2,11 +2,40 @@ import datetime
 from typing import Any, NamedTuple
 
 import pytest
+from django.core.cache import cache
 from django.utils.timezone import make_aware
 
+from api.business_logic import circuit_breaker
 from api.models import Client, Filter, Mailing, Message, Tag
 
 
+@pytest.fixture(autouse=True)
+def reset_circuit_breaker(monkeypatch):
+    """Сброс автоматического выключателя запросов к внешнему API, чтобы
+    ошибки отправки в одном тесте не влияли на другие тесты.
+    """
+
+    monkeypatch.setattr(circuit_breaker, "_circuit_breaker", None)
+
+
+@pytest.fixture(autouse=True)
+def shared_statistics_cache(settings):
+    """Использование кэша статистики в памяти процесса как общего: тесты
+    выполняются в одном процессе.
+    """
+
+    settings.STATISTICS_CACHE_SHARED = True
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """Очистка кэша, чтобы закэшированная в одном тесте статистика не
+    влияла на другие тесты.
+    """
+
+    cache.clear()
+
+
 @pytest.fixture
 def tag_seller(db) -> Tag:
     """Фикстура тэга продавца."""
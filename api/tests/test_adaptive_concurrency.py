@@ -0,0 +1,156 @@
+import json
+import logging
+import threading
+import time
+
+import httpx
+import pytest
+
+from api.business_logic import adaptive_concurrency
+from api.business_logic.adaptive_concurrency import (
+    AdaptiveConcurrencyLimiter,
+)
+from api.business_logic.async_sender import send_payloads
+from api.business_logic.circuit_breaker import get_circuit_breaker
+from api import metrics
+from api.exceptions import CircuitOpenError
+from api.metrics import get_metrics
+
+
+@pytest.fixture
+def limiter() -> AdaptiveConcurrencyLimiter:
+    """Фикстура адаптивного ограничения конкурентности."""
+
+    return AdaptiveConcurrencyLimiter(
+        initial_limit=4,
+        min_limit=1,
+        max_limit=5,
+        latency_threshold=0.5,
+        max_error_rate=0.25,
+    )
+
+
+def test_limit_increase(limiter: AdaptiveConcurrencyLimiter):
+    """Тест на увеличение лимита на единицу после успешного окна и
+    ограничение лимита сверху.
+    """
+
+    for _ in range(4):
+        limiter.record(latency=0.1, success=True)
+    assert limiter.limit == 5
+    for _ in range(5):
+        limiter.record(latency=0.1, success=True)
+    assert limiter.limit == 5
+    assert get_metrics()["provider_concurrency_limit"] == 5
+
+
+def test_limit_change_logged(limiter: AdaptiveConcurrencyLimiter, caplog):
+    """Тест на запись изменения лимита в журнал."""
+
+    with caplog.at_level(logging.INFO, logger=adaptive_concurrency.__name__):
+        for _ in range(4):
+            limiter.record(latency=1, success=True)
+    assert "4 -> 2" in caplog.text
+
+
+def test_limit_metric_logged(
+    limiter: AdaptiveConcurrencyLimiter, settings, caplog, monkeypatch
+):
+    """Тест на запись лимита в лог вместе с остальными метриками процесса."""
+
+    settings.METRICS_LOG_INTERVAL = 1
+    monkeypatch.setattr(metrics, "_logged_at", time.monotonic() - 2)
+    with caplog.at_level(logging.INFO, logger=metrics.__name__):
+        for _ in range(4):
+            limiter.record(latency=1, success=True)
+    (record,) = [r for r in caplog.records if r.name == metrics.__name__]
+    logged = json.loads(record.getMessage().split(" ", 2)[2])
+    assert logged["provider_concurrency_limit"] == 2
+
+
+def test_limit_decrease_on_errors(limiter: AdaptiveConcurrencyLimiter):
+    """Тест на уменьшение лимита при превышении доли ошибок в окне."""
+
+    limiter.record(latency=0.1, success=True)
+    limiter.record(latency=0.1, success=True)
+    limiter.record(latency=0.1, success=False)
+    limiter.record(latency=0.1, success=False)
+    assert limiter.limit == 2
+
+
+def test_limit_decrease_on_latency(limiter: AdaptiveConcurrencyLimiter):
+    """Тест на уменьшение лимита при превышении средней задержки и
+    ограничение лимита снизу.
+    """
+
+    for _ in range(4):
+        limiter.record(latency=1, success=True)
+    assert limiter.limit == 2
+    for _ in range(4):
+        limiter.record(latency=1, success=True)
+    assert limiter.limit == 1
+
+
+def test_acquire_blocks_at_limit(limiter: AdaptiveConcurrencyLimiter):
+    """Тест на ожидание свободного места при достижении лимита."""
+
+    for _ in range(4):
+        limiter.acquire()
+    acquired = threading.Event()
+    thread = threading.Thread(
+        target=lambda: (limiter.acquire(), acquired.set())
+    )
+    thread.start()
+    assert not acquired.wait(timeout=0.05)
+    limiter.release(latency=0.1, success=True)
+    assert acquired.wait(timeout=5)
+    thread.join()
+
+
+def test_async_engine_shrinks_limit(settings, monkeypatch):
+    """Тест на уменьшение лимита асинхронной отправки при ошибках внешнего
+    API.
+    """
+
+    settings.PROVIDER_ADAPTIVE_CONCURRENCY = True
+    settings.PROVIDER_CONCURRENCY_INITIAL = 8
+    settings.PROVIDER_CIRCUIT_FAILURE_THRESHOLD = 0
+    monkeypatch.setattr(adaptive_concurrency, "_concurrency_limiter", None)
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(503)
+
+    send_payloads(
+        "hello",
+        [[i, 79261234567 + i] for i in range(8)],
+        transport=httpx.MockTransport(handler),
+    )
+    assert adaptive_concurrency.get_concurrency_limiter().limit == 4
+
+
+def test_async_engine_open_circuit_keeps_limit(settings, monkeypatch):
+    """Тест на отказ от запросов при разомкнутом выключателе без уменьшения
+    лимита асинхронной отправки.
+    """
+
+    settings.PROVIDER_ADAPTIVE_CONCURRENCY = True
+    settings.PROVIDER_CONCURRENCY_INITIAL = 16
+    settings.PROVIDER_CIRCUIT_FAILURE_THRESHOLD = 1
+    monkeypatch.setattr(adaptive_concurrency, "_concurrency_limiter", None)
+    get_circuit_breaker().record_failure()
+    calls = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request)
+        return httpx.Response(200)
+
+    sent_message_ids, failed_recipients, error = send_payloads(
+        "hello",
+        [[i, 79261234567 + i] for i in range(64)],
+        transport=httpx.MockTransport(handler),
+    )
+    assert calls == []
+    assert sent_message_ids == []
+    assert len(failed_recipients) == 64
+    assert isinstance(error, CircuitOpenError)
+    assert adaptive_concurrency.get_concurrency_limiter().limit == 16
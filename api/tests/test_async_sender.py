@@ -0,0 +1,164 @@
+import asyncio
+import json
+
+import httpx
+
+from api.business_logic import async_sender
+from api.business_logic.async_sender import get_runner, send_payloads
+from api.business_logic.circuit_breaker import (
+    CircuitBreaker,
+    get_circuit_breaker,
+)
+
+
+def test_send_payloads_ok():
+    """Тест на успешную асинхронную отправку пачки сообщений в формате
+    запроса post_message.
+    """
+
+    requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(json.loads(request.content))
+        return httpx.Response(200)
+
+    sent_message_ids, failed_recipients, error = send_payloads(
+        "hello",
+        [[1, 79261234567], [2, 79261234568]],
+        transport=httpx.MockTransport(handler),
+    )
+    assert sent_message_ids == [1, 2]
+    assert failed_recipients == []
+    assert error is None
+    assert requests == [
+        {"id": 1, "phone": 79261234567, "text": "hello"},
+        {"id": 2, "phone": 79261234568, "text": "hello"},
+    ]
+
+
+def test_send_payloads_failed():
+    """Тест на возврат получателей, отправка которым завершилась ошибкой."""
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.path.endswith("/2"):
+            return httpx.Response(400)
+        if request.url.path.endswith("/3"):
+            raise httpx.ConnectError("connection refused")
+        return httpx.Response(200)
+
+    sent_message_ids, failed_recipients, error = send_payloads(
+        "hello",
+        [[1, 79261234567], [2, 79261234568], [3, 79261234569]],
+        transport=httpx.MockTransport(handler),
+    )
+    assert sent_message_ids == [1]
+    assert failed_recipients == [[2, 79261234568], [3, 79261234569]]
+    assert error is not None
+
+
+def _raise_on_second(request: httpx.Request) -> httpx.Response:
+    """Обработчик запросов, завершающий запрос сообщения 2 непредвиденной
+    ошибкой.
+    """
+
+    if request.url.path.endswith("/2"):
+        raise RuntimeError("unexpected")
+    return httpx.Response(200)
+
+
+def test_send_payloads_unexpected_error():
+    """Тест на возврат непредвиденной ошибки запроса как ошибки отправки
+    получателю без прерывания остальных запросов.
+    """
+
+    sent_message_ids, failed_recipients, error = send_payloads(
+        "hello",
+        [[1, 79261234567], [2, 79261234568], [3, 79261234569]],
+        transport=httpx.MockTransport(_raise_on_second),
+    )
+    assert sent_message_ids == [1, 3]
+    assert failed_recipients == [[2, 79261234568]]
+    assert isinstance(error, RuntimeError)
+
+
+def test_send_payloads_unexpected_error_opens_circuit(settings):
+    """Тест на учет непредвиденной ошибки запроса в автоматическом
+    выключателе.
+    """
+
+    settings.PROVIDER_CIRCUIT_FAILURE_THRESHOLD = 1
+    send_payloads(
+        "hello",
+        [[2, 79261234568]],
+        transport=httpx.MockTransport(_raise_on_second),
+    )
+    assert get_circuit_breaker().state == CircuitBreaker.OPEN
+
+
+def test_send_payloads_concurrency_limit():
+    """Тест на ограничение количества одновременных запросов."""
+
+    in_flight = 0
+    max_in_flight = 0
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        nonlocal in_flight, max_in_flight
+        in_flight += 1
+        max_in_flight = max(max_in_flight, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return httpx.Response(200)
+
+    recipients = [[i, 79261234567 + i] for i in range(20)]
+    sent_message_ids, _, _ = send_payloads(
+        "hello",
+        recipients,
+        concurrency=5,
+        transport=httpx.MockTransport(handler),
+    )
+    assert len(sent_message_ids) == 20
+    assert max_in_flight == 5
+
+
+def test_get_runner_reused(monkeypatch):
+    """Тест на использование одного клиента внешнего API и цикла событий
+    всеми пачками, отправляемыми процессом.
+    """
+
+    monkeypatch.setattr(async_sender, "_runner", None)
+    assert get_runner() is get_runner()
+
+
+def test_get_runner_recreated_after_fork(monkeypatch):
+    """Тест на создание нового клиента внешнего API в процессе, созданном
+    через fork.
+    """
+
+    monkeypatch.setattr(async_sender, "_runner", None)
+    _, client, _ = get_runner()
+    monkeypatch.setattr(async_sender, "_runner_pid", -1)
+    assert get_runner()[1] is not client
+
+
+def test_send_payloads_shared_client(monkeypatch):
+    """Тест на отправку нескольких пачек через общий клиент процесса без
+    переданного транспорта.
+    """
+
+    clients = []
+
+    def create_client(concurrency, transport=None):
+        client = httpx.AsyncClient(
+            transport=httpx.MockTransport(lambda request: httpx.Response(200))
+        )
+        clients.append(client)
+        return client
+
+    monkeypatch.setattr(async_sender, "_runner", None)
+    monkeypatch.setattr(async_sender, "_create_client", create_client)
+    for message_id in (1, 2):
+        sent_message_ids, _, _ = send_payloads(
+            "hello", ((message_id, 79261234567),)
+        )
+        assert sent_message_ids == [message_id]
+    assert len(clients) == 1
@@ -0,0 +1,94 @@
+import time
+
+import pytest
+import requests
+
+from api.business_logic import circuit_breaker
+from api.business_logic.circuit_breaker import CircuitBreaker
+from api.business_logic.send_message import send_payloads
+from api.exceptions import CircuitOpenError
+
+
+@pytest.fixture
+def clock(monkeypatch) -> list[float]:
+    """Фикстура управляемого времени для автоматического выключателя."""
+
+    now = [1000.0]
+    monkeypatch.setattr(time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_opens_after_threshold(clock: list[float]):
+    """Тест на размыкание выключателя после заданного количества ошибок
+    подряд.
+    """
+
+    breaker = CircuitBreaker(failure_threshold=2, recovery_timeout=10)
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    breaker.before_call()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    clock[0] += 4
+    with pytest.raises(CircuitOpenError) as error:
+        breaker.before_call()
+    assert error.value.retry_after == pytest.approx(6)
+
+
+def test_half_open_probe_success(clock: list[float]):
+    """Тест на замыкание выключателя после успешного пробного запроса."""
+
+    breaker = CircuitBreaker(
+        failure_threshold=1, recovery_timeout=10, half_open_max_calls=1
+    )
+    breaker.record_failure()
+    clock[0] += 10
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    breaker.before_call()
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+    breaker.before_call()
+
+
+def test_half_open_probe_failure(clock: list[float]):
+    """Тест на повторное размыкание выключателя после неудачного пробного
+    запроса.
+    """
+
+    breaker = CircuitBreaker(failure_threshold=3, recovery_timeout=10)
+    for _ in range(3):
+        breaker.record_failure()
+    clock[0] += 10
+    breaker.before_call()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+
+
+def test_send_payloads_fail_fast(settings, monkeypatch):
+    """Тест на отказ от запросов к внешнему API, пока выключатель
+    разомкнут.
+    """
+
+    settings.PROVIDER_CIRCUIT_FAILURE_THRESHOLD = 1
+    calls = []
+
+    def mock_post(*args, **kwargs):
+        calls.append(kwargs["json"]["id"])
+        raise requests.exceptions.ConnectionError
+
+    monkeypatch.setattr(requests.Session, "post", mock_post)
+    monkeypatch.setattr(circuit_breaker, "_circuit_breaker", None)
+    sent_message_ids, failed_recipients, error = send_payloads(
+        "hello", [[1, 79261234567], [2, 79261234568], [3, 79261234569]]
+    )
+    assert calls == [1]
+    assert sent_message_ids == []
+    assert failed_recipients == [
+        [1, 79261234567],
+        [2, 79261234568],
+        [3, 79261234569],
+    ]
+    assert isinstance(error, CircuitOpenError)
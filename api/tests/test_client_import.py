@@ -0,0 +1,29 @@
+from django.core.management import call_command
+
+from api.business_logic.client_import import import_clients
+from api.models import Client, Tag
+
+
+def test_import_clients_batches(db, django_assert_num_queries):
+    """Тест на запись пачки клиентов с тэгами постоянным числом запросов."""
+
+    rows = [
+        {"phone_number": 79261234560 + i, "tag": f"tag_{i % 2}"}
+        for i in range(10)
+    ]
+    with django_assert_num_queries(5):
+        result = import_clients(rows, batch_size=10)
+    assert result["clients_imported"] == 10
+    assert Tag.objects.count() == 2
+
+
+def test_import_clients_command(db, tmp_path):
+    """Тест на импорт клиентов командой."""
+
+    path = tmp_path / "clients.csv"
+    path.write_text("phone_number,tag\n79261234567,seller\n79271234567,\n")
+    call_command("import_clients", str(path), "--batch-size=1")
+    assert set(Client.objects.values_list("phone_number", flat=True)) == {
+        79261234567,
+        79271234567,
+    }
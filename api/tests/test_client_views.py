@@ -2,10 +2,13 @@ import json
 from typing import Any
 
 import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
 from django.urls import reverse
 from rest_framework import status
 
-from api.models import Client, Tag
+from api.business_logic.mailing_counters import rebuild_counters
+from api.models import Client, MailingCounters, Message, Tag
+from api.pagination import IdCursorPagination
 
 
 @pytest.fixture
@@ -29,7 +32,9 @@ def test_client_list(db, client, client_seller_926_1_fixture: dict[str:Any]):
 
     url = reverse("api:client-list")
     response = client.get(url)
-    assert json.loads(response.content) == [client_seller_926_1_fixture]
+    assert json.loads(response.content)["results"] == [
+        client_seller_926_1_fixture
+    ]
 
 
 def test_client_detail(db, client, client_seller_926_1: Client):
@@ -108,3 +113,234 @@ def test_client_delete(db, client, client_seller_926_1: Client):
     url = reverse("api:client-detail", kwargs={"pk": 1})
     response = client.delete(url)
     assert response.status_code == status.HTTP_204_NO_CONTENT
+
+
+def test_client_delete_decrements_counters(
+    db,
+    client,
+    message_client_seller_926_1: Message,
+    message_client_seller_926_2: Message,
+):
+    """Тест на уменьшение счетчиков рассылки при удалении клиента вместе с
+    его сообщениями.
+    """
+
+    rebuild_counters()
+    url = reverse(
+        "api:client-detail",
+        kwargs={"pk": message_client_seller_926_1.client_id},
+    )
+    response = client.delete(url)
+    assert response.status_code == status.HTTP_204_NO_CONTENT
+    counters = MailingCounters.objects.get(
+        mailing=message_client_seller_926_1.mailing
+    )
+    assert counters.messages_total == 1
+    assert rebuild_counters(check=True) == []
+
+
+def test_client_import_csv(db, client, client_seller_926_1: Client):
+    """Тест на массовый импорт клиентов из CSV с обновлением существующих
+    клиентов и отклонением неверных номеров.
+    """
+
+    url = reverse("api:client-import")
+    content = (
+        "phone_number,tag\n"
+        "79261234567,manager\n"
+        "79271234567,manager\n"
+        "79281234567,\n"
+        "123,seller\n"
+    )
+    response = client.post(
+        url,
+        data={
+            "file": SimpleUploadedFile("clients.csv", content.encode()),
+        },
+    )
+    result = json.loads(response.content)
+    assert response.status_code == status.HTTP_200_OK
+    assert result["clients_imported"] == 3
+    assert result["clients_rejected"] == 1
+    assert result["errors"][0]["row"] == 4
+    clients = {
+        client.phone_number: (client.mobile_operator_code, client.tag)
+        for client in Client.objects.select_related("tag")
+    }
+    manager = Tag.objects.get(name="manager")
+    assert clients == {
+        79261234567: (926, manager),
+        79271234567: (927, manager),
+        79281234567: (928, None),
+    }
+
+
+def test_client_import_ndjson(db, client):
+    """Тест на массовый импорт клиентов из NDJSON."""
+
+    url = reverse("api:client-import")
+    content = (
+        '{"phone_number": 79261234567, "tag": "seller"}\n'
+        "not json\n"
+        '{"phone_number": 79261234567, "tag": "manager"}\n'
+    )
+    response = client.post(
+        url,
+        data={
+            "file": SimpleUploadedFile("clients.ndjson", content.encode()),
+        },
+    )
+    result = json.loads(response.content)
+    assert result["clients_imported"] == 1
+    assert result["clients_rejected"] == 1
+    assert Client.objects.get().tag.name == "manager"
+
+
+def test_client_bulk_update(
+    db,
+    client,
+    client_seller_926_1: Client,
+    client_seller_926_2: Client,
+    client_manager_927_1: Client,
+):
+    """Тест на массовое изменение тэга клиентов по фильтру."""
+
+    url = reverse("api:client-bulk-update")
+    response = client.post(
+        url,
+        data={
+            "filter": {"tag": {"name": "seller"}},
+            "tag": {"name": "vip"},
+        },
+        content_type="application/json",
+    )
+    assert json.loads(response.content) == {"clients_updated": 2}
+    assert set(
+        Client.objects.filter(tag__name="vip").values_list("id", flat=True)
+    ) == {client_seller_926_1.id, client_seller_926_2.id}
+
+
+def test_client_bulk_delete(
+    db,
+    client,
+    message_client_seller_926_1: Message,
+    message_client_seller_926_2: Message,
+    message_client_seller_926_3: Message,
+):
+    """Тест на массовое удаление клиентов по списку идентификаторов с
+    уменьшением счетчиков рассылок.
+    """
+
+    rebuild_counters()
+    url = reverse("api:client-bulk-delete")
+    response = client.post(
+        url,
+        data={
+            "ids": [
+                message_client_seller_926_1.client_id,
+                message_client_seller_926_3.client_id,
+            ]
+        },
+        content_type="application/json",
+    )
+    assert json.loads(response.content) == {"clients_deleted": 2}
+    assert list(Client.objects.values_list("id", flat=True)) == [
+        message_client_seller_926_2.client_id
+    ]
+    counters = MailingCounters.objects.get(
+        mailing=message_client_seller_926_2.mailing
+    )
+    assert counters.messages_total == 1
+    assert counters.messages_sent == 1
+    assert rebuild_counters(check=True) == []
+
+
+@pytest.mark.parametrize(
+    "data",
+    [
+        {},
+        {"ids": [1], "filter": {"mobile_operator_code": 926}},
+        {"filter": {}},
+    ],
+)
+def test_client_bulk_delete_bad_selection(
+    db, client, client_seller_926_1: Client, data: dict[str, Any]
+):
+    """Тест на отказ в массовом удалении без однозначной выборки
+    клиентов.
+    """
+
+    url = reverse("api:client-bulk-delete")
+    response = client.post(url, data=data, content_type="application/json")
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert Client.objects.exists()
+
+
+def test_client_list_cursor_pagination(
+    db,
+    client,
+    client_seller_926_1: Client,
+    client_seller_926_2: Client,
+    client_seller_926_3: Client,
+):
+    """Тест на постраничный вывод списка клиентов по курсору без пропусков
+    при добавлении клиентов между запросами страниц.
+    """
+
+    url = reverse("api:client-list")
+    response = json.loads(client.get(url, {"page_size": 2}).content)
+    assert [item["id"] for item in response["results"]] == [
+        client_seller_926_1.id,
+        client_seller_926_2.id,
+    ]
+    new_client = Client.objects.create(phone_number=79261234570)
+    response = json.loads(client.get(response["next"]).content)
+    assert [item["id"] for item in response["results"]] == [
+        client_seller_926_3.id,
+        new_client.id,
+    ]
+    assert response["next"] is None
+
+
+def test_client_list_page_size_limit(db, client, monkeypatch):
+    """Тест на ограничение размера страницы списка клиентов."""
+
+    monkeypatch.setattr(IdCursorPagination, "max_page_size", 3)
+    Client.objects.bulk_create(
+        [
+            Client(phone_number=79261234560 + i, mobile_operator_code=926)
+            for i in range(5)
+        ]
+    )
+    url = reverse("api:client-list")
+    response = json.loads(client.get(url, {"page_size": 100}).content)
+    assert len(response["results"]) == 3
+
+
+def test_client_export(
+    db, client, client_seller_926_1: Client, client_manager_927_1: Client
+):
+    """Тест на потоковую выгрузку клиентов в NDJSON."""
+
+    url = reverse("api:client-export")
+    response = client.get(url)
+    assert response.streaming
+    assert response["Content-Type"] == "application/x-ndjson"
+    rows = [
+        json.loads(line)
+        for line in b"".join(response.streaming_content).splitlines()
+    ]
+    assert rows == [
+        {
+            "id": client_seller_926_1.id,
+            "phone_number": 79261234567,
+            "mobile_operator_code": 926,
+            "tag_name": "seller",
+        },
+        {
+            "id": client_manager_927_1.id,
+            "phone_number": 79271234567,
+            "mobile_operator_code": 927,
+            "tag_name": "manager",
+        },
+    ]
@@ -0,0 +1,142 @@
+import time
+
+from django.urls import reverse
+
+from api.business_logic.mailing_dispatch import create_messages
+from api.business_logic.mailing_statistics import get_overall_statistics
+from api.models import Client, Filter, Mailing, MailingCounters, Tag
+from api.tests.conftest import OverallStatisticsFixture
+
+
+def test_overall_statistics_not_modified(
+    db,
+    client,
+    django_assert_num_queries,
+    django_capture_on_commit_callbacks,
+    overall_statistics_fixture: OverallStatisticsFixture,
+    filter_seller_926: Filter,
+):
+    """Тест на ответ 304 без запросов к БД для неизменившейся общей
+    статистики и новую версию после создания рассылки.
+    """
+
+    url = reverse("api:mailing-overall-statistics")
+    etag = client.get(url)["ETag"]
+    with django_assert_num_queries(0):
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 304
+    time.sleep(0.001)
+    with django_capture_on_commit_callbacks(execute=True):
+        Mailing.objects.create(
+            start_datetime="2023-01-01T00:00:00Z",
+            end_datetime="2023-01-02T00:00:00Z",
+            message_text="hello",
+            filter=filter_seller_926,
+        )
+    response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200
+    assert response.json()["mailings_total"] == 3
+
+
+def test_grouped_statistics_modified_by_tag_rename(
+    db,
+    client,
+    django_capture_on_commit_callbacks,
+    overall_statistics_fixture: OverallStatisticsFixture,
+):
+    """Тест на смену версии общей статистики с группировкой по тэгу при
+    переименовании тэга.
+    """
+
+    url = reverse("api:mailing-overall-statistics")
+    etag = client.get(url, {"group_by": "tag"})["ETag"]
+    time.sleep(0.001)
+    with django_capture_on_commit_callbacks(execute=True):
+        tag = Tag.objects.get(name="seller")
+        tag.name = "renamed"
+        tag.save()
+    response = client.get(url, {"group_by": "tag"}, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200
+    assert "renamed" in [row["tag"] for row in response.json()["results"]]
+
+
+def test_detailed_statistics_not_modified(
+    db,
+    client,
+    django_assert_num_queries,
+    mailing_seller_926_hello: Mailing,
+    mailing_manager_927_hello: Mailing,
+    client_seller_926_1: Client,
+):
+    """Тест на смену версии детальной статистики только при изменении
+    сообщений этой рассылки, в том числе без отметок изменений в кэше, и на
+    ответ 304 одним запросом к БД.
+    """
+
+    url = reverse(
+        "api:mailing-detailed-statistics",
+        kwargs={"pk": mailing_seller_926_hello.id},
+    )
+    etag = client.get(url)["ETag"]
+    create_messages(mailing_manager_927_hello.id, [client_seller_926_1.id])
+    with django_assert_num_queries(1):
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 304
+    create_messages(mailing_seller_926_hello.id, [client_seller_926_1.id])
+    response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200
+    assert response.json()["messages_total"] == 1
+    etag = response["ETag"]
+    MailingCounters.objects.filter(mailing=mailing_seller_926_hello).update(
+        messages_sent=1
+    )
+    assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 200
+
+
+def test_client_list_not_modified(
+    db,
+    client,
+    django_capture_on_commit_callbacks,
+    client_seller_926_1: Client,
+):
+    """Тест на смену версии списка клиентов при создании клиента."""
+
+    url = reverse("api:client-list")
+    etag = client.get(url)["ETag"]
+    assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 304
+    time.sleep(0.001)
+    with django_capture_on_commit_callbacks(execute=True):
+        client.post(
+            url,
+            data={"phone_number": 79271234567, "tag": {"name": "seller"}},
+            content_type="application/json",
+        )
+    assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 200
+
+
+def test_not_shared_cache_disables_conditions(
+    db,
+    client,
+    settings,
+    django_assert_num_queries,
+    overall_statistics_fixture: OverallStatisticsFixture,
+    mailing_seller_926_hello: Mailing,
+):
+    """Тест на отказ от кэша общей статистики и отметок изменений, если кэш
+    не общий для процессов API и воркеров, при сохранении версии данных
+    рассылки.
+    """
+
+    settings.STATISTICS_CACHE_SHARED = False
+    assert not client.get(reverse("api:client-list")).has_header("ETag")
+    response = client.get(reverse("api:mailing-overall-statistics"))
+    assert not response.has_header("ETag")
+    assert not response.has_header("Last-Modified")
+    get_overall_statistics()
+    with django_assert_num_queries(3):
+        get_overall_statistics()
+    url = reverse(
+        "api:mailing-detailed-statistics",
+        kwargs={"pk": mailing_seller_926_hello.id},
+    )
+    assert client.get(url).has_header("ETag")
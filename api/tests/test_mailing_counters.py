@@ -0,0 +1,107 @@
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+
+from api.business_logic.mailing_counters import (
+    delete_messages_with_counters,
+    rebuild_counters,
+)
+from api.business_logic.mailing_dispatch import create_messages
+from api.business_logic.mailing_statistics import get_detailed_statistics
+from api.business_logic.message_status import mark_messages_sent
+from api.models import Client, Mailing, MailingCounters, Message
+
+
+def test_counters_follow_send_path(
+    db,
+    mailing_seller_926_hello: Mailing,
+    client_seller_926_1: Client,
+    client_seller_926_2: Client,
+    client_seller_926_3: Client,
+):
+    """Тест на обновление счетчиков рассылки при создании и отправке
+    сообщений без двойного учета при повторных вызовах.
+    """
+
+    client_ids = [
+        client_seller_926_1.id,
+        client_seller_926_2.id,
+        client_seller_926_3.id,
+    ]
+    recipients = create_messages(mailing_seller_926_hello.id, client_ids[:2])
+    create_messages(mailing_seller_926_hello.id, client_ids)
+    mark_messages_sent([message_id for message_id, _ in recipients])
+    mark_messages_sent([recipients[0][0]])
+    counters = MailingCounters.objects.get(mailing=mailing_seller_926_hello)
+    assert counters.messages_total == 3
+    assert counters.messages_sent == 2
+    assert counters.messages_failed == 1
+
+
+def test_detailed_statistics_from_counters(
+    db, django_assert_num_queries, mailing_seller_926_hello: Mailing
+):
+    """Тест на формирование детальной статистики по счетчикам рассылки без
+    подсчета сообщений.
+    """
+
+    MailingCounters.objects.create(
+        mailing=mailing_seller_926_hello, messages_total=5, messages_sent=3
+    )
+    mailing = Mailing.objects.select_related("filter", "counters").get(
+        id=mailing_seller_926_hello.id
+    )
+    with django_assert_num_queries(0):
+        statistics = get_detailed_statistics(mailing)
+    assert statistics["messages_total"] == 5
+    assert statistics["messages_sent"] == 3
+    assert statistics["messages_failed"] == 2
+
+
+def test_rebuild_mailing_counters(
+    db,
+    mailing_seller_926_hello: Mailing,
+    mailing_manager_927_hello: Mailing,
+    message_client_seller_926_1: Message,
+    message_client_seller_926_2: Message,
+    message_client_seller_926_3: Message,
+):
+    """Тест на проверку и пересчет счетчиков рассылок командой."""
+
+    MailingCounters.objects.create(
+        mailing=mailing_seller_926_hello, messages_total=1, messages_sent=1
+    )
+    with pytest.raises(CommandError):
+        call_command("rebuild_mailing_counters", "--check")
+    call_command("rebuild_mailing_counters")
+    counters = MailingCounters.objects.get(mailing=mailing_seller_926_hello)
+    assert counters.messages_total == 3
+    assert counters.messages_sent == 2
+    assert (
+        MailingCounters.objects.get(
+            mailing=mailing_manager_927_hello
+        ).messages_total
+        == 0
+    )
+    call_command("rebuild_mailing_counters", "--check")
+
+
+def test_delete_messages_with_counters(
+    db,
+    message_client_seller_926_1: Message,
+    message_client_seller_926_2: Message,
+    message_client_seller_926_3: Message,
+):
+    """Тест на уменьшение счетчиков рассылки при удалении сообщений."""
+
+    rebuild_counters()
+    deleted = delete_messages_with_counters(
+        Message.objects.filter(
+            id__in=[
+                message_client_seller_926_1.id,
+                message_client_seller_926_3.id,
+            ]
+        )
+    )
+    assert deleted == 2
+    assert rebuild_counters(check=True) == []
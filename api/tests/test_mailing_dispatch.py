@@ -0,0 +1,96 @@
+from api.business_logic.mailing_dispatch import (
+    create_messages,
+    get_mailing_clients,
+    iter_client_id_chunks,
+)
+from api.models import Client, Mailing, Message
+
+
+def test_mailing_clients(
+    db,
+    mailing_seller_926_hello: Mailing,
+    client_seller_926_1: Client,
+    client_seller_926_2: Client,
+    client_manager_927_1: Client,
+):
+    """Тест на выборку клиентов по фильтру рассылки."""
+
+    clients = get_mailing_clients(mailing_seller_926_hello)
+    assert set(clients) == {client_seller_926_1, client_seller_926_2}
+
+
+def test_client_id_chunks(
+    db,
+    mailing_seller_926_hello: Mailing,
+    client_seller_926_1: Client,
+    client_seller_926_2: Client,
+    client_seller_926_3: Client,
+):
+    """Тест на обход выборки клиентов пачками идентификаторов."""
+
+    clients = get_mailing_clients(mailing_seller_926_hello)
+    chunks = list(iter_client_id_chunks(clients, chunk_size=2))
+    assert chunks == [
+        [client_seller_926_1.id, client_seller_926_2.id],
+        [client_seller_926_3.id],
+    ]
+
+
+def test_client_id_chunks_after_id(
+    db,
+    mailing_seller_926_hello: Mailing,
+    client_seller_926_1: Client,
+    client_seller_926_2: Client,
+    client_seller_926_3: Client,
+):
+    """Тест на продолжение обхода выборки клиентов после заданного
+    идентификатора.
+    """
+
+    clients = get_mailing_clients(mailing_seller_926_hello)
+    chunks = list(
+        iter_client_id_chunks(
+            clients, chunk_size=2, after_id=client_seller_926_1.id
+        )
+    )
+    assert chunks == [[client_seller_926_2.id, client_seller_926_3.id]]
+
+
+def test_create_messages_idempotent(
+    db,
+    mailing_seller_926_hello: Mailing,
+    client_seller_926_1: Client,
+    client_seller_926_2: Client,
+):
+    """Тест на повторное создание сообщений рассылки без дубликатов."""
+
+    client_ids = [client_seller_926_1.id, client_seller_926_2.id]
+    first_message_ids = create_messages(
+        mailing_seller_926_hello.id, client_ids
+    )
+    second_message_ids = create_messages(
+        mailing_seller_926_hello.id, client_ids
+    )
+    assert first_message_ids == second_message_ids
+    assert (
+        Message.objects.filter(mailing=mailing_seller_926_hello).count() == 2
+    )
+
+
+def test_create_messages_skips_sent(
+    db,
+    mailing_seller_926_hello: Mailing,
+    client_seller_926_1: Client,
+    client_seller_926_2: Client,
+):
+    """Тест на исключение уже отправленных сообщений из получателей при
+    повторном создании сообщений пачки.
+    """
+
+    client_ids = [client_seller_926_1.id, client_seller_926_2.id]
+    recipients = create_messages(mailing_seller_926_hello.id, client_ids)
+    Message.objects.filter(id=recipients[0][0]).update(is_sent=True)
+    assert create_messages(mailing_seller_926_hello.id, client_ids) == [
+        recipients[1]
+    ]
+    assert mailing_seller_926_hello.counters.messages_total == 2
@@ -0,0 +1,119 @@
+import datetime
+
+from django.urls import reverse
+from django.utils.timezone import make_aware
+
+from api.business_logic.mailing_counters import rebuild_counters
+from api.business_logic.message_archive import archive_mailings
+from api.business_logic.message_status import mark_messages_sent
+from api.models import (
+    Mailing,
+    MailingCounters,
+    MailingTimeseriesRollup,
+    Message,
+)
+from api.tasks import build_timeseries_rollups
+from api.tests.conftest import DetailedStatisticsFixture
+
+
+def test_mailing_timeseries(
+    db,
+    client,
+    django_assert_max_num_queries,
+    detailed_statistics_seller_fixture: DetailedStatisticsFixture,
+):
+    """Тест на статистику рассылки по интервалам времени, подсчитанную
+    одним сгруппированным запросом после запроса версии данных рассылки и
+    самой рассылки.
+    """
+
+    mailing = detailed_statistics_seller_fixture.input_mailing
+    sent_datetime = make_aware(datetime.datetime(2023, 1, 1, 1, 30, 15))
+    Message.objects.filter(mailing=mailing, is_sent=True).update(
+        sent_datetime=sent_datetime
+    )
+    Message.objects.filter(mailing=mailing, is_sent=False).update(
+        created_datetime=make_aware(datetime.datetime(2023, 1, 1, 4, 10))
+    )
+    url = reverse("api:mailing-timeseries", kwargs={"pk": mailing.id})
+    with django_assert_max_num_queries(3):
+        response = client.get(url, {"bucket": "hour"})
+    assert response.json() == {
+        "bucket": "hour",
+        "results": [
+            {
+                "bucket_start": "2023-01-01T01:00:00Z",
+                "messages_sent": 2,
+                "messages_failed": 0,
+            },
+            {
+                "bucket_start": "2023-01-01T04:00:00Z",
+                "messages_sent": 0,
+                "messages_failed": 1,
+            },
+        ],
+    }
+
+
+def test_mailing_timeseries_rollups(
+    db,
+    client,
+    tmp_path,
+    detailed_statistics_seller_fixture: DetailedStatisticsFixture,
+):
+    """Тест на сохранение статистики по интервалам при переносе сообщений
+    рассылки в архив и чтение ее после переноса.
+    """
+
+    mailing = detailed_statistics_seller_fixture.input_mailing
+    url = reverse("api:mailing-timeseries", kwargs={"pk": mailing.id})
+    expected = client.get(url, {"bucket": "second"}).json()
+    archive_mailings(retention_days=0, directory=tmp_path)
+    assert not Message.objects.filter(mailing=mailing).exists()
+    assert MailingTimeseriesRollup.objects.filter(mailing=mailing).exists()
+    assert client.get(url, {"bucket": "second"}).json() == expected
+
+
+def test_mailing_timeseries_rollups_after_end(
+    db,
+    client,
+    detailed_statistics_seller_fixture: DetailedStatisticsFixture,
+):
+    """Тест на сохранение статистики по интервалам закончившейся рассылки
+    периодической задачей и на пересчет статистики по сообщениям после
+    изменения счетчиков рассылки.
+    """
+
+    mailing = detailed_statistics_seller_fixture.input_mailing
+    rebuild_counters()
+    url = reverse("api:mailing-timeseries", kwargs={"pk": mailing.id})
+    expected = client.get(url, {"bucket": "hour"}).json()
+    build_timeseries_rollups.apply()
+    assert MailingCounters.objects.get(mailing=mailing).is_rolled_up
+    MailingTimeseriesRollup.objects.filter(mailing=mailing).update(
+        messages_failed=5
+    )
+    response = client.get(url, {"bucket": "hour"}).json()
+    assert response["results"][0]["messages_failed"] == 5
+    mark_messages_sent(
+        list(
+            Message.objects.filter(mailing=mailing, is_sent=False).values_list(
+                "id", flat=True
+            )
+        )
+    )
+    assert not MailingCounters.objects.get(mailing=mailing).is_rolled_up
+    response = client.get(url, {"bucket": "hour"}).json()
+    assert sum(row["messages_sent"] for row in response["results"]) == 3
+    assert response != expected
+
+
+def test_mailing_timeseries_bad_bucket(
+    db, client, mailing_seller_926_hello: Mailing
+):
+    """Тест на отказ в статистике по неизвестному интервалу."""
+
+    url = reverse(
+        "api:mailing-timeseries", kwargs={"pk": mailing_seller_926_hello.id}
+    )
+    assert client.get(url, {"bucket": "day"}).status_code == 400
@@ -1,4 +1,5 @@
 import datetime
+import gzip
 import json
 from typing import Any
 
@@ -7,7 +8,7 @@ from django.urls import reverse
 from django_celery_beat.models import PeriodicTask
 from rest_framework import status
 
-from api.models import Filter, Mailing
+from api.models import Filter, Mailing, Message
 from api.tests.conftest import (
     DetailedStatisticsFixture,
     OverallStatisticsFixture,
@@ -42,7 +43,9 @@ def test_mailing_list(
 
     url = reverse("api:mailing-list")
     response = client.get(url)
-    assert json.loads(response.content) == [mailing_seller_926_hello_fixture]
+    assert json.loads(response.content)["results"] == [
+        mailing_seller_926_hello_fixture
+    ]
 
 
 def test_mailing_detail(
@@ -261,3 +264,88 @@ def test_mailing_overall_statistics(
         json.loads(response.content)
         == overall_statistics_fixture.expected_result
     )
+
+
+def test_mailing_periodic_task_linked(db, mailing_seller_926_hello: Mailing):
+    """Тест на связь рассылки с ее заданием запуска."""
+
+    assert mailing_seller_926_hello.periodic_task.kwargs == json.dumps(
+        {"mailing_id": mailing_seller_926_hello.id}
+    )
+
+
+def test_mailing_put_schedule_similar_id(
+    db,
+    client,
+    mailing_seller_926_hello: Mailing,
+    filter_seller_926: Filter,
+):
+    """Тест на изменение задания по рассылке при наличии рассылки, в
+    идентификаторе которой содержится идентификатор изменяемой рассылки.
+    """
+
+    Mailing.objects.create(
+        id=12,
+        start_datetime=mailing_seller_926_hello.start_datetime,
+        end_datetime=mailing_seller_926_hello.end_datetime,
+        message_text="hello",
+        filter=filter_seller_926,
+    )
+    url = reverse("api:mailing-detail", kwargs={"pk": 1})
+    client.patch(
+        url,
+        data={
+            "start_datetime": "2025-01-01T01:00:01",
+            "end_datetime": "2028-01-02T01:00:01",
+            "message_text": "hello!",
+            "filter": {"mobile_operator_code": 926, "tag": {"name": "seller"}},
+        },
+        content_type="application/json",
+    )
+    assert PeriodicTask.objects.get(
+        mailing__id=1
+    ).clocked.clocked_time == datetime.datetime(
+        2025, 1, 1, 1, 0, 1, tzinfo=datetime.timezone.utc
+    )
+    assert (
+        PeriodicTask.objects.get(mailing__id=12).clocked.clocked_time
+        == mailing_seller_926_hello.start_datetime
+    )
+
+
+def test_mailing_messages_export_gzip(
+    db,
+    client,
+    message_client_seller_926_1: Message,
+    message_client_seller_926_3: Message,
+    message_client_manager_927_1: Message,
+):
+    """Тест на потоковую выгрузку результатов отправки сообщений рассылки в
+    NDJSON, сжатый в gzip.
+    """
+
+    url = reverse("api:mailing-messages-export")
+    response = client.get(
+        url,
+        {
+            "mailing": message_client_seller_926_1.mailing_id,
+            "compression": "gzip",
+        },
+    )
+    assert response["Content-Type"] == "application/gzip"
+    content = gzip.decompress(b"".join(response.streaming_content))
+    rows = [json.loads(line) for line in content.splitlines()]
+    assert [(row["id"], row["is_sent"]) for row in rows] == [
+        (message_client_seller_926_1.id, True),
+        (message_client_seller_926_3.id, False),
+    ]
+    assert rows[0]["phone_number"] == 79261234567
+
+
+def test_mailing_messages_export_bad_params(db, client):
+    """Тест на отказ в выгрузке с некорректными параметрами."""
+
+    url = reverse("api:mailing-messages-export")
+    response = client.get(url, {"mailing": "abc", "compression": "zip"})
+    assert response.status_code == 400
+    assert set(response.json()) == {"mailing", "compression"}
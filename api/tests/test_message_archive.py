@@ -0,0 +1,87 @@
+import gzip
+import json
+
+import pytest
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import call_command
+from django.core.management.base import CommandError
+
+from api.business_logic.mailing_counters import rebuild_counters
+from api.business_logic.mailing_statistics import (
+    get_detailed_statistics,
+    get_overall_statistics,
+)
+from api.business_logic.message_archive import (
+    archive_mailings,
+    get_archive_path,
+)
+from api.models import Mailing, MailingCounters, Message
+from api.tests.conftest import (
+    DetailedStatisticsFixture,
+    OverallStatisticsFixture,
+)
+
+
+def test_archive_mailings(
+    db,
+    tmp_path,
+    detailed_statistics_seller_fixture: DetailedStatisticsFixture,
+):
+    """Тест на перенос сообщений закончившейся рассылки в архив с
+    сохранением ее статистики.
+    """
+
+    mailing = detailed_statistics_seller_fixture.input_mailing
+    paths = archive_mailings(
+        retention_days=0, directory=tmp_path, chunk_size=2
+    )
+    assert paths == [get_archive_path(tmp_path, mailing.id)]
+    with gzip.open(paths[0], "rt", encoding="utf-8") as file:
+        rows = [json.loads(line) for line in file]
+    assert len(rows) == 3
+    assert sum(row["is_sent"] for row in rows) == 2
+    assert not Message.objects.filter(mailing=mailing).exists()
+    assert MailingCounters.objects.get(mailing=mailing).is_archived is True
+    mailing = Mailing.objects.get(id=mailing.id)
+    assert (
+        get_detailed_statistics(mailing)
+        == detailed_statistics_seller_fixture.expected_result
+    )
+    assert archive_mailings(retention_days=0, directory=tmp_path) == []
+
+
+def test_archive_keeps_overall_statistics(
+    db, tmp_path, overall_statistics_fixture: OverallStatisticsFixture
+):
+    """Тест на учет перенесенных в архив сообщений в общей статистике и
+    сохранение их счетчиков при пересчете.
+    """
+
+    archive_mailings(retention_days=0, directory=tmp_path)
+    assert not Message.objects.exists()
+    assert rebuild_counters(check=True) == []
+    assert (
+        get_overall_statistics() == overall_statistics_fixture.expected_result
+    )
+
+
+def test_archive_retention(db, tmp_path, mailing_seller_926_hello: Mailing):
+    """Тест на отсутствие переноса сообщений рассылки, срок хранения которых
+    не истек.
+    """
+
+    call_command(
+        "archive_messages", "--retention-days=100000", f"--dir={tmp_path}"
+    )
+    assert not list(tmp_path.iterdir())
+    assert not MailingCounters.objects.filter(is_archived=True).exists()
+
+
+def test_archive_dir_required(db, settings):
+    """Тест на отказ в переносе сообщений без заданного каталога архивов."""
+
+    settings.MESSAGE_ARCHIVE_DIR = ""
+    with pytest.raises(ImproperlyConfigured):
+        archive_mailings(retention_days=0)
+    with pytest.raises(CommandError):
+        call_command("archive_messages", "--dir=")
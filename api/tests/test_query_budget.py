@@ -0,0 +1,102 @@
+import datetime
+import json
+import logging
+import time
+
+import pytest
+from django.urls import reverse
+from django.utils.timezone import make_aware
+
+from api import metrics
+from api.metrics import get_metrics
+from api.middleware import QUERY_COUNT_HEADER
+from api.models import Client, Filter, Mailing, Tag
+
+
+@pytest.fixture
+def many_clients(db) -> None:
+    """Фикстура клиентов с разными тэгами."""
+
+    tags = Tag.objects.bulk_create([Tag(name=f"tag_{i}") for i in range(5)])
+    Client.objects.bulk_create(
+        [
+            Client(
+                phone_number=79261234560 + i,
+                mobile_operator_code=926,
+                tag=tags[i % 5],
+            )
+            for i in range(20)
+        ]
+    )
+
+
+@pytest.fixture
+def many_mailings(db) -> None:
+    """Фикстура рассылок с разными фильтрами."""
+
+    tags = Tag.objects.bulk_create([Tag(name=f"tag_{i}") for i in range(5)])
+    filters = Filter.objects.bulk_create(
+        [Filter(mobile_operator_code=926, tag=tag) for tag in tags]
+    )
+    Mailing.objects.bulk_create(
+        [
+            Mailing(
+                start_datetime=make_aware(datetime.datetime(2023, 1, 1)),
+                end_datetime=make_aware(datetime.datetime(2023, 1, 2)),
+                message_text="hello",
+                filter=filters[i % 5],
+            )
+            for i in range(20)
+        ]
+    )
+
+
+@pytest.mark.parametrize(
+    "url_name, fixture_name, budget",
+    [
+        ("api:client-list", "many_clients", 1),
+        ("api:mailing-list", "many_mailings", 1),
+    ],
+)
+def test_list_query_budget(
+    db,
+    client,
+    request,
+    django_assert_max_num_queries,
+    url_name: str,
+    fixture_name: str,
+    budget: int,
+):
+    """Тест на количество запросов к БД при выводе списков, не зависящее от
+    количества записей.
+    """
+
+    request.getfixturevalue(fixture_name)
+    with django_assert_max_num_queries(budget):
+        response = client.get(reverse(url_name))
+    assert len(response.json()["results"]) == 20
+
+
+def test_query_budget_header_and_metrics(db, client, settings, many_clients):
+    """Тест на вывод количества запросов к БД в заголовке ответа в режиме
+    отладки и учет его в метриках.
+    """
+
+    settings.DEBUG = True
+    response = client.get(reverse("api:client-list"))
+    assert response[QUERY_COUNT_HEADER] == "1"
+    assert get_metrics()["api_query_count:api:client-list_max"] >= 1
+
+
+def test_query_budget_metrics_logged(
+    db, client, settings, many_clients, caplog, monkeypatch
+):
+    """Тест на периодическую запись метрик запросов к БД в лог."""
+
+    settings.METRICS_LOG_INTERVAL = 1
+    monkeypatch.setattr(metrics, "_logged_at", time.monotonic() - 2)
+    with caplog.at_level(logging.INFO, logger="api.metrics"):
+        client.get(reverse("api:client-list"))
+    (record,) = [r for r in caplog.records if r.name == "api.metrics"]
+    logged = json.loads(record.getMessage().split(" ", 2)[2])
+    assert logged["api_query_count:api:client-list_count"] >= 1
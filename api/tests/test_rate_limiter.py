@@ -0,0 +1,190 @@
+import asyncio
+import threading
+
+import fakeredis
+import httpx
+import pytest
+import redis
+import requests
+
+from api.business_logic import async_sender, rate_limiter, send_message
+from api.business_logic.circuit_breaker import get_circuit_breaker
+from api.business_logic.rate_limiter import (
+    LocalTokenBucketStorage,
+    RateLimiter,
+    RedisTokenBucketStorage,
+    get_rate_limiter,
+)
+from api.exceptions import CircuitOpenError
+
+
+class RecordingRateLimiter:
+    """Ограничитель частоты запросов, запоминающий коды операторов
+    запрошенных разрешений.
+    """
+
+    def __init__(self):
+        self.codes = []
+
+    def acquire(self, mobile_operator_code: int) -> None:
+        self.codes.append(mobile_operator_code)
+
+    async def acquire_async(self, mobile_operator_code: int) -> None:
+        self.codes.append(mobile_operator_code)
+
+
+@pytest.fixture
+def recording_limiter(monkeypatch) -> RecordingRateLimiter:
+    """Фикстура ограничителя частоты запросов, используемого отправкой
+    сообщений.
+    """
+
+    limiter = RecordingRateLimiter()
+    monkeypatch.setattr(send_message, "get_rate_limiter", lambda: limiter)
+    monkeypatch.setattr(async_sender, "get_rate_limiter", lambda: limiter)
+    return limiter
+
+
+@pytest.fixture(params=["local", "redis"])
+def storage(request):
+    """Фикстура хранилища корзин токенов в памяти процесса и в fakeredis."""
+
+    if request.param == "redis":
+        return RedisTokenBucketStorage(fakeredis.FakeRedis())
+    return LocalTokenBucketStorage()
+
+
+def test_bucket_burst_and_refill(storage):
+    """Тест на выдачу токенов в пределах размера корзины и пополнение
+    корзины со временем.
+    """
+
+    bucket = [("operator:926", 2.0, 2.0)]
+    assert storage.take(bucket, now=100.0) == 0
+    assert storage.take(bucket, now=100.0) == 0
+    assert storage.take(bucket, now=100.0) == pytest.approx(0.5)
+    assert storage.take(bucket, now=100.5) == 0
+
+
+def test_buckets_taken_atomically(storage):
+    """Тест на то, что токен не списывается из общей корзины, если
+    корзина оператора пуста.
+    """
+
+    global_bucket = ("global", 10.0, 10.0)
+    operator_bucket = ("operator:926", 1.0, 1.0)
+    assert storage.take([global_bucket, operator_bucket], now=100.0) == 0
+    for _ in range(3):
+        assert storage.take([global_bucket, operator_bucket], now=100.0) > 0
+    for _ in range(9):
+        assert storage.take([global_bucket], now=100.0) == 0
+    assert storage.take([global_bucket], now=100.0) > 0
+
+
+def test_redis_unavailable_fallback():
+    """Тест на использование хранилища в памяти процесса при недоступности
+    Redis.
+    """
+
+    storage = RedisTokenBucketStorage(
+        redis.Redis(host="127.0.0.1", port=1, socket_connect_timeout=0.1)
+    )
+    bucket = [("global", 1.0, 1.0)]
+    assert storage.take(bucket, now=100.0) == 0
+    assert storage.take(bucket, now=100.0) == pytest.approx(1.0)
+
+
+def test_redis_timeout_fallback():
+    """Тест на использование хранилища в памяти процесса при истечении
+    таймаута Redis.
+    """
+
+    class TimeoutRedis:
+        def transaction(self, *args, **kwargs):
+            raise redis.exceptions.TimeoutError
+
+    storage = RedisTokenBucketStorage(TimeoutRedis())
+    assert storage.take([("global", 1.0, 1.0)], now=100.0) == 0
+
+
+def test_redis_client_timeouts(settings, monkeypatch):
+    """Тест на создание клиента Redis с таймаутами подключения и
+    операций.
+    """
+
+    settings.PROVIDER_RATE_LIMIT_REDIS_URL = "redis://127.0.0.1:1/0"
+    settings.PROVIDER_RATE_LIMIT_REDIS_TIMEOUT = 0.2
+    monkeypatch.setattr(rate_limiter, "_rate_limiter", None)
+    client = get_rate_limiter()._storage._client
+    connection_kwargs = client.connection_pool.connection_kwargs
+    assert connection_kwargs["socket_timeout"] == 0.2
+    assert connection_kwargs["socket_connect_timeout"] == 0.2
+
+
+def test_acquire_async_off_event_loop():
+    """Тест на обращение к хранилищу корзин вне потока цикла событий."""
+
+    threads = []
+
+    class RecordingStorage(LocalTokenBucketStorage):
+        def take(self, buckets, now):
+            threads.append(threading.get_ident())
+            return super().take(buckets, now)
+
+    limiter = RateLimiter(RecordingStorage(), rate=100)
+    asyncio.run(limiter.acquire_async(926))
+    assert threads and threading.get_ident() not in threads
+
+
+def test_post_payload_acquires_rate_limit(recording_limiter, monkeypatch):
+    """Тест на получение разрешения ограничителя частоты запросов по коду
+    оператора получателя перед запросом к внешнему API.
+    """
+
+    response = requests.Response()
+    response.status_code = 200
+    monkeypatch.setattr(
+        requests.Session, "post", lambda *args, **kwargs: response
+    )
+    send_message.post_payload(1, 79261234567, "hello")
+    assert recording_limiter.codes == [926]
+
+
+def test_open_circuit_keeps_rate_limit(recording_limiter, settings):
+    """Тест на то, что запросы, не выполненные из-за разомкнутого
+    выключателя, не расходуют лимит частоты запросов.
+    """
+
+    settings.PROVIDER_CIRCUIT_FAILURE_THRESHOLD = 1
+    get_circuit_breaker().record_failure()
+    with pytest.raises(CircuitOpenError):
+        send_message.post_payload(1, 79261234567, "hello")
+    async_sender.send_payloads(
+        "hello",
+        [[2, 79261234568]],
+        transport=httpx.MockTransport(lambda request: httpx.Response(200)),
+    )
+    assert recording_limiter.codes == []
+
+
+def test_rate_limiter_operator_rates():
+    """Тест на выбор корзин по коду мобильного оператора."""
+
+    limiter = RateLimiter(
+        LocalTokenBucketStorage(),
+        rate=100,
+        operator_rates={926: 1},
+        default_operator_rate=0,
+    )
+    assert limiter.try_acquire(926) == 0
+    assert limiter.try_acquire(926) > 0
+    assert limiter.try_acquire(927) == 0
+    assert limiter.try_acquire(927) == 0
+
+
+def test_rate_limiter_disabled():
+    """Тест на отсутствие ограничений при нулевых лимитах."""
+
+    limiter = RateLimiter(LocalTokenBucketStorage())
+    for _ in range(100):
+        assert limiter.try_acquire(926) == 0
@@ -0,0 +1,33 @@
+import os
+
+from api.business_logic import send_message
+from api.business_logic.send_message import get_session
+
+
+def test_session_reused():
+    """Тест на повторное использование сессии внутри одного процесса."""
+
+    assert get_session() is get_session()
+
+
+def test_session_recreated_after_fork(monkeypatch):
+    """Тест на создание новой сессии в дочернем процессе воркера."""
+
+    monkeypatch.setattr(send_message, "_session", None)
+    parent_session = get_session()
+    monkeypatch.setattr(os, "getpid", lambda: -1)
+    child_session = get_session()
+    assert child_session is not parent_session
+    assert send_message._session_pid == -1
+
+
+def test_session_pool_size(settings, monkeypatch):
+    """Тест на настройку размера пула соединений и отключение повторных
+    попыток на уровне HTTP-клиента.
+    """
+
+    settings.PROVIDER_HTTP_POOL_SIZE = 3
+    monkeypatch.setattr(send_message, "_session", None)
+    adapter = get_session().get_adapter("https://www.api.com")
+    assert adapter._pool_maxsize == 3
+    assert adapter.max_retries.total == 0
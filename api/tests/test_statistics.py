@@ -1,7 +1,19 @@
+import datetime
+
+from django.urls import reverse
+from django.utils import timezone
+
+from api.business_logic.mailing_dispatch import create_messages
+from api.business_logic.mailing_counters import rebuild_counters
 from api.business_logic.mailing_statistics import (
+    get_bulk_detailed_statistics,
     get_detailed_statistics,
+    get_filtered_statistics,
     get_overall_statistics,
 )
+from api.business_logic.message_archive import archive_mailings
+from api.business_logic.message_status import mark_messages_sent
+from api.models import Client, Mailing
 from api.tests.conftest import (
     DetailedStatisticsFixture,
     OverallStatisticsFixture,
@@ -28,3 +40,194 @@ def test_overall_statistics(
 
     statistics = get_overall_statistics()
     assert statistics == overall_statistics_fixture.expected_result
+
+
+def test_overall_statistics_cached(
+    db,
+    django_assert_num_queries,
+    overall_statistics_fixture: OverallStatisticsFixture,
+):
+    """Тест на получение общей статистики из кэша без запросов к БД."""
+
+    get_overall_statistics()
+    with django_assert_num_queries(0):
+        statistics = get_overall_statistics()
+    assert statistics == overall_statistics_fixture.expected_result
+
+
+def test_overall_statistics_cache_incremented(
+    db,
+    django_capture_on_commit_callbacks,
+    mailing_seller_926_hello: Mailing,
+    client_seller_926_1: Client,
+    client_seller_926_2: Client,
+):
+    """Тест на увеличение закэшированной общей статистики при создании и
+    отправке сообщений.
+    """
+
+    get_overall_statistics()
+    with django_capture_on_commit_callbacks(execute=True):
+        recipients = create_messages(
+            mailing_seller_926_hello.id,
+            [client_seller_926_1.id, client_seller_926_2.id],
+        )
+        mark_messages_sent([recipients[0][0]])
+    assert get_overall_statistics() == {
+        "mailings_total": 1,
+        "messages_total": 2,
+        "messages_sent": 1,
+        "messages_failed": 1,
+    }
+
+
+def test_overall_statistics_cache_invalidated(
+    db,
+    django_capture_on_commit_callbacks,
+    mailing_seller_926_hello: Mailing,
+    mailing_manager_927_hello: Mailing,
+):
+    """Тест на пересчет общей статистики после создания и удаления
+    рассылок.
+    """
+
+    assert get_overall_statistics()["mailings_total"] == 2
+    with django_capture_on_commit_callbacks(execute=True):
+        mailing_seller_926_hello.delete()
+    assert get_overall_statistics()["mailings_total"] == 1
+    with django_capture_on_commit_callbacks(execute=True):
+        Mailing.objects.create(
+            start_datetime=mailing_seller_926_hello.start_datetime,
+            end_datetime=mailing_seller_926_hello.end_datetime,
+            message_text="hello",
+            filter=mailing_seller_926_hello.filter,
+        )
+    assert get_overall_statistics()["mailings_total"] == 2
+
+
+def test_overall_statistics_grouped_by_tag(
+    db,
+    client,
+    django_assert_num_queries,
+    overall_statistics_fixture: OverallStatisticsFixture,
+):
+    """Тест на общую статистику с группировкой по тэгу, подсчитанную
+    запросом по сообщениям и запросом по архиву.
+    """
+
+    url = reverse("api:mailing-overall-statistics")
+    with django_assert_num_queries(2):
+        response = client.get(url, {"group_by": "tag"})
+    assert response.json() == {
+        "group_by": "tag",
+        "results": [
+            {
+                "tag": "manager",
+                "mailings_total": 1,
+                "messages_sent": 2,
+                "messages_failed": 1,
+                "messages_total": 3,
+            },
+            {
+                "tag": "seller",
+                "mailings_total": 1,
+                "messages_sent": 2,
+                "messages_failed": 1,
+                "messages_total": 3,
+            },
+        ],
+    }
+
+
+def test_overall_statistics_filtered(
+    db, client, overall_statistics_fixture: OverallStatisticsFixture
+):
+    """Тест на общую статистику с фильтром по коду мобильного оператора и
+    датам.
+    """
+
+    url = reverse("api:mailing-overall-statistics")
+    response = client.get(url, {"mobile_operator_code": 926})
+    assert response.json() == {
+        "mailings_total": 1,
+        "messages_sent": 2,
+        "messages_failed": 1,
+        "messages_total": 3,
+    }
+    yesterday = timezone.localdate() - datetime.timedelta(days=1)
+    response = client.get(url, {"date_to": yesterday.isoformat()})
+    assert response.json()["messages_total"] == 0
+
+
+def test_overall_statistics_grouped_by_day_archived(
+    db, tmp_path, overall_statistics_fixture: OverallStatisticsFixture
+):
+    """Тест на учет перенесенных в архив сообщений в общей статистике с
+    группировкой по дням.
+    """
+
+    expected = get_filtered_statistics(group_by="day")
+    assert expected[0]["messages_total"] == 6
+    archive_mailings(retention_days=0, directory=tmp_path)
+    assert get_filtered_statistics(group_by="day") == expected
+
+
+def test_bulk_detailed_statistics(
+    db,
+    client,
+    django_assert_num_queries,
+    overall_statistics_fixture: OverallStatisticsFixture,
+):
+    """Тест на статистику по списку рассылок, сформированную одним запросом
+    и совпадающую с детальной статистикой каждой рассылки.
+    """
+
+    mailings = list(Mailing.objects.order_by("id"))
+    expected = [
+        {"id": mailing.id, **get_detailed_statistics(mailing)}
+        for mailing in mailings
+    ]
+    url = reverse("api:mailing-bulk-detailed-statistics")
+    with django_assert_num_queries(1):
+        response = client.post(
+            url,
+            {"ids": [mailing.id for mailing in mailings]},
+            content_type="application/json",
+        )
+    assert response.json() == {"results": expected}
+
+
+def test_bulk_detailed_statistics_counters_and_archive(
+    db, tmp_path, overall_statistics_fixture: OverallStatisticsFixture
+):
+    """Тест на статистику по датам начала рассылок, взятую из счетчиков
+    рассылок, в том числе перенесенных в архив.
+    """
+
+    start_date = datetime.date(2023, 1, 1)
+    expected = get_bulk_detailed_statistics(
+        date_from=start_date, date_to=start_date
+    )
+    assert len(expected) == 2
+    rebuild_counters()
+    assert get_bulk_detailed_statistics(date_from=start_date) == expected
+    archive_mailings(retention_days=0, directory=tmp_path)
+    assert get_bulk_detailed_statistics(date_to=start_date) == expected
+    next_date = start_date + datetime.timedelta(days=1)
+    assert get_bulk_detailed_statistics(date_from=next_date) == []
+
+
+def test_bulk_detailed_statistics_invalid_selection(db, client):
+    """Тест на отказ в статистике без выборки рассылок или с двумя
+    выборками сразу.
+    """
+
+    url = reverse("api:mailing-bulk-detailed-statistics")
+    response = client.post(url, {}, content_type="application/json")
+    assert response.status_code == 400
+    response = client.post(
+        url,
+        {"ids": [1], "date_from": "2024-01-01"},
+        content_type="application/json",
+    )
+    assert response.status_code == 400
@@ -0,0 +1,108 @@
+import threading
+
+import pytest
+
+from api.business_logic import status_sink
+from api.business_logic.mailing_dispatch import create_messages
+from api.business_logic.status_sink import StatusSink
+from api.models import Client, Mailing, Message
+
+
+@pytest.fixture
+def written(monkeypatch) -> list[list[int]]:
+    """Фикстура, собирающая записываемые в БД пачки статусов."""
+
+    batches = []
+    monkeypatch.setattr(
+        status_sink, "mark_messages_sent", lambda ids: batches.append(ids)
+    )
+    return batches
+
+
+def test_flush_by_size(written: list[list[int]]):
+    """Тест на запись статусов при накоплении заданного количества."""
+
+    sink = StatusSink(flush_size=3, flush_interval=60)
+    sink.add([1, 2])
+    assert written == []
+    sink.add([3])
+    assert written == [[1, 2, 3]]
+    sink.flush()
+    assert written == [[1, 2, 3]]
+
+
+def test_flush_by_timer(monkeypatch):
+    """Тест на запись статусов по истечении интервала."""
+
+    flushed = threading.Event()
+    batches = []
+
+    def mark_messages_sent(message_ids):
+        batches.append(message_ids)
+        flushed.set()
+
+    monkeypatch.setattr(status_sink, "mark_messages_sent", mark_messages_sent)
+    sink = StatusSink(flush_size=100, flush_interval=0.01)
+    sink.add([1, 2])
+    assert flushed.wait(timeout=5)
+    assert batches == [[1, 2]]
+
+
+def test_write_error_keeps_statuses(monkeypatch):
+    """Тест на сохранение статусов в буфере при ошибке записи в БД."""
+
+    def mark_messages_sent(message_ids):
+        raise RuntimeError
+
+    monkeypatch.setattr(status_sink, "mark_messages_sent", mark_messages_sent)
+    sink = StatusSink(flush_size=100, flush_interval=60)
+    sink.add([1, 2])
+    with pytest.raises(RuntimeError):
+        sink.flush()
+    batches = []
+    monkeypatch.setattr(
+        status_sink, "mark_messages_sent", lambda ids: batches.append(ids)
+    )
+    sink.flush()
+    assert batches == [[1, 2]]
+
+
+def test_flush_by_timer_retried_after_error(monkeypatch):
+    """Тест на повторный сброс статусов по таймеру после ошибки записи."""
+
+    flushed = threading.Event()
+    batches = []
+
+    def mark_messages_sent(message_ids):
+        batches.append(message_ids)
+        if len(batches) == 1:
+            raise RuntimeError
+        flushed.set()
+
+    monkeypatch.setattr(status_sink, "mark_messages_sent", mark_messages_sent)
+    sink = StatusSink(flush_size=100, flush_interval=0.01)
+    sink.add([1, 2])
+    assert flushed.wait(timeout=5)
+    assert batches == [[1, 2], [1, 2]]
+
+
+def test_flush_on_shutdown(
+    db,
+    monkeypatch,
+    mailing_seller_926_hello: Mailing,
+    client_seller_926_1: Client,
+    client_seller_926_2: Client,
+):
+    """Тест на запись накопленных статусов при остановке воркера."""
+
+    monkeypatch.setattr(status_sink, "_status_sink", None)
+    recipients = create_messages(
+        mailing_seller_926_hello.id,
+        [client_seller_926_1.id, client_seller_926_2.id],
+    )
+    status_sink.get_status_sink().add(
+        [message_id for message_id, _ in recipients]
+    )
+    assert not Message.objects.filter(is_sent=True).exists()
+    status_sink.flush_status_sink()
+    assert Message.objects.filter(is_sent=True).count() == 2
@@ -1,12 +1,22 @@
 import datetime
+import json
 import time
 
+import httpx
 import pytest
 import requests
+from django_celery_beat.models import PeriodicTask
 from django.utils.timezone import make_aware
 
-from api.models import Client, Filter, Mailing, Message
-from api.tasks import start_mailing
+from api.business_logic import async_sender
+from api.business_logic.mailing_dispatch import create_messages
+from api.models import Client, Filter, Mailing, MailingDispatch, Message
+from api.tasks import (
+    launch_due_mailings,
+    send_message_batch,
+    send_message_payloads,
+    start_mailing,
+)
 
 
 @pytest.fixture(scope="session")
@@ -84,7 +94,7 @@ def mock_response_ok(monkeypatch):
     def mock_post(*args, **kwargs):
         return MockResponseOk()
 
-    monkeypatch.setattr(requests, "post", mock_post)
+    monkeypatch.setattr(requests.Session, "post", mock_post)
 
 
 @pytest.fixture
@@ -99,7 +109,7 @@ def mock_response_bad(monkeypatch):
     def mock_post(*args, **kwargs):
         return MockResponseBad()
 
-    monkeypatch.setattr(requests, "post", mock_post)
+    monkeypatch.setattr(requests.Session, "post", mock_post)
 
 
 @pytest.fixture
@@ -110,7 +120,7 @@ def mock_response_exception(monkeypatch):
     def mock_post(*args, **kwargs):
         raise requests.exceptions.RequestException
 
-    monkeypatch.setattr(requests, "post", mock_post)
+    monkeypatch.setattr(requests.Session, "post", mock_post)
 
 
 def test_start_mailing_ok(
@@ -274,3 +284,387 @@ def test_start_mailing_on_schedule_past(
         mailing=mailing_seller_926_hello_past,
     ).count()
     assert message_count == 0
+
+
+def test_start_mailing_chunked(
+    db,
+    celery_app,
+    celery_worker,
+    settings,
+    mailing_seller_926_hello_future: Mailing,
+    client_seller_926_1: Client,
+    client_seller_926_2: Client,
+    client_seller_926_3: Client,
+    mock_response_ok,
+):
+    """Тест на отправку сообщений всем клиентам рассылки при публикации
+    задач несколькими пачками.
+    """
+
+    settings.MAILING_DISPATCH_CHUNK_SIZE = 2
+    start_mailing.delay(mailing_seller_926_hello_future.id)
+    message_count = Message.objects.filter(
+        is_sent=True, mailing=mailing_seller_926_hello_future
+    ).count()
+    assert message_count == 3
+
+
+def test_send_message_batch_retries_failed_only(
+    db,
+    celery_app,
+    mailing_seller_926_hello_future: Mailing,
+    client_seller_926_1: Client,
+    client_seller_926_2: Client,
+    client_seller_926_3: Client,
+    monkeypatch,
+):
+    """Тест на повторную отправку только тех сообщений пачки, отправка
+    которых завершилась ошибкой.
+    """
+
+    posted_phones = []
+
+    class MockResponse:
+        def __init__(self, status_code):
+            self.status_code = status_code
+
+    def mock_post(*args, **kwargs):
+        phone = kwargs["json"]["phone"]
+        posted_phones.append(phone)
+        if phone == client_seller_926_3.phone_number:
+            return MockResponse(400)
+        return MockResponse(200)
+
+    monkeypatch.setattr(requests.Session, "post", mock_post)
+    recipients = create_messages(
+        mailing_seller_926_hello_future.id,
+        [
+            client_seller_926_1.id,
+            client_seller_926_2.id,
+            client_seller_926_3.id,
+        ],
+    )
+    send_message_batch.apply(
+        kwargs={
+            "mailing_id": mailing_seller_926_hello_future.id,
+            "message_ids": [message_id for message_id, _ in recipients],
+        }
+    )
+    sent_clients = set(
+        Message.objects.filter(
+            is_sent=True, mailing=mailing_seller_926_hello_future
+        ).values_list("client", flat=True)
+    )
+    assert sent_clients == {client_seller_926_1.id, client_seller_926_2.id}
+    assert posted_phones.count(client_seller_926_1.phone_number) == 1
+    assert posted_phones.count(client_seller_926_3.phone_number) > 1
+
+
+def test_send_message_batch_skips_sent(
+    db,
+    celery_app,
+    mailing_seller_926_hello_future: Mailing,
+    client_seller_926_1: Client,
+    client_seller_926_2: Client,
+    monkeypatch,
+):
+    """Тест на пропуск уже отправленных сообщений при повторном выполнении
+    задачи отправки пачки.
+    """
+
+    posted_ids = []
+
+    class MockResponse:
+        status_code = 200
+
+    def mock_post(*args, **kwargs):
+        posted_ids.append(kwargs["json"]["id"])
+        return MockResponse()
+
+    monkeypatch.setattr(requests.Session, "post", mock_post)
+    recipients = create_messages(
+        mailing_seller_926_hello_future.id,
+        [client_seller_926_1.id, client_seller_926_2.id],
+    )
+    message_ids = [message_id for message_id, _ in recipients]
+    Message.objects.filter(id=message_ids[0]).update(is_sent=True)
+    send_message_batch.apply(
+        kwargs={
+            "mailing_id": mailing_seller_926_hello_future.id,
+            "message_ids": message_ids,
+        }
+    )
+    assert posted_ids == message_ids[1:]
+
+
+def test_send_message_batch_async_engine(
+    db,
+    celery_app,
+    settings,
+    mailing_seller_926_hello_future: Mailing,
+    client_seller_926_1: Client,
+    client_seller_926_2: Client,
+    monkeypatch,
+):
+    """Тест на отправку пачки сообщений асинхронным способом отправки с
+    загрузкой получателей из БД до запуска цикла событий.
+    """
+
+    posted_ids = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        posted_ids.append(json.loads(request.content)["id"])
+        return httpx.Response(200)
+
+    def create_client(concurrency, transport=None):
+        return httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+    settings.MAILING_SENDER_ENGINE = "async"
+    monkeypatch.setattr(async_sender, "_runner", None)
+    monkeypatch.setattr(async_sender, "_create_client", create_client)
+    recipients = create_messages(
+        mailing_seller_926_hello_future.id,
+        [client_seller_926_1.id, client_seller_926_2.id],
+    )
+    message_ids = [message_id for message_id, _ in recipients]
+    result = send_message_batch.apply(
+        kwargs={
+            "mailing_id": mailing_seller_926_hello_future.id,
+            "message_ids": message_ids,
+        }
+    )
+    result.get()
+    assert sorted(posted_ids) == sorted(message_ids)
+    sent_messages = Message.objects.filter(id__in=message_ids, is_sent=True)
+    assert sent_messages.count() == 2
+
+
+def test_start_mailing_payload_mode(
+    db,
+    celery_app,
+    celery_worker,
+    settings,
+    mailing_seller_926_hello_future: Mailing,
+    client_seller_926_1: Client,
+    client_seller_926_2: Client,
+    client_seller_926_3: Client,
+    mock_response_ok,
+):
+    """Тест на отправку сообщений всем клиентам рассылки в режиме передачи
+    данных сообщений в задачу.
+    """
+
+    settings.MAILING_SEND_MODE = "payload"
+    settings.MAILING_SEND_BATCH_SIZE = 2
+    start_mailing.delay(mailing_seller_926_hello_future.id)
+    message_count = Message.objects.filter(
+        is_sent=True, mailing=mailing_seller_926_hello_future
+    ).count()
+    assert message_count == 3
+
+
+def test_send_message_payloads_single_query(
+    db,
+    celery_app,
+    django_assert_num_queries,
+    mailing_seller_926_hello_future: Mailing,
+    client_seller_926_1: Client,
+    client_seller_926_2: Client,
+    mock_response_ok,
+):
+    """Тест на обращение к БД только для записи статусов и счетчиков рассылки
+    при отправке сообщений по переданным в задачу данным: точка сохранения,
+    выборка с блокировкой, обновление статусов, обновление счетчиков и
+    освобождение точки сохранения.
+    """
+
+    recipients = create_messages(
+        mailing_seller_926_hello_future.id,
+        [client_seller_926_1.id, client_seller_926_2.id],
+    )
+    with django_assert_num_queries(5):
+        send_message_payloads.apply(
+            kwargs={
+                "mailing_id": mailing_seller_926_hello_future.id,
+                "text": "hello",
+                "recipients": recipients,
+            }
+        )
+    message_count = Message.objects.filter(
+        is_sent=True, mailing=mailing_seller_926_hello_future
+    ).count()
+    assert message_count == 2
+
+
+def test_start_mailing_resumes_from_checkpoint(
+    db,
+    celery_app,
+    celery_worker,
+    mailing_seller_926_hello_future: Mailing,
+    client_seller_926_1: Client,
+    client_seller_926_2: Client,
+    client_seller_926_3: Client,
+    mock_response_ok,
+):
+    """Тест на продолжение запуска рассылки с сохраненного места без
+    повторной отправки уже опубликованным клиентам.
+    """
+
+    MailingDispatch.objects.create(
+        mailing=mailing_seller_926_hello_future,
+        last_client_id=client_seller_926_1.id,
+        chunks_published=1,
+    )
+    start_mailing.delay(mailing_seller_926_hello_future.id)
+    sent_clients = set(
+        Message.objects.filter(
+            is_sent=True, mailing=mailing_seller_926_hello_future
+        ).values_list("client", flat=True)
+    )
+    assert sent_clients == {client_seller_926_2.id, client_seller_926_3.id}
+    checkpoint = MailingDispatch.objects.get(
+        mailing=mailing_seller_926_hello_future
+    )
+    assert checkpoint.last_client_id == client_seller_926_3.id
+    assert checkpoint.chunks_published == 2
+    assert checkpoint.is_finished is True
+
+
+def test_start_mailing_finished_not_repeated(
+    db,
+    celery_app,
+    celery_worker,
+    mailing_seller_926_hello_future: Mailing,
+    client_seller_926_1: Client,
+    mock_response_ok,
+):
+    """Тест на отсутствие повторной публикации завершенного запуска
+    рассылки.
+    """
+
+    MailingDispatch.objects.create(
+        mailing=mailing_seller_926_hello_future, is_finished=True
+    )
+    start_mailing.delay(mailing_seller_926_hello_future.id)
+    assert not Message.objects.filter(
+        mailing=mailing_seller_926_hello_future
+    ).exists()
+
+
+@pytest.fixture
+def sweep_scheduler(settings):
+    """Фикстура режима запуска рассылок периодической проверкой."""
+
+    settings.MAILING_SCHEDULER = Mailing.SCHEDULER_SWEEP
+
+
+def test_launch_due_mailings(
+    db,
+    celery_app,
+    celery_worker,
+    sweep_scheduler,
+    mailing_seller_926_hello_started: Mailing,
+    mailing_seller_926_hello_future: Mailing,
+    client_seller_926_1: Client,
+    mock_response_ok,
+):
+    """Тест на запуск наступивших рассылок периодической проверкой и
+    пропуск рассылок в будущем.
+    """
+
+    launch_due_mailings.apply()
+    mailing_seller_926_hello_started.refresh_from_db()
+    mailing_seller_926_hello_future.refresh_from_db()
+    assert mailing_seller_926_hello_started.is_launched is True
+    assert mailing_seller_926_hello_future.is_launched is False
+    assert Message.objects.filter(
+        is_sent=True, mailing=mailing_seller_926_hello_started
+    ).exists()
+    assert not Message.objects.filter(
+        mailing=mailing_seller_926_hello_future
+    ).exists()
+
+
+def test_launch_due_mailings_expired(
+    db,
+    celery_app,
+    celery_worker,
+    sweep_scheduler,
+    filter_seller_926: Filter,
+    client_seller_926_1: Client,
+    mock_response_ok,
+):
+    """Тест на пометку закончившейся рассылки запущенной без отправки
+    сообщений.
+    """
+
+    mailing = Mailing.objects.create(
+        start_datetime=make_aware(
+            datetime.datetime.now() - datetime.timedelta(seconds=4)
+        ),
+        end_datetime=make_aware(
+            datetime.datetime.now() - datetime.timedelta(seconds=2)
+        ),
+        message_text="hello",
+        filter=filter_seller_926,
+    )
+    launch_due_mailings.apply()
+    mailing.refresh_from_db()
+    assert mailing.is_launched is True
+    assert not Message.objects.filter(mailing=mailing).exists()
+
+
+def test_mailing_sweep_scheduler_no_periodic_task(
+    db, settings, filter_seller_926: Filter
+):
+    """Тест на отсутствие задачи Celery Beat для рассылки в режиме
+    периодической проверки.
+    """
+
+    settings.MAILING_SCHEDULER = Mailing.SCHEDULER_SWEEP
+    mailing = Mailing.objects.create(
+        start_datetime=make_aware(
+            datetime.datetime.now() + datetime.timedelta(seconds=2)
+        ),
+        end_datetime=make_aware(
+            datetime.datetime.now() + datetime.timedelta(seconds=4)
+        ),
+        message_text="hello",
+        filter=filter_seller_926,
+    )
+    assert mailing.periodic_task is None
+    assert not PeriodicTask.objects.exists()
+
+
+def test_launch_due_mailings_skips_periodic_task(
+    db,
+    celery_app,
+    settings,
+    mailing_seller_926_hello_started: Mailing,
+):
+    """Тест на пропуск периодической проверкой рассылки, созданной
+    с заданием Celery Beat до перехода в режим периодической проверки.
+    """
+
+    settings.MAILING_SCHEDULER = Mailing.SCHEDULER_SWEEP
+    launch_due_mailings.apply()
+    mailing_seller_926_hello_started.refresh_from_db()
+    assert mailing_seller_926_hello_started.periodic_task is not None
+    assert mailing_seller_926_hello_started.is_launched is False
+
+
+def test_mailing_sweep_scheduler_updates_periodic_task(
+    db, settings, mailing_seller_926_hello_future: Mailing
+):
+    """Тест на перенос задачи Celery Beat рассылки, созданной до перехода
+    в режим периодической проверки, при изменении времени начала.
+    """
+
+    settings.MAILING_SCHEDULER = Mailing.SCHEDULER_SWEEP
+    start_datetime = mailing_seller_926_hello_future.start_datetime
+    start_datetime += datetime.timedelta(seconds=1)
+    mailing_seller_926_hello_future.start_datetime = start_datetime
+    mailing_seller_926_hello_future.save()
+    periodic_task = mailing_seller_926_hello_future.periodic_task
+    periodic_task.refresh_from_db()
+    assert periodic_task.clocked.clocked_time == start_datetime
@@ -1,47 +1,314 @@
+import io
+from collections.abc import Callable
+
+from django.conf import settings
+from django.db.models import QuerySet
+from django.http import StreamingHttpResponse
 from django.shortcuts import get_object_or_404
+from django.utils.decorators import method_decorator
+from django.views.decorators.http import condition
 from rest_framework import status
 from rest_framework.decorators import action
+from rest_framework.parsers import MultiPartParser
 from rest_framework.response import Response
 
+from api.business_logic.change_stamps import (
+    SCOPE_CLIENTS,
+    SCOPE_MAILINGS,
+    SCOPE_STATISTICS,
+    get_etag,
+    get_last_modified,
+    get_mailing_etag,
+)
+from api.business_logic.client_bulk import (
+    bulk_delete_clients,
+    bulk_update_clients,
+    delete_clients,
+    get_selected_clients,
+)
+from api.business_logic.client_import import (
+    get_import_format,
+    import_clients,
+    iter_rows,
+)
+from api.business_logic.export import (
+    COMPRESSION_GZIP,
+    get_client_export_rows,
+    get_message_export_rows,
+    iter_gzip,
+    iter_ndjson,
+)
 from api.business_logic.mailing_statistics import (
+    get_bulk_detailed_statistics,
     get_detailed_statistics,
+    get_filtered_statistics,
     get_overall_statistics,
 )
+from api.business_logic.mailing_timeseries import get_timeseries
 from api.mixins import ListCreateUpdateDestroyViewSet
 from api.models import Client, Mailing
-from api.serializers import ClientSerializer, MailingSerializer
+from api.serializers import (
+    BulkDetailedStatisticsSerializer,
+    ClientBulkUpdateSerializer,
+    ClientImportSerializer,
+    ClientSelectionSerializer,
+    ClientSerializer,
+    ExportQuerySerializer,
+    MailingSerializer,
+    MessageExportQuerySerializer,
+    OverallStatisticsQuerySerializer,
+    TimeseriesQuerySerializer,
+)
+
+
+def scoped_condition(get_scopes: Callable[..., list[str]]):
+    """Декоратор условной обработки GET-запроса по отметкам изменения
+    областей данных, которые get_scopes возвращает по запросу и параметрам
+    URL. Если данные не менялись, ответ 304 формируется без обращения к БД.
+    Если кэш статистики не общий, запросы обрабатываются без условий.
+    """
+
+    def get_scopes_etag(request, *args, **kwargs):
+        return get_etag(*get_scopes(request=request, **kwargs))
+
+    def get_scopes_last_modified(request, *args, **kwargs):
+        return get_last_modified(*get_scopes(request=request, **kwargs))
+
+    return method_decorator(
+        condition(
+            etag_func=get_scopes_etag,
+            last_modified_func=get_scopes_last_modified,
+        )
+    )
+
+
+def get_overall_statistics_scopes(request, **kwargs) -> list[str]:
+    """Возвращает области данных общей статистики. Статистика с фильтрами и
+    группировкой зависит также от тэгов и фильтров рассылок.
+    """
+
+    if request.GET:
+        return [SCOPE_STATISTICS, SCOPE_MAILINGS, SCOPE_CLIENTS]
+    return [SCOPE_STATISTICS]
+
+
+def mailing_condition():
+    """Декоратор условной обработки GET-запроса к данным одной рассылки по
+    версии, вычисленной по рассылке и ее счетчикам. Если данные не менялись,
+    ответ 304 формируется одним запросом к БД.
+    """
+
+    def get_etag_by_pk(request, pk, *args, **kwargs):
+        if not str(pk).isdigit():
+            return None
+        return get_mailing_etag(int(pk))
+
+    return method_decorator(condition(etag_func=get_etag_by_pk))
+
+
+def get_export_response(
+    rows: QuerySet, file_name: str, compression: str | None
+) -> StreamingHttpResponse:
+    """Формирует потоковый ответ с выгрузкой выборки в NDJSON, сжатой в gzip
+    при compression="gzip".
+    """
+
+    content = iter_ndjson(rows, settings.EXPORT_CHUNK_SIZE)
+    content_type = "application/x-ndjson"
+    file_name += ".ndjson"
+    if compression == COMPRESSION_GZIP:
+        content = iter_gzip(content)
+        content_type = "application/gzip"
+        file_name += ".gz"
+    response = StreamingHttpResponse(content, content_type=content_type)
+    response["Content-Disposition"] = f'attachment; filename="{file_name}"'
+    return response
 
 
 class ClientViewSet(ListCreateUpdateDestroyViewSet):
     """Вьюсэт для эндпоинтов связанных с клиентами."""
 
-    queryset = Client.objects.all()
+    queryset = Client.objects.select_related("tag")
     serializer_class = ClientSerializer
 
+    @scoped_condition(lambda **kwargs: [SCOPE_CLIENTS])
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
+    def perform_destroy(self, instance):
+        delete_clients([instance.id])
+
+    @action(
+        detail=False,
+        methods=["post"],
+        url_path="import",
+        url_name="import",
+        parser_classes=[MultiPartParser],
+        serializer_class=ClientImportSerializer,
+    )
+    def bulk_import(self, request):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        file = serializer.validated_data["file"]
+        import_format = serializer.validated_data.get(
+            "input_format", get_import_format(file.name)
+        )
+        lines = io.TextIOWrapper(
+            file, encoding="utf-8-sig", errors="replace", newline=""
+        )
+        result = import_clients(iter_rows(lines, import_format))
+        return Response(data=result, status=status.HTTP_200_OK)
+
+    @action(
+        detail=False,
+        methods=["post"],
+        url_path="bulk-update",
+        url_name="bulk-update",
+        serializer_class=ClientBulkUpdateSerializer,
+    )
+    def bulk_update(self, request):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        clients = get_selected_clients(**serializer.get_selection())
+        tag = serializer.validated_data["tag"]
+        updated = bulk_update_clients(
+            clients, None if tag is None else tag["name"]
+        )
+        return Response(
+            data={"clients_updated": updated}, status=status.HTTP_200_OK
+        )
+
+    @action(
+        detail=False,
+        methods=["post"],
+        url_path="bulk-delete",
+        url_name="bulk-delete",
+        serializer_class=ClientSelectionSerializer,
+    )
+    def bulk_delete(self, request):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        clients = get_selected_clients(**serializer.get_selection())
+        deleted = bulk_delete_clients(clients)
+        return Response(
+            data={"clients_deleted": deleted}, status=status.HTTP_200_OK
+        )
+
+    @action(
+        detail=False,
+        methods=["get"],
+        url_path="export",
+        url_name="export",
+    )
+    def export(self, request):
+        serializer = ExportQuerySerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        return get_export_response(
+            get_client_export_rows(),
+            "clients",
+            serializer.validated_data.get("compression"),
+        )
+
 
 class MailingViewSet(ListCreateUpdateDestroyViewSet):
     """Вьюсэт для эндпоинтов связанных с рассылками."""
 
-    queryset = Mailing.objects.all()
+    queryset = Mailing.objects.select_related("filter__tag")
     serializer_class = MailingSerializer
 
+    @scoped_condition(lambda **kwargs: [SCOPE_MAILINGS])
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
     @action(
         detail=True,
         methods=["get"],
         url_path="detailed-statistics",
         url_name="detailed-statistics",
     )
+    @mailing_condition()
     def detailed_statistics(self, request, pk):
-        mailing = get_object_or_404(Mailing, pk=pk)
+        mailing = get_object_or_404(
+            Mailing.objects.select_related("filter", "counters"), pk=pk
+        )
         statistics = get_detailed_statistics(mailing)
         return Response(data=statistics, status=status.HTTP_200_OK)
 
+    @action(
+        detail=False,
+        methods=["post"],
+        url_path="bulk-detailed-statistics",
+        url_name="bulk-detailed-statistics",
+    )
+    def bulk_detailed_statistics(self, request):
+        serializer = BulkDetailedStatisticsSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        return Response(
+            data={
+                "results": get_bulk_detailed_statistics(
+                    **serializer.validated_data
+                )
+            },
+            status=status.HTTP_200_OK,
+        )
+
+    @action(
+        detail=True,
+        methods=["get"],
+        url_path="timeseries",
+        url_name="timeseries",
+    )
+    @mailing_condition()
+    def timeseries(self, request, pk):
+        serializer = TimeseriesQuerySerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        bucket = serializer.validated_data["bucket"]
+        mailing = get_object_or_404(
+            Mailing.objects.select_related("counters"), pk=pk
+        )
+        return Response(
+            data={
+                "bucket": bucket,
+                "results": get_timeseries(mailing, bucket),
+            },
+            status=status.HTTP_200_OK,
+        )
+
     @action(
         detail=False,
         methods=["get"],
         url_path="overall-statistics",
         url_name="overall-statistics",
     )
+    @scoped_condition(get_overall_statistics_scopes)
     def overall_statistics(self, request):
-        statistics = get_overall_statistics()
+        serializer = OverallStatisticsQuerySerializer(
+            data=request.query_params
+        )
+        serializer.is_valid(raise_exception=True)
+        params = serializer.validated_data
+        if not params:
+            statistics = get_overall_statistics()
+        elif "group_by" in params:
+            statistics = {
+                "group_by": params["group_by"],
+                "results": get_filtered_statistics(**params),
+            }
+        else:
+            statistics = get_filtered_statistics(**params)
         return Response(data=statistics, status=status.HTTP_200_OK)
+
+    @action(
+        detail=False,
+        methods=["get"],
+        url_path="messages-export",
+        url_name="messages-export",
+    )
+    def messages_export(self, request):
+        serializer = MessageExportQuerySerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        return get_export_response(
+            get_message_export_rows(serializer.validated_data.get("mailing")),
+            "messages",
+            serializer.validated_data.get("compression"),
+        )
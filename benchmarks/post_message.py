@@ -0,0 +1,95 @@
+"""Сравнение отправки запросов на внешний API с новым соединением на каждый
+запрос и через пул keep-alive соединений.
+
+Запуск из папки с файлом manage.py:
+    python benchmarks/post_message.py --requests 2000
+"""
+
+import argparse
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import django
+import requests
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault(
+    "DJANGO_SETTINGS_MODULE", "notification_service.settings"
+)
+os.environ.setdefault("SECRET_KEY", "benchmark")
+os.environ.setdefault("BASE_URL", "http://127.0.0.1")
+os.environ.setdefault("TOKEN", "Bearer benchmark")
+django.setup()
+
+from api.business_logic import send_message  # noqa: E402
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Заглушка внешнего API, отвечающая 200 на любой POST-запрос."""
+
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    connections = 0
+
+    def setup(self):
+        super().setup()
+        StubHandler.connections += 1
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers["Content-Length"]))
+        body = b'{"code": 0, "message": "OK"}'
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def post_without_pool(message_id: int, phone_number: int, text: str):
+    """Отправка запроса с открытием нового соединения, как до введения пула."""
+
+    return requests.post(
+        url=send_message.BASE_URL + f"/{message_id}",
+        headers={"Authorizatioin": send_message.TOKEN},
+        json={"id": message_id, "phone": phone_number, "text": text},
+        timeout=(5, 5),
+    )
+
+
+def run(name: str, post, total: int):
+    StubHandler.connections = 0
+    started = time.perf_counter()
+    for message_id in range(total):
+        response = post(message_id, 79261234567, "hello")
+        assert response.status_code == 200
+    elapsed = time.perf_counter() - started
+    print(
+        f"{name:<12} {total} запросов за {elapsed:.2f} с "
+        f"({total / elapsed:.0f} запросов/с), "
+        f"соединений: {StubHandler.connections}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=1000)
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    send_message.BASE_URL = f"http://127.0.0.1:{server.server_port}/send"
+
+    run("без пула", post_without_pool, args.requests)
+    run("с пулом", send_message.post_payload, args.requests)
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.0/ref/settings/
 """
 
+import json
 import os
 from pathlib import Path
 
@@ -49,6 +50,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "api.middleware.QueryBudgetMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -136,8 +138,218 @@ CELERY_CACHE_BACKEND = "django-cache"
 CELERY_BROKER_URL = "redis://localhost:6379/0"
 CELERY_BEAT_SCHEDULER = "django_celery_beat.schedulers:DatabaseScheduler"
 
+# Способ запуска рассылок: "beat" - отдельное одноразовое задание
+# django-celery-beat на каждую рассылку, "sweep" - одно периодическое задание,
+# которое каждые MAILING_SWEEP_INTERVAL секунд запускает наступившие рассылки.
+# Рассылки, созданные до перехода на "sweep", по-прежнему запускаются своими
+# заданиями django-celery-beat.
+MAILING_SCHEDULER = os.getenv("MAILING_SCHEDULER", "beat")
+MAILING_SWEEP_INTERVAL = float(os.getenv("MAILING_SWEEP_INTERVAL", 10))
+CELERY_BEAT_SCHEDULE = {}
+if MAILING_SCHEDULER == "sweep":
+    CELERY_BEAT_SCHEDULE["launch-due-mailings"] = {
+        "task": "api.tasks.launch_due_mailings",
+        "schedule": MAILING_SWEEP_INTERVAL,
+    }
+
+# Количество идентификаторов клиентов, выбираемых из БД и публикуемых в брокер
+# за один шаг при запуске рассылки.
+MAILING_DISPATCH_CHUNK_SIZE = int(
+    os.getenv("MAILING_DISPATCH_CHUNK_SIZE", 1000)
+)
+# Количество клиентов, обрабатываемых одной задачей отправки сообщений.
+MAILING_SEND_BATCH_SIZE = int(os.getenv("MAILING_SEND_BATCH_SIZE", 100))
+# Режим отправки: "batch" - задача получает идентификаторы сообщений и
+# загружает данные из БД, "payload" - задача получает номера телефонов и текст
+# сообщения и обращается к БД только для записи статусов.
+MAILING_SEND_MODE = os.getenv("MAILING_SEND_MODE", "batch")
+
+# Максимальное количество соединений с внешним API, которые процесс воркера
+# держит открытыми для повторного использования.
+PROVIDER_HTTP_POOL_SIZE = int(os.getenv("PROVIDER_HTTP_POOL_SIZE", 10))
+# Способ отправки пачки сообщений: "sync" - последовательно через пул
+# соединений, "async" - конкурентно через asyncio.
+MAILING_SENDER_ENGINE = os.getenv("MAILING_SENDER_ENGINE", "sync")
+# Максимальное количество одновременных запросов к внешнему API из одного
+# процесса воркера при асинхронной отправке и размер пула соединений его
+# общего клиента. Пачка отправляется одной задачей, поэтому одновременных
+# запросов не больше MAILING_SEND_BATCH_SIZE.
+PROVIDER_ASYNC_CONCURRENCY = int(os.getenv("PROVIDER_ASYNC_CONCURRENCY", 200))
+
+# Ограничение частоты запросов к внешнему API в запросах в секунду: общее,
+# по кодам мобильных операторов в формате {"926": 50} и для операторов,
+# отсутствующих в списке. Значение 0 отключает ограничение. Если задан
+# PROVIDER_RATE_LIMIT_REDIS_URL, лимиты общие для всех воркеров кластера.
+PROVIDER_RATE_LIMIT = float(os.getenv("PROVIDER_RATE_LIMIT", 0))
+PROVIDER_OPERATOR_RATE_LIMITS = {
+    int(code): float(rate)
+    for code, rate in json.loads(
+        os.getenv("PROVIDER_OPERATOR_RATE_LIMITS", "{}")
+    ).items()
+}
+PROVIDER_OPERATOR_RATE_LIMIT = float(
+    os.getenv("PROVIDER_OPERATOR_RATE_LIMIT", 0)
+)
+PROVIDER_RATE_LIMIT_REDIS_URL = os.getenv("PROVIDER_RATE_LIMIT_REDIS_URL", "")
+# Таймаут подключения и операций с Redis ограничителя частоты запросов в
+# секундах, после которого используются лимиты в пределах процесса.
+PROVIDER_RATE_LIMIT_REDIS_TIMEOUT = float(
+    os.getenv("PROVIDER_RATE_LIMIT_REDIS_TIMEOUT", 0.5)
+)
+
+# Автоматический выключатель запросов к внешнему API: после
+# PROVIDER_CIRCUIT_FAILURE_THRESHOLD ошибок подряд запросы не выполняются
+# PROVIDER_CIRCUIT_RECOVERY_TIMEOUT секунд, затем выполняется до
+# PROVIDER_CIRCUIT_HALF_OPEN_MAX_CALLS пробных запросов. Значение порога 0
+# отключает выключатель.
+PROVIDER_CIRCUIT_FAILURE_THRESHOLD = int(
+    os.getenv("PROVIDER_CIRCUIT_FAILURE_THRESHOLD", 5)
+)
+PROVIDER_CIRCUIT_RECOVERY_TIMEOUT = float(
+    os.getenv("PROVIDER_CIRCUIT_RECOVERY_TIMEOUT", 30)
+)
+PROVIDER_CIRCUIT_HALF_OPEN_MAX_CALLS = int(
+    os.getenv("PROVIDER_CIRCUIT_HALF_OPEN_MAX_CALLS", 1)
+)
+
+# Адаптивное ограничение количества одновременных запросов к внешнему API по
+# задержке и доле ошибок (AIMD). Лимит меняется в пределах от
+# PROVIDER_CONCURRENCY_MIN до PROVIDER_CONCURRENCY_MAX и уменьшается, если
+# средняя задержка превышает PROVIDER_CONCURRENCY_LATENCY_THRESHOLD_MS или
+# доля ошибок превышает PROVIDER_CONCURRENCY_MAX_ERROR_RATE. Лимит
+# ограничивает только асинхронную отправку (MAILING_SENDER_ENGINE="async"):
+# при синхронной отправке каждый процесс воркера выполняет один запрос за раз,
+# поэтому лимит только вычисляется по задержке и ошибкам и выводится в метриках
+# (METRICS_LOG_INTERVAL).
+PROVIDER_ADAPTIVE_CONCURRENCY = (
+    os.getenv("PROVIDER_ADAPTIVE_CONCURRENCY", "False") == "True"
+)
+PROVIDER_CONCURRENCY_INITIAL = int(
+    os.getenv("PROVIDER_CONCURRENCY_INITIAL", 10)
+)
+PROVIDER_CONCURRENCY_MIN = int(os.getenv("PROVIDER_CONCURRENCY_MIN", 1))
+PROVIDER_CONCURRENCY_MAX = int(
+    os.getenv("PROVIDER_CONCURRENCY_MAX", PROVIDER_ASYNC_CONCURRENCY)
+)
+PROVIDER_CONCURRENCY_LATENCY_THRESHOLD_MS = int(
+    os.getenv("PROVIDER_CONCURRENCY_LATENCY_THRESHOLD_MS", 1000)
+)
+PROVIDER_CONCURRENCY_MAX_ERROR_RATE = float(
+    os.getenv("PROVIDER_CONCURRENCY_MAX_ERROR_RATE", 0.1)
+)
+
+# Отложенная запись статусов отправленных сообщений: статусы накапливаются в
+# процессе воркера и записываются одним запросом при накоплении
+# MESSAGE_STATUS_FLUSH_SIZE статусов или через MESSAGE_STATUS_FLUSH_INTERVAL_MS
+# миллисекунд, а также при остановке воркера.
+MESSAGE_STATUS_WRITE_BEHIND = (
+    os.getenv("MESSAGE_STATUS_WRITE_BEHIND", "False") == "True"
+)
+MESSAGE_STATUS_FLUSH_SIZE = int(os.getenv("MESSAGE_STATUS_FLUSH_SIZE", 1000))
+MESSAGE_STATUS_FLUSH_INTERVAL_MS = int(
+    os.getenv("MESSAGE_STATUS_FLUSH_INTERVAL_MS", 1000)
+)
+
+# Количество записей, которые проверяются и записываются в БД одним шагом
+# при массовом импорте клиентов, и максимальное количество ошибок в ответе.
+CLIENT_IMPORT_BATCH_SIZE = int(os.getenv("CLIENT_IMPORT_BATCH_SIZE", 1000))
+CLIENT_IMPORT_MAX_ERRORS = int(os.getenv("CLIENT_IMPORT_MAX_ERRORS", 100))
+# Количество клиентов, обновляемых или удаляемых одним запросом при массовых
+# операциях с клиентами.
+CLIENT_BULK_CHUNK_SIZE = int(os.getenv("CLIENT_BULK_CHUNK_SIZE", 1000))
+
+# Перенос сообщений рассылок, закончившихся больше
+# MESSAGE_ARCHIVE_RETENTION_DAYS дней назад, в сжатые файлы NDJSON в
+# каталоге MESSAGE_ARCHIVE_DIR вне каталога проекта; без него перенос не
+# выполняется. Сообщения читаются и удаляются пачками по
+# MESSAGE_ARCHIVE_CHUNK_SIZE. Если MESSAGE_ARCHIVE_INTERVAL больше 0, перенос
+# выполняется периодически каждые MESSAGE_ARCHIVE_INTERVAL секунд.
+MESSAGE_ARCHIVE_DIR = os.getenv("MESSAGE_ARCHIVE_DIR", "")
+MESSAGE_ARCHIVE_RETENTION_DAYS = int(
+    os.getenv("MESSAGE_ARCHIVE_RETENTION_DAYS", 30)
+)
+MESSAGE_ARCHIVE_CHUNK_SIZE = int(
+    os.getenv("MESSAGE_ARCHIVE_CHUNK_SIZE", 10000)
+)
+MESSAGE_ARCHIVE_INTERVAL = float(os.getenv("MESSAGE_ARCHIVE_INTERVAL", 0))
+if MESSAGE_ARCHIVE_INTERVAL > 0:
+    CELERY_BEAT_SCHEDULE["archive-messages"] = {
+        "task": "api.tasks.archive_messages",
+        "schedule": MESSAGE_ARCHIVE_INTERVAL,
+    }
+
+# Статистика закончившихся рассылок по интервалам времени сохраняется
+# периодически каждые MAILING_TIMESERIES_INTERVAL секунд. Значение 0
+# отключает задачу, тогда статистика сохраняется при переносе сообщений в
+# архив.
+MAILING_TIMESERIES_INTERVAL = float(
+    os.getenv("MAILING_TIMESERIES_INTERVAL", 60)
+)
+if MAILING_TIMESERIES_INTERVAL > 0:
+    CELERY_BEAT_SCHEDULE["build-timeseries-rollups"] = {
+        "task": "api.tasks.build_timeseries_rollups",
+        "schedule": MAILING_TIMESERIES_INTERVAL,
+    }
+
+# Кэш Django. Для общего кэша нескольких процессов можно задать, например,
+# CACHE_BACKEND=django.core.cache.backends.redis.RedisCache и
+# CACHE_LOCATION=redis://localhost:6379/1.
+CACHES = {
+    "default": {
+        "BACKEND": os.getenv(
+            "CACHE_BACKEND", "django.core.cache.backends.locmem.LocMemCache"
+        ),
+        "LOCATION": os.getenv("CACHE_LOCATION", ""),
+    },
+}
+# Кэш общей статистики: псевдоним кэша из CACHES и время жизни значений в
+# секундах. Между пересчетами значения увеличиваются при создании рассылок,
+# создании и отправке сообщений и сбрасываются при удалении рассылок и
+# клиентов.
+STATISTICS_CACHE_ALIAS = os.getenv("STATISTICS_CACHE_ALIAS", "default")
+STATISTICS_CACHE_TTL = int(os.getenv("STATISTICS_CACHE_TTL", 300))
+# Кэш общей статистики и отметки изменений для заголовков ETag и
+# Last-Modified используются, только если кэш общий для процессов API и
+# воркеров: изменения, которые воркер записал в кэш в памяти своего процесса,
+# процессам API не видны. По умолчанию кэш считается общим, если он хранится
+# не в памяти процесса.
+STATISTICS_CACHE_SHARED = (
+    os.getenv(
+        "STATISTICS_CACHE_SHARED",
+        str(
+            CACHES[STATISTICS_CACHE_ALIAS]["BACKEND"]
+            not in (
+                "django.core.cache.backends.locmem.LocMemCache",
+                "django.core.cache.backends.dummy.DummyCache",
+            )
+        ),
+    )
+    == "True"
+)
+
+# Количество строк, читаемых из БД курсором за один шаг при потоковой
+# выгрузке клиентов и результатов отправки сообщений.
+EXPORT_CHUNK_SIZE = int(os.getenv("EXPORT_CHUNK_SIZE", 2000))
+
+# Количество запросов к БД, при превышении которого обработкой одного
+# запроса к API в лог записывается предупреждение. Значение 0 отключает
+# проверку.
+API_QUERY_BUDGET = int(os.getenv("API_QUERY_BUDGET", 20))
+# Интервал в секундах, не чаще которого каждый процесс записывает в лог на
+# уровне INFO свои метрики (количество запросов к БД и время их выполнения
+# по адресам API, лимит одновременных запросов к внешнему API) в формате
+# JSON. Значение 0 отключает запись.
+METRICS_LOG_INTERVAL = float(os.getenv("METRICS_LOG_INTERVAL", 60))
+
+# Размер страницы списков API по умолчанию и максимальный размер страницы,
+# который можно запросить параметром page_size.
+API_PAGE_SIZE = int(os.getenv("API_PAGE_SIZE", 100))
+API_MAX_PAGE_SIZE = int(os.getenv("API_MAX_PAGE_SIZE", 1000))
+
 REST_FRAMEWORK = {
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
+    "DEFAULT_PAGINATION_CLASS": "api.pagination.IdCursorPagination",
+    "PAGE_SIZE": API_PAGE_SIZE,
 }
 
 SPECTACULAR_SETTINGS = {